@@ -0,0 +1,139 @@
+"""
+Benchmarks the controller IPC wire format (see controller_wire.py) against
+the nested pickle messages it replaced.
+
+For a few controller operations, a request is encoded by the SECC and decoded
+by the EVSE controller, whose reply is encoded by the controller and decoded
+by the SECC. The time of this encode/decode round-trip (without the transport)
+and the size of request and reply are reported for both formats.
+
+Usage (from the repository root):
+    python -m benchmarks.controller_wire [--rounds N]
+"""
+import argparse
+import pickle
+import timeit
+from typing import Any, Callable, Tuple
+
+from iso15118.shared.messages.controller_wire import (
+    decode_reply,
+    decode_request,
+    encode_reply,
+    encode_request,
+)
+from iso15118.shared.messages.datatypes import (
+    DCEVSEStatus,
+    DCEVSEStatusCode,
+    EVSENotification,
+    PVEVSEMaxCurrentLimit,
+    PVEVSEMaxPowerLimit,
+    PVEVSEMaxVoltageLimit,
+    PVEVSEPresentCurrent,
+    PVEVSEPresentVoltage,
+    PVEVTargetCurrent,
+    PVEVTargetVoltage,
+)
+from iso15118.shared.messages.enums import IsolationLevel
+
+STATE = "CurrentDemand"
+DC_EVSE_STATUS = DCEVSEStatus(
+    evse_notification=EVSENotification.NONE,
+    notification_max_delay=0,
+    evse_isolation_status=IsolationLevel.VALID,
+    evse_status_code=DCEVSEStatusCode.EVSE_READY,
+)
+EV_TARGETS = {
+    "voltage": PVEVTargetVoltage(multiplier=0, value=400, unit="V"),
+    "current": PVEVTargetCurrent(multiplier=0, value=100, unit="A"),
+    "soc": 35,
+}
+
+# The operation, its parameters and its result
+OPERATIONS = [
+    (
+        "get_evse_present_voltage",
+        {},
+        PVEVSEPresentVoltage(multiplier=0, value=400, unit="V"),
+    ),
+    ("get_dc_evse_status", {}, DC_EVSE_STATUS),
+    ("send_charging_command", EV_TARGETS, None),
+    (
+        "get_dc_charge_loop_snapshot",
+        {"protocol": "ISO", **EV_TARGETS},
+        {
+            "dc_evse_status": DC_EVSE_STATUS,
+            "evse_present_voltage": PVEVSEPresentVoltage(
+                multiplier=0, value=400, unit="V"
+            ),
+            "evse_present_current": PVEVSEPresentCurrent(
+                multiplier=0, value=100, unit="A"
+            ),
+            "evse_current_limit_achieved": False,
+            "evse_voltage_limit_achieved": False,
+            "evse_power_limit_achieved": False,
+            "evse_max_voltage_limit": PVEVSEMaxVoltageLimit(
+                multiplier=0, value=600, unit="V"
+            ),
+            "evse_max_current_limit": PVEVSEMaxCurrentLimit(
+                multiplier=0, value=300, unit="A"
+            ),
+            "evse_max_power_limit": PVEVSEMaxPowerLimit(
+                multiplier=1, value=1000, unit="W"
+            ),
+            "evse_id": "UK123E1234",
+        },
+    ),
+]
+
+
+def pickle_round_trip(operation: str, params: dict, result: Any) -> Tuple[int, int]:
+    """The request and reply of the pickle format, as sent before"""
+    message = pickle.dumps({"command": operation, "payload": pickle.dumps(params)})
+    request = pickle.dumps(
+        {"state": STATE, "message": message, "protocol": "v2g_message"}
+    )
+    received = pickle.loads(pickle.loads(request)["message"])
+    pickle.loads(received["payload"])
+    reply = pickle.dumps(result)
+    pickle.loads(reply)
+    return len(request), len(reply)
+
+
+def wire_round_trip(operation: str, params: dict, result: Any) -> Tuple[int, int]:
+    request = encode_request(operation, params, STATE)
+    decode_request(request)
+    reply = encode_reply(operation, result)
+    decode_reply(operation, reply)
+    return len(request), len(reply)
+
+
+def measure(round_trip: Callable, operation: tuple, rounds: int) -> float:
+    """Returns the mean time (in seconds) of a round-trip"""
+    return min(timeit.repeat(lambda: round_trip(*operation), number=rounds)) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"Encode/decode round-trips per operation: {args.rounds}")
+    print(
+        f"{'operation':<30}{'format':<8}{'time (us)':>10}"
+        f"{'request (B)':>13}{'reply (B)':>11}"
+    )
+    for operation in OPERATIONS:
+        for name, round_trip in (
+            ("pickle", pickle_round_trip),
+            ("wire", wire_round_trip),
+        ):
+            request_size, reply_size = round_trip(*operation)
+            duration = measure(round_trip, operation, args.rounds)
+            print(
+                f"{operation[0]:<30}{name:<8}{duration * 1e6:>10.1f}"
+                f"{request_size:>13}{reply_size:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
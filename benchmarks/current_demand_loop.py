@@ -0,0 +1,155 @@
+"""
+Benchmarks the CurrentDemandReq/-Res round-trip latency of the event loop
+implementations selectable with the EVENT_LOOP setting.
+
+An EVCC and an SECC side exchange ISO 15118-2 CurrentDemandReq and
+CurrentDemandRes messages over a local TCP connection. Each message is EXI
+encoded, framed as V2GTP message and read with the V2GTPStreamReader, as in a
+communication session. Each round-trip's latency is measured on the EVCC side.
+
+Usage (from the repository root):
+    python -m benchmarks.current_demand_loop [--messages N] [--loops asyncio uvloop]
+
+Event loops that aren't installed are skipped.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List, Optional
+
+from iso15118.shared.messages.enums import ISOV2PayloadTypes, Namespace, Protocol
+from iso15118.shared.messages.v2gtp import V2GTPMessage, V2GTPStreamReader
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from iso15118.shared.utils import EVENT_LOOPS, install_event_loop_policy
+
+NAMESPACE = Namespace.ISO_V2_MSG_DEF.value
+PROTOCOL = Protocol.ISO_15118_2
+HEADER = {"SessionID": "ABCDEF0102030405"}
+
+CURRENT_DEMAND_REQ = {
+    "V2G_Message": {
+        "Header": HEADER,
+        "Body": {
+            "CurrentDemandReq": {
+                "DC_EVStatus": {
+                    "EVReady": True,
+                    "EVErrorCode": "NO_ERROR",
+                    "EVRESSSOC": 35,
+                },
+                "EVTargetCurrent": {"Multiplier": 0, "Unit": "A", "Value": 100},
+                "ChargingComplete": False,
+                "EVTargetVoltage": {"Multiplier": 0, "Unit": "V", "Value": 400},
+            }
+        },
+    }
+}
+
+CURRENT_DEMAND_RES = {
+    "V2G_Message": {
+        "Header": HEADER,
+        "Body": {
+            "CurrentDemandRes": {
+                "ResponseCode": "OK",
+                "DC_EVSEStatus": {
+                    "NotificationMaxDelay": 0,
+                    "EVSENotification": "None",
+                    "EVSEStatusCode": "EVSE_Ready",
+                },
+                "EVSEPresentVoltage": {"Multiplier": 0, "Unit": "V", "Value": 400},
+                "EVSEPresentCurrent": {"Multiplier": 0, "Unit": "A", "Value": 100},
+                "EVSECurrentLimitAchieved": False,
+                "EVSEVoltageLimitAchieved": False,
+                "EVSEPowerLimitAchieved": False,
+                "EVSEID": "UK123E1234",
+                "SAScheduleTupleID": 1,
+            }
+        },
+    }
+}
+
+
+def v2gtp_message(codec: NativeEXICodec, message: dict) -> bytes:
+    exi_stream = codec.encode(json.dumps(message), NAMESPACE)
+    return V2GTPMessage(PROTOCOL, ISOV2PayloadTypes.EXI_ENCODED, exi_stream).to_bytes()
+
+
+async def serve_secc(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, codec: NativeEXICodec
+):
+    v2gtp_reader = V2GTPStreamReader(reader)
+    while True:
+        v2gtp_msg = await v2gtp_reader.read_message(PROTOCOL)
+        if v2gtp_msg is None:
+            break
+        codec.decode(v2gtp_msg.payload, NAMESPACE)
+        writer.write(v2gtp_message(codec, CURRENT_DEMAND_RES))
+        await writer.drain()
+    writer.close()
+
+
+async def measure(messages: int) -> List[float]:
+    """Returns the round-trip latencies (in seconds) of 'messages' messages"""
+    codec = NativeEXICodec()
+    server = await asyncio.start_server(
+        lambda reader, writer: serve_secc(reader, writer, codec), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    v2gtp_reader = V2GTPStreamReader(reader)
+
+    latencies = []
+    for _ in range(messages):
+        start = time.perf_counter()
+        writer.write(v2gtp_message(codec, CURRENT_DEMAND_REQ))
+        await writer.drain()
+        v2gtp_msg = await v2gtp_reader.read_message(PROTOCOL)
+        codec.decode(v2gtp_msg.payload, NAMESPACE)
+        latencies.append(time.perf_counter() - start)
+
+    writer.close()
+    await writer.wait_closed()
+    server.close()
+    await server.wait_closed()
+    return latencies
+
+
+def run_benchmark(event_loop: str, messages: int, warm_up: int) -> Optional[dict]:
+    if install_event_loop_policy(event_loop) != event_loop:
+        return None
+    try:
+        asyncio.run(measure(warm_up))
+        latencies = sorted(asyncio.run(measure(messages)))
+    finally:
+        install_event_loop_policy("asyncio")
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max": latencies[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--warm-up", type=int, default=200)
+    parser.add_argument("--loops", nargs="+", choices=EVENT_LOOPS, default=EVENT_LOOPS)
+    args = parser.parse_args()
+
+    print(f"CurrentDemand round-trips: {args.messages}")
+    print(f"{'loop':<10}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}  (us)")
+    for event_loop in args.loops:
+        result = run_benchmark(event_loop, args.messages, args.warm_up)
+        if result is None:
+            print(f"{event_loop:<10}  not installed, skipped")
+            continue
+        print(
+            f"{event_loop:<10}"
+            + "".join(f"{value * 1e6:>10.1f}" for value in result.values())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Dispatches the requests of the SECCs to the handlers of the EVSE controller's
+operations (see controller_wire.OPERATIONS), registered by decorator:
+
+    dispatcher = Dispatcher()
+
+    @dispatcher.handler("get_evse_id")
+    def get_evse_id(param: dict) -> str:
+        ...
+
+A handler takes the request's parameters and returns the operation's result.
+Coroutine handlers are awaited on the event loop, so they can await CAN or
+other hardware I/O without holding up the other requests. Other handlers run
+in a worker thread, as they may block (e.g. on file I/O).
+
+The number of requests and errors and the latency of each operation are
+counted, see Dispatcher.metrics().
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from iso15118.shared.exceptions import InvalidControllerMessageError
+from iso15118.shared.messages.controller_wire import (
+    OPERATIONS,
+    decode_request,
+    encode_error,
+    encode_reply,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# make error message template
+def make_error_message(error_code: str, error_message: str) -> str:
+    return "ERROR: " + error_code + ":" + error_message
+
+
+@dataclass
+class OperationMetrics:
+    requests: int = 0
+    errors: int = 0
+    # The total and the maximum time (in seconds) taken to serve a request
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def add(self, duration: float, failed: bool):
+        self.requests += 1
+        self.errors += failed
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_latency_ms": 1000 * self.total_time / max(self.requests, 1),
+            "max_latency_ms": 1000 * self.max_time,
+        }
+
+
+class Dispatcher:
+    def __init__(self):
+        self.handlers: Dict[str, Callable] = {}
+        self._metrics: Dict[str, OperationMetrics] = {}
+
+    def handler(self, *operations: str) -> Callable[[Callable], Callable]:
+        """Registers the decorated function as handler of the operations"""
+
+        def register(handler: Callable) -> Callable:
+            for operation in operations:
+                if operation not in OPERATIONS:
+                    raise ValueError(f"Unknown EVSE controller operation {operation}")
+                if operation in self.handlers:
+                    raise ValueError(f"Handler of {operation} already registered")
+                self.handlers[operation] = handler
+            return handler
+
+        return register
+
+    async def call(self, handler: Callable, params: dict) -> Any:
+        """
+        Calls the handler with the parameters, off the event loop unless it's
+        a coroutine function
+        """
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(params)
+        return await asyncio.get_running_loop().run_in_executor(None, handler, params)
+
+    async def dispatch(self, request: bytes) -> bytes:
+        """Serves the encoded request, returns the encoded reply"""
+        try:
+            operation, state, params = decode_request(request)
+        except InvalidControllerMessageError as exc:
+            logger.warning(f"Invalid request: {exc}")
+            return encode_error(None, make_error_message("2", str(exc)))
+
+        handler = self.handlers.get(operation)
+        if handler is None:
+            logger.warning(f"{operation} not implemented")
+            return encode_error(operation, make_error_message("0", "NOT IMPLEMENTED"))
+
+        started_at = time.perf_counter()
+        try:
+            result = await self.call(handler, params)
+            reply = encode_reply(operation, result)
+        except Exception as exc:
+            logger.exception(f"{operation} failed in state {state}")
+            reply = encode_error(operation, make_error_message("1", str(exc)))
+            failed = True
+        else:
+            logger.debug(f"{operation} served in state {state}")
+            failed = False
+        self._metrics.setdefault(operation, OperationMetrics()).add(
+            time.perf_counter() - started_at, failed
+        )
+        return reply
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """The number of requests and errors and the latency per operation"""
+        return {
+            operation: metrics.as_dict()
+            for operation, metrics in sorted(self._metrics.items())
+        }
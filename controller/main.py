@@ -1,19 +1,26 @@
 """ imports in here """
+import asyncio
 import logging
 import os
-from typing import Optional
+from typing import List, Optional
 import pickle
 import zmq
+import zmq.asyncio
 from dotenv import load_dotenv
 import can
 
+from controller.dispatcher import Dispatcher
 from controller.Messages import PreCharge, ChargeLoop, InsulationTest
 from iso15118.shared.messages.datatypes import EVSEStatus, DCEVSEStatus, PVEVSEMaxPowerLimit, PVEVSEMaxCurrentLimit, \
     PVEVSEMaxVoltageLimit, PVEVSEPresentCurrent, PVEVSEPresentVoltage, PVEVSEPeakCurrentRipple, PVEVSEMinVoltageLimit, \
     PVEVSEMinCurrentLimit, DCEVSEChargeParameter, PVEVTargetVoltage, PVEVTargetCurrent
-from iso15118.shared.messages.enums import EnergyTransferModeEnum, Contactor
+from iso15118.shared.logging import _init_logger
+from iso15118.shared.messages.controller_wire import encode_update
+from iso15118.shared.messages.enums import AuthorizationStatus, EnergyTransferModeEnum, Contactor
 from iso15118.shared.messages.iso15118_20.common_messages import ScheduledScheduleExchangeResParams
 from iso15118.shared.messages.datatypes import IsolationLevel, DCEVSEStatusCode, EVSENotification
+from iso15118.shared.messages.iso15118_20.common_types import EVSENotification as EVSENotificationV20
+from iso15118.shared.messages.iso15118_20.common_types import EVSEStatus as EVSEStatusV20
 from iso15118.shared.messages.iso15118_20.common_types import RationalNumber
 from iso15118.shared.messages.iso15118_20.dc import DCChargeParameterDiscoveryResParams, \
     BPTDCChargeParameterDiscoveryResParams
@@ -21,75 +28,95 @@ from iso15118.shared.messages.iso15118_20.dc import DCChargeParameterDiscoveryRe
 import utils
 
 load_dotenv()
+# the handlers and the periodic metrics log to stdout, at LOG_LEVEL
+_init_logger()
 logger = logging.getLogger(__name__)
 
-context = zmq.Context()
-socket = context.socket(zmq.REP)
+# the handlers of the SECC's requests, registered with @dispatcher.handler()
+dispatcher = Dispatcher()
+
+# A ROUTER socket, so that the requests of all sessions (each tagged with a
+# request ID by the SECC's DEALER socket) are served concurrently
+context = zmq.asyncio.Context()
+socket = context.socket(zmq.ROUTER)
 socket.bind(os.environ.get('ZMQ_FOR_CP_AND_V2G'))
+# A PUB socket on which the results of the cacheable operations are published,
+# so that the SECC serves them from its state cache
+publisher = None
+if os.environ.get('ZMQ_FOR_CONTROLLER_UPDATES'):
+    publisher = context.socket(zmq.PUB)
+    publisher.bind(os.environ.get('ZMQ_FOR_CONTROLLER_UPDATES'))
+# the state is checked for changes every STATE_CHECK_INTERVAL seconds and
+# republished every PUBLISH_INTERVAL seconds (below the SECC's
+# CONTROLLER_STATE_MAX_AGE), which also serves SECCs that subscribed later
+STATE_CHECK_INTERVAL = 0.1
+PUBLISH_INTERVAL = float(os.environ.get('CONTROLLER_PUBLISH_INTERVAL', 1.0))
+# the per operation request metrics are logged every METRICS_INTERVAL seconds
+METRICS_INTERVAL = float(os.environ.get('CONTROLLER_METRICS_INTERVAL', 60.0))
 InterfaceBus = can.Bus(
     interface='socketcan',
     channel='vcan0'
 )
 
 
-def open_contactor(param: dict) -> bytes:
+@dispatcher.handler("open_contactor")
+def open_contactor(param: dict) -> Contactor:
     logger.info("Contactor is {}".format(Contactor.OPENED))
     pickle.dump(Contactor.OPENED, open(os.environ.get('CONTACTOR_STATUS_CODE'), 'wb'))
-    return pickle.dumps(Contactor.OPENED, fix_imports=True)
+    return Contactor.OPENED
 
 
-def close_contactor(param: dict) -> bytes:
+@dispatcher.handler("close_contactor")
+def close_contactor(param: dict) -> Contactor:
     logger.info("Contactor is {}".format(Contactor.CLOSED))
     pickle.dump(Contactor.CLOSED, open(os.environ.get('CONTACTOR_STATUS_CODE'), 'wb'))
-    return pickle.dumps(Contactor.CLOSED, fix_imports=True)
+    return Contactor.CLOSED
 
 
-def get_contactor_state(param: dict) -> bytes:
+@dispatcher.handler("get_contactor_state")
+def get_contactor_state(param: dict) -> Contactor:
     status = pickle.load(open(os.environ.get('CONTACTOR_STATUS_CODE'), 'rb'))
     # TODO: change it to be really status
     if status == Contactor.CLOSED:
-        return pickle.dumps(Contactor.CLOSED, fix_imports=True)
-    return pickle.dumps(Contactor.OPENED, fix_imports=True)
-    # return pickle.dumps(Contactor.CLOSED)
+        return Contactor.CLOSED
+    return Contactor.OPENED
+    # return Contactor.CLOSED
 
 
 # send charge command
-def send_charging_command(param: dict) -> None:
-    print(param.get('soc'))
+@dispatcher.handler("send_charging_command")
+async def send_charging_command(param: dict) -> None:
     soc = param.get('soc')
     vr, cr = utils.decode_voltage_and_current(param)
-    print(f"Bus send Voltage: {vr} , Current: {cr} SOC: {soc}")
+    logger.debug(f"Bus send Voltage: {vr} , Current: {cr} SOC: {soc}")
     # pc = ChargeLoop(InterfaceBus, vr, cr, soc)
 
 
-# make error message template
-def make_error_message(error_code: str, error_message: str) -> str:
-    return "ERROR: " + error_code + ":" + error_message
-
-
 # handle get_evse_id message
-def get_evse_id(protocol: dict) -> bytes:
-    logger.info("get_evse_id Called")
+@dispatcher.handler("get_evse_id")
+def get_evse_id(protocol: dict) -> str:
     if protocol.get('protocol') == "DIN":
-        return pickle.dumps(os.environ.get("EVSE_ID"))
+        return os.environ.get("EVSE_ID")
     else:
-        return pickle.dumps(os.environ.get("EVSE_ID"))
+        return os.environ.get("EVSE_ID")
 
 
 # handle get_supported_energy_transfer_modes message
-def get_supported_energy_transfer_modes(protocol: dict) -> bytes:
-    logger.info("get_supported_energy_transfer_modes Called")
+@dispatcher.handler("get_supported_energy_transfer_modes")
+def get_supported_energy_transfer_modes(protocol: dict) -> List[EnergyTransferModeEnum]:
     if protocol.get('protocol') == "DIN":
-        return pickle.dumps([EnergyTransferModeEnum.DC_COMBO_CORE])
+        return [EnergyTransferModeEnum.DC_COMBO_CORE]
     else:
-        return pickle.dumps([EnergyTransferModeEnum.DC_EXTENDED])
+        return [EnergyTransferModeEnum.DC_EXTENDED]
 
 
 # handle cp_thead message
-def cp_thead_message_handler(message: dict) -> bytes:
+@dispatcher.handler("cp_thead")
+def cp_thead_message_handler(param: dict) -> str:
+    message = param.get('message')
     if message == "":
-        return pickle.dumps("not_set")
-    return pickle.dumps(message)
+        return "not_set"
+    return message
 
 
 # TODO: implement this
@@ -97,59 +124,67 @@ def get_scheduled_se_params(message: dict) -> Optional[ScheduledScheduleExchange
     pass
 
 
-# handle is_authorised message
-def is_authorised(message: dict) -> bytes:
-    return pickle.dumps(True)
+# handle is_authorized message
+@dispatcher.handler("is_authorized")
+def is_authorized(message: dict) -> AuthorizationStatus:
+    return AuthorizationStatus.ACCEPTED
 
 
 # handle get_dc_evse_status message
-def get_dc_evse_status(param: dict) -> bytes:
+@dispatcher.handler("get_dc_evse_status")
+def get_dc_evse_status(param: dict) -> DCEVSEStatus:
     if get_state({'null': 'null'}):
-        return pickle.dumps(DCEVSEStatus(
+        return DCEVSEStatus(
             evse_notification=EVSENotification.NONE,
             notification_max_delay=0,
             evse_isolation_status=IsolationLevel.VALID,
             evse_status_code=DCEVSEStatusCode.EVSE_READY,
-        ))
-    return pickle.dumps(DCEVSEStatus(
+        )
+    return DCEVSEStatus(
         evse_notification=EVSENotification.NONE,
         notification_max_delay=0,
         evse_isolation_status=IsolationLevel.VALID,
         evse_status_code=DCEVSEStatusCode.EVSE_READY,
-    ))
+    )
 
 
-def get_evse_max_voltage_limit(param: dict) -> bytes:
-    return pickle.dumps(PVEVSEMaxVoltageLimit(multiplier=0, value=600, unit="V"))
+@dispatcher.handler("get_evse_max_voltage_limit")
+def get_evse_max_voltage_limit(param: dict) -> PVEVSEMaxVoltageLimit:
+    return PVEVSEMaxVoltageLimit(multiplier=0, value=600, unit="V")
 
 
-def get_evse_max_power_limit(param: dict) -> bytes:
-    return pickle.dumps(PVEVSEMaxPowerLimit(multiplier=1, value=1000, unit="W"))
+@dispatcher.handler("get_evse_max_power_limit")
+def get_evse_max_power_limit(param: dict) -> PVEVSEMaxPowerLimit:
+    return PVEVSEMaxPowerLimit(multiplier=1, value=1000, unit="W")
 
 
-def get_evse_max_current_limit(param: dict) -> bytes:
-    return pickle.dumps(PVEVSEMaxCurrentLimit(multiplier=0, value=300, unit="A"))
+@dispatcher.handler("get_evse_max_current_limit")
+def get_evse_max_current_limit(param: dict) -> PVEVSEMaxCurrentLimit:
+    return PVEVSEMaxCurrentLimit(multiplier=0, value=300, unit="A")
 
 
 # TODO: implement this
-def start_cable_check(param: dict):
+@dispatcher.handler("start_cable_check")
+async def start_cable_check(param: dict) -> None:
     tv = os.environ.get("TEST_VOLTAGE")
     # pc = InsulationTest(InterfaceBus,tv)
-    print(f'Bus send Test Voltage: {tv}')
+    logger.info(f'Bus send Test Voltage: {tv}')
     # pc.SendPeriodic()
 
 
-def set_precharge(param: dict):
+@dispatcher.handler("set_precharge")
+async def set_precharge(param: dict) -> None:
     vr, cr = utils.decode_voltage_and_current(param)
-    print('Bus send Voltage: {vr} , Current: {cr}'.format(vr=vr, cr=cr))
+    logger.info(f'Bus send Voltage: {vr} , Current: {cr}')
     # pc = PreCharge(InterfaceBus, vr, cr)
     # pc.SendPeriodic()
 
 
-def get_evse_status(param: dict) -> bytes:
-    return pickle.dumps(
-        {'notification_max_delay': '0',
-         'evse_notification': 'TERMINATE'})
+@dispatcher.handler("get_evse_status")
+def get_evse_status(param: dict) -> EVSEStatusV20:
+    return EVSEStatusV20(
+        notification_max_delay=0,
+        evse_notification=EVSENotificationV20.TERMINATE)
 
 
 # TODO: implement this
@@ -157,28 +192,59 @@ def get_evese_present_voltage(param: dict):
     pass
 
 
-def is_evse_power_limit_achieved(param: dict) -> bytes:
-    return pickle.dumps(False)
+@dispatcher.handler("is_evse_power_limit_achieved")
+def is_evse_power_limit_achieved(param: dict) -> bool:
+    return False
 
 
-def is_evse_voltage_limit_achieved(param: dict) -> bytes:
-    return pickle.dumps(False)
+@dispatcher.handler("is_evse_voltage_limit_achieved")
+def is_evse_voltage_limit_achieved(param: dict) -> bool:
+    return False
 
 
-def is_evse_current_limit_achieved(param: dict) -> bytes:
-    return pickle.dumps(False)
+@dispatcher.handler("is_evse_current_limit_achieved")
+def is_evse_current_limit_achieved(param: dict) -> bool:
+    return False
 
 
-def get_evse_present_current(param: dict) -> bytes:
-    return pickle.dumps(PVEVSEPresentCurrent(multiplier=0, value=1, unit="A"))
+@dispatcher.handler("get_evse_present_current")
+def get_evse_present_current(param: dict) -> PVEVSEPresentCurrent:
+    return PVEVSEPresentCurrent(multiplier=0, value=1, unit="A")
 
 
-def get_evse_present_voltage(param: dict) -> bytes:
-    return pickle.dumps(PVEVSEPresentVoltage(multiplier=0, value=230, unit="V"))
+@dispatcher.handler("get_evse_present_voltage")
+def get_evse_present_voltage(param: dict) -> PVEVSEPresentVoltage:
+    return PVEVSEPresentVoltage(multiplier=0, value=230, unit="V")
 
 
-def get_dc_evse_charge_parameter(param: dict) -> bytes:
-    return pickle.dumps(DCEVSEChargeParameter(
+# handle get_dc_charge_loop_snapshot message: the charging command and all
+# EVSE values of a CurrentDemandRes in a single request/reply
+@dispatcher.handler("get_dc_charge_loop_snapshot")
+async def get_dc_charge_loop_snapshot(param: dict) -> dict:
+    await send_charging_command(param)
+    getters = {
+        'dc_evse_status': get_dc_evse_status,
+        'evse_present_voltage': get_evse_present_voltage,
+        'evse_present_current': get_evse_present_current,
+        'evse_current_limit_achieved': is_evse_current_limit_achieved,
+        'evse_voltage_limit_achieved': is_evse_voltage_limit_achieved,
+        'evse_power_limit_achieved': is_evse_power_limit_achieved,
+        'evse_max_voltage_limit': get_evse_max_voltage_limit,
+        'evse_max_current_limit': get_evse_max_current_limit,
+        'evse_max_power_limit': get_evse_max_power_limit,
+        'evse_id': get_evse_id,
+    }
+    # the getters may block (e.g. on file or hardware I/O), so they're called
+    # like the handlers of their own requests, off the event loop
+    values = await asyncio.gather(
+        *(dispatcher.call(getter, param) for getter in getters.values())
+    )
+    return dict(zip(getters, values))
+
+
+@dispatcher.handler("get_dc_evse_charge_parameter")
+def get_dc_evse_charge_parameter(param: dict) -> DCEVSEChargeParameter:
+    return DCEVSEChargeParameter(
         dc_evse_status=DCEVSEStatus(
             notification_max_delay=100,
             evse_notification=EVSENotification.NONE,
@@ -203,12 +269,13 @@ def get_dc_evse_charge_parameter(param: dict) -> bytes:
         evse_peak_current_ripple=PVEVSEPeakCurrentRipple(
             multiplier=1, value=4, unit="A"
         ),
-    ))
+    )
 
 
 # handle get_dc_evse_charge_parameter message
-def get_dc_charge_params_v20(param: dict) -> bytes:
-    return pickle.dumps(DCChargeParameterDiscoveryResParams(
+@dispatcher.handler("get_dc_charge_params_v20")
+def get_dc_charge_params_v20(param: dict) -> DCChargeParameterDiscoveryResParams:
+    return DCChargeParameterDiscoveryResParams(
         evse_max_charge_power=RationalNumber(exponent=3, value=300),
         evse_min_charge_power=RationalNumber(exponent=0, value=100),
         evse_max_charge_current=RationalNumber(exponent=0, value=300),
@@ -217,12 +284,12 @@ def get_dc_charge_params_v20(param: dict) -> bytes:
         evse_min_voltage=RationalNumber(exponent=0, value=10),
         evse_power_ramp_limit=RationalNumber(exponent=0, value=10),
     )
-    )
 
 
 # handle get_dc_bpt_charge_params_v20 message
-def get_dc_bpt_charge_params_v20(param: dict) -> bytes:
-    return pickle.dumps(BPTDCChargeParameterDiscoveryResParams(
+@dispatcher.handler("get_dc_bpt_charge_params_v20")
+def get_dc_bpt_charge_params_v20(param: dict) -> BPTDCChargeParameterDiscoveryResParams:
+    return BPTDCChargeParameterDiscoveryResParams(
         evse_max_charge_power=RationalNumber(exponent=3, value=300),
         evse_min_charge_power=RationalNumber(exponent=0, value=100),
         evse_max_charge_current=RationalNumber(exponent=0, value=300),
@@ -234,142 +301,83 @@ def get_dc_bpt_charge_params_v20(param: dict) -> bytes:
         evse_max_discharge_current=RationalNumber(exponent=0, value=11),
         evse_min_discharge_current=RationalNumber(exponent=0, value=0),
     )
-    )
 
 
+@dispatcher.handler("get_state")
 def get_state(param: dict) -> None:
-    print('state is : {}'.format(param.get('state')))
+    logger.info(f"state is : {param.get('state')}")
+
+
+@dispatcher.handler("starting", "finally")
+def session_event(param: dict) -> None:
+    pass
+
+
+# the published cacheable operations and their parameters
+PUBLISHED_STATE = [
+    ("get_evse_id", get_evse_id, {'protocol': "DIN"}),
+    ("get_evse_id", get_evse_id, {'protocol': "ISO"}),
+    ("get_supported_energy_transfer_modes", get_supported_energy_transfer_modes, {'protocol': "DIN"}),
+    ("get_supported_energy_transfer_modes", get_supported_energy_transfer_modes, {'protocol': "ISO"}),
+    ("get_supported_energy_transfer_modes", get_supported_energy_transfer_modes, {'protocol': "ISO_20"}),
+    ("get_dc_evse_charge_parameter", get_dc_evse_charge_parameter, {}),
+    ("get_evse_max_voltage_limit", get_evse_max_voltage_limit, {}),
+    ("get_evse_max_current_limit", get_evse_max_current_limit, {}),
+    ("get_evse_max_power_limit", get_evse_max_power_limit, {}),
+    ("get_dc_charge_params_v20", get_dc_charge_params_v20, {}),
+    ("get_dc_bpt_charge_params_v20", get_dc_bpt_charge_params_v20, {}),
+]
+
+
+def read_state() -> list:
+    return [(operation, params, handler(params)) for operation, handler, params in PUBLISHED_STATE]
+
+
+# publish the values that changed, and all of them every PUBLISH_INTERVAL
+async def publish_state() -> None:
+    loop = asyncio.get_running_loop()
+    published = {}
+    published_all_at = None
+    while True:
+        state = await loop.run_in_executor(None, read_state)
+        publish_all = published_all_at is None or loop.time() - published_all_at >= PUBLISH_INTERVAL
+        for operation, params, value in state:
+            key = (operation, tuple(params.items()))
+            if publish_all or published.get(key) != value:
+                await publisher.send(encode_update(operation, params, value))
+                published[key] = value
+        if publish_all:
+            published_all_at = loop.time()
+        await asyncio.sleep(STATE_CHECK_INTERVAL)
+
+
+# serve a request, concurrently with the requests of the other sessions
+async def serve_request(frames: list) -> None:
+    # a DEALER's request is [identity, b"", request ID, request], a REQ's
+    # [identity, b"", request]. The reply is sent with the same envelope.
+    envelope, request = frames[:-1], frames[-1]
+    rsp: bytes = await dispatcher.dispatch(request)
+    await socket.send_multipart(envelope + [rsp])
+
+
+async def log_metrics() -> None:
+    while True:
+        await asyncio.sleep(METRICS_INTERVAL)
+        for operation, metrics in dispatcher.metrics().items():
+            logger.info(f"{operation}: {metrics}")
 
 
-def main():
+async def main():
+    tasks = {asyncio.create_task(log_metrics())}
+    if publisher is not None:
+        tasks.add(asyncio.create_task(publish_state()))
     while True:
-        message: dict = pickle.loads(socket.recv())
-        stage = message.get('stage')
-        message: bytes = message.get('messages')
-        if stage == "get_evse_id":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_id(msg)
-            print(f"get_evse_id:  Called")
-            socket.send(rsp)
-        elif stage == "cp_thead":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = cp_thead_message_handler(msg)
-            print(f"cp_thead_message_handler:  Called")
-            socket.send(rsp)
-        elif stage == "get_supported_energy_transfer_modes":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_supported_energy_transfer_modes(msg)
-            print(f"get_supported_energy_transfer_modes: Called")
-            socket.send(rsp)
-        elif stage == "is_authorised":
-            message: dict = pickle.loads(message)
-            rsp: bytes = is_authorised(message)
-            print(f"is_authorised: Called")
-            socket.send(rsp)
-        elif stage == "get_evse_status":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_status(msg)
-            print(f"get_evse_status: Called")
-            socket.send(rsp)
-        elif stage == "get_dc_evse_status":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_dc_evse_status(msg)
-            print(f"get_dc_evse_status: Called")
-            socket.send(rsp)
-        elif stage == "get_evse_max_power_limit":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_max_power_limit(msg)
-            print(f"get_evse_max_power_limit: Called")
-            socket.send(rsp)
-        elif stage == "get_evse_max_voltage_limit":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_max_voltage_limit(msg)
-            print(f"get_evse_max_voltage_limit: Called")
-            socket.send(rsp)
-        elif stage == "get_evse_max_current_limit":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_max_current_limit(msg)
-            print(f"get_evse_max_current_limit: Called")
-            socket.send(rsp)
-        elif stage == "is_evse_power_limit_achieved":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = is_evse_power_limit_achieved(msg)
-            print(f"is_evse_power_limit_achieved: Called")
-            socket.send(rsp)
-        elif stage == "is_evse_voltage_limit_achieved":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = is_evse_voltage_limit_achieved(msg)
-            print(f"is_evse_voltage_limit_achieved: Called")
-            socket.send(rsp)
-        elif stage == "is_evse_current_limit_achieved":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = is_evse_current_limit_achieved(msg)
-            print(f"is_evse_current_limit_achieved: Called")
-            socket.send(rsp)
-        elif stage == "start_cable_check":
-            msg: dict = pickle.loads(message)
-            _: bytes = start_cable_check(msg)
-            socket.send(b"start_cable_check: Called")
-        elif stage == "get_evse_present_current":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_present_current(msg)
-            print(f"get_evse_present_current: Called")
-            socket.send(rsp)
-        elif stage == "get_evse_present_voltage":
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_evse_present_voltage(msg)
-            print(f"get_evse_present_voltage: Called")
-            socket.send(rsp)
-        elif stage == 'get_dc_evse_charge_parameter':
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_dc_evse_charge_parameter(msg)
-            print(f"get_dc_evse_charge_parameter: Called")
-            socket.send(rsp)
-        elif stage == 'get_dc_charge_params_v20':
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_dc_charge_params_v20(msg)
-            print(f"get_dc_charge_params_v20: Called")
-            socket.send(rsp)
-        elif stage == 'get_dc_bpt_charge_params_v20':
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_dc_bpt_charge_params_v20(msg)
-            print(f"get_dc_bpt_charge_params_v20: Called")
-            socket.send(rsp)
-        elif stage == 'close_contactor':
-            msg: dict = pickle.loads(message)
-            rsp: bytes = close_contactor(msg)
-            print(f"close_contactor: {pickle.loads(rsp)}")
-            socket.send(rsp)
-        elif stage == 'open_contactor':
-            msg: dict = pickle.loads(message)
-            rsp: bytes = open_contactor(msg)
-            print(f"open_contactor: {pickle.loads(rsp)}")
-            socket.send(rsp)
-        elif stage == 'get_contactor_state':
-            msg: dict = pickle.loads(message)
-            rsp: bytes = get_contactor_state(msg)
-            print(f"get_contactor_state: {pickle.loads(rsp)}")
-            socket.send(rsp)
-        elif stage == 'set_precharge':
-            msg: dict = pickle.loads(message)
-            set_precharge(msg)
-            print(f"set_precharge: Called")
-            socket.send(bytes('ok', 'utf-8'))
-        elif stage == 'send_charging_command':
-            msg: dict = pickle.loads(message)
-            send_charging_command(msg)
-            print(f"send_charging_command: Called")
-            socket.send(bytes('ok', 'utf-8'))
-        elif stage == 'get_state':
-            msg: dict = pickle.loads(message)
-            get_state(msg)
-            print(f"get_status: {msg.get('state')}")
-            socket.send(bytes('ok', 'utf-8'))
-        else:
-            res: bytes = pickle.dumps(make_error_message("0", "NOT IMPLEMENTED"))
-            socket.send(res)
-        # time.sleep(0.01)
+        frames: list = await socket.recv_multipart()
+        task = asyncio.create_task(serve_request(frames))
+        # keep a reference until the request is served
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -57,6 +57,7 @@ from iso15118.shared.notifications import (
     StopNotification,
     UDPPacketNotification,
 )
+from iso15118.shared.settings import EXI_WARM_UP
 from iso15118.shared.utils import cancel_task, wait_for_tasks
 
 logger = logging.getLogger(__name__)
@@ -215,7 +216,7 @@ class EVCCCommunicationSession(V2GCommunicationSession):
         v2gtp_msg = V2GTPMessage(
             Protocol.UNKNOWN,
             ISOV2PayloadTypes.EXI_ENCODED,
-            EXI().to_exi(sap_req, Namespace.SAP),
+            await EXI().to_exi_async(sap_req, Namespace.SAP),
         )
         self.current_state.next_msg = sap_req
         await self.send(v2gtp_msg)
@@ -285,6 +286,11 @@ class CommunicationSessionHandler:
         async def __init__. Therefore, we need to create a separate async
         method to be our constructor.
         """
+        # The grammars are loaded before SDP starts, instead of while the first
+        # SupportedAppProtocolReq waits for its response
+        if EXI_WARM_UP:
+            await EXI().warm_up()
+
         self.udp_client = UDPClient(self._rcv_queue, self.config.iface)
         self.list_of_tasks = [
             self.udp_client.start(),
@@ -4,10 +4,11 @@ from dataclasses import dataclass
 from typing import List, Optional
 
 import environs
-from marshmallow.validate import Range
+from marshmallow.validate import OneOf, Range
 
 from iso15118.shared.messages.enums import UINT_16_MAX, Protocol
 from iso15118.shared.network import validate_nic
+from iso15118.shared.utils import EVENT_LOOPS
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,8 @@ class Config:
     enforce_tls: bool = False
     supported_protocols: Optional[List[Protocol]] = None
     max_supporting_points: Optional[int] = None
+    # The event loop implementation, one of EVENT_LOOPS
+    event_loop: str = "asyncio"
 
     def load_envs(self, env_path: Optional[str] = None) -> None:
         """
@@ -89,6 +92,12 @@ class Config:
             "MAX_SUPPORTING_POINTS", default=1024, validate=Range(min=0, max=1024)
         )
 
+        # The event loop implementation the EVCC runs on, either 'asyncio' or
+        # 'uvloop' (which falls back to 'asyncio' if uvloop isn't installed)
+        self.event_loop = env.str(
+            "EVENT_LOOP", default="asyncio", validate=OneOf(EVENT_LOOPS)
+        )
+
         env.seal()  # raise all errors at once, if any
 
 
@@ -3,7 +3,9 @@ import logging
 
 from iso15118.evcc import EVCCHandler
 from iso15118.evcc.controller.simulator import SimEVController
+from iso15118.evcc.evcc_settings import Config
 from iso15118.shared.exificient_exi_codec import ExificientEXICodec
+from iso15118.shared.utils import install_event_loop_policy
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,9 @@ async def main():
 
 
 def run():
+    config = Config()
+    config.load_envs()
+    install_event_loop_policy(config.event_loop)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
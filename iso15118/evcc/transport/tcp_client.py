@@ -3,7 +3,7 @@ import logging
 import socket
 from ipaddress import IPv6Address
 
-from iso15118.shared.security import get_ssl_context
+from iso15118.shared.security import get_shared_ssl_context, record_client_handshake
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,8 @@ class TCPClient(asyncio.Protocol):
         self._last_message_sent = None
         self.ssl_context = None
         if is_tls:
-            self.ssl_context = get_ssl_context(False)
+            # Shared, so that its cached TLS sessions can be resumed
+            self.ssl_context = get_shared_ssl_context(False)
 
     @staticmethod
     async def create(
@@ -56,4 +57,9 @@ class TCPClient(asyncio.Protocol):
         except Exception as exc:
             raise exc
 
+        if self.ssl_context:
+            record_client_handshake(
+                self.writer.get_extra_info("ssl_object"), full_host_address
+            )
+
         return self
@@ -1,12 +1,17 @@
 import logging
 from optparse import Option
-from typing import Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
 from iso15118.secc.comm_session_handler import CommunicationSessionHandler
 from iso15118.secc.controller.interface import EVSEControllerInterface
+from iso15118.secc.paused_sessions import PausedSessionStore
 from iso15118.secc.secc_settings import Config
+from iso15118.shared.exi_codec import EXI
 from iso15118.shared.iexi_codec import IEXICodec
 from iso15118.shared.logging import _init_logger
+from iso15118.shared.security import tls_handshake_metrics
+from iso15118.shared.settings import EXI_WARM_UP
+from iso15118.shared.utils import wait_for_tasks
 
 _init_logger()
 logger = logging.getLogger(__name__)
@@ -36,3 +41,87 @@ class SECCHandler(CommunicationSessionHandler):
             # Re-raise so the process ends with a non-zero exit code and the
             # watchdog can restart the service
             raise
+
+
+class MultiConnectorSECCHandler:
+    """
+    Serves all connectors configured with CONNECTORS from a single process.
+    Each connector gets its own CommunicationSessionHandler, bound to the
+    connector's network interface and with its own EVSE controller, while all
+    of them share the event loop, the EXI codec (ideally an EXICodecPool) and
+    the cached certificates and keys of the PKI.
+    """
+
+    def __init__(
+        self,
+        exi_codec: IEXICodec,
+        evse_controller_factory: Callable[[Config], Awaitable[EVSEControllerInterface]],
+        env_path: Optional[str] = None,
+        connectors: Optional[List[Tuple[str, str]]] = None,
+        worker_index: Optional[int] = None,
+    ):
+        self.config = Config()
+        self.config.load_envs(env_path)
+        if connectors is not None:
+            # A subset of the configured connectors, e.g. the shard of a
+            # supervisor worker process
+            self.config.connectors = connectors
+        if worker_index is not None and self.config.paused_sessions_path:
+            # The worker processes of a supervisor don't share their paused
+            # sessions, so each persists them to its own file
+            self.config.paused_sessions_path += f".{worker_index}"
+        if not self.config.connectors:
+            raise ValueError(
+                "No connectors configured. Configure them in the .env file "
+                "with key 'CONNECTORS' or use the SECCHandler instead"
+            )
+        self.exi_codec = exi_codec
+        # Creates the EVSE controller of a connector, given its configuration
+        self.evse_controller_factory = evse_controller_factory
+        self.handlers: List[CommunicationSessionHandler] = []
+        # An EV may resume its paused session at another connector
+        self.paused_sessions = PausedSessionStore(
+            self.config.paused_session_ttl,
+            self.config.paused_sessions_max,
+            self.config.paused_sessions_path,
+        )
+
+    async def start(self):
+        try:
+            for connector_config in self.config.connector_configs():
+                evse_controller = await self.evse_controller_factory(connector_config)
+                handler = CommunicationSessionHandler(
+                    connector_config,
+                    self.exi_codec,
+                    evse_controller,
+                    self.paused_sessions,
+                )
+                handler.warm_up_exi_codec = False
+                self.handlers.append(handler)
+
+            if EXI_WARM_UP:
+                await EXI().warm_up()
+
+            await wait_for_tasks(
+                [handler.start_session_handler() for handler in self.handlers]
+            )
+        except Exception as exc:
+            logger.error(f"Multi-connector SECC terminated: {exc}")
+            raise
+
+    def metrics(self) -> Dict[str, int]:
+        """Counters of this process, e.g. to be aggregated by a supervisor"""
+        exi = EXI()
+        handler_metrics: Dict[str, int] = {}
+        for handler in self.handlers:
+            for name, value in handler.metrics().items():
+                handler_metrics[name] = handler_metrics.get(name, 0) + value
+        return {
+            "connectors": len(self.handlers),
+            "sessions": sum(len(handler.comm_sessions) for handler in self.handlers),
+            "paused_sessions": len(self.paused_sessions),
+            "exi_cache_hits": exi.cache.hits,
+            "exi_cache_misses": exi.cache.misses,
+            **handler_metrics,
+            **tls_handshake_metrics(server_side=True),
+        }
@@ -12,23 +12,24 @@ at once, i.e. creating, storing, and deleting those sessions as needed.
 
 import asyncio
 import logging
-import pickle
 import socket
 from asyncio.streams import StreamReader, StreamWriter
 from typing import Dict, List, Optional, Tuple, Union
 
 from iso15118.secc.controller.interface import EVSEControllerInterface
-from iso15118.secc.failed_responses import (
-    init_failed_responses_din_spec_70121,
-    init_failed_responses_iso_v2,
-    init_failed_responses_iso_v20,
-)
+from iso15118.secc.paused_sessions import PausedSession, PausedSessionStore
 from iso15118.secc.secc_settings import Config
+from iso15118.secc.transport.sdp_responder import SDPResponder
 from iso15118.secc.transport.tcp_server import TCPServer
 from iso15118.secc.transport.udp_server import UDPServer
-from iso15118.shared.messages.zmq_handler import ZMQHandler
 from iso15118.shared.comm_session import V2GCommunicationSession
-from iso15118.shared.exceptions import InvalidSDPRequestError, InvalidV2GTPMessageError
+from iso15118.shared.exceptions import (
+    ControllerConnectionError,
+    ControllerRequestError,
+    ControllerTimeoutError,
+    InvalidSDPRequestError,
+    InvalidV2GTPMessageError,
+)
 from iso15118.shared.exi_codec import EXI
 from iso15118.shared.iexi_codec import IEXICodec
 from iso15118.shared.messages.enums import (
@@ -54,9 +55,10 @@ from iso15118.shared.notifications import (
     TCPClientNotification,
     UDPPacketNotification,
 )
+from iso15118.shared.rcv_queue import create_rcv_queue
+from iso15118.shared.settings import EXI_WARM_UP
 from iso15118.shared.utils import cancel_task, wait_for_tasks
 
-from iso15118.shared.messages.zmq_handler import message_maker
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +75,7 @@ class SECCCommunicationSession(V2GCommunicationSession):
             session_handler_queue: asyncio.Queue,
             config: Config,
             evse_controller: EVSEControllerInterface,
+            paused_sessions: Optional[PausedSessionStore] = None,
     ):
         # Need to import here to avoid a circular import error
         # pylint: disable=import-outside-toplevel
@@ -85,6 +88,14 @@ class SECCCommunicationSession(V2GCommunicationSession):
         self.config = config
         # The EVSE controller that implements the interface EVSEControllerInterface
         self.evse_controller = evse_controller
+        # Where the session is kept when paused, so it can be resumed later
+        self.paused_sessions = paused_sessions
+        # The paused session this session resumed, if any. Its values allow to
+        # skip the verification of an unchanged contract certificate chain,
+        # the authorization, and the schedule negotiation
+        self.resumed_session: Optional[PausedSession] = None
+        # Whether the EVSE controller authorized the session
+        self.authorized: bool = False
         # The authorization option(s) offered with ServiceDiscoveryRes in
         # ISO 15118-2 and with AuthorizationSetupRes in ISO 15118-20
         self.offered_auth_options: Optional[List[AuthEnum]] = []
@@ -113,12 +124,6 @@ class SECCCommunicationSession(V2GCommunicationSession):
         # the AuthorizationReq's signature
         # TODO Add support for ISO 15118-20 CertificateChain
         self.contract_cert_chain: Optional[CertificateChainV2] = None
-        # Initialise the failed possible responses per request message for a
-        # faster lookup later when needed
-        self.failed_responses_din_spec = init_failed_responses_din_spec_70121()
-        self.failed_responses_isov2 = init_failed_responses_iso_v2()
-        self.failed_responses_isov20 = init_failed_responses_iso_v20()
-        # self.failed_responses_isov20 = init_failed_responses_iso_v20()
         # The MeterInfo value the EVCC send in the ChargingStatusRes or ,
         # CurrentDemandRes. The SECC must send a copy in the MeteringReceiptReq
         # TODO Add support for ISO 15118-20 MeterInfo
@@ -126,8 +131,56 @@ class SECCCommunicationSession(V2GCommunicationSession):
         self.is_tls = self._is_tls(transport)
 
     def save_session_info(self):
-        # TODO make sure to not delete the comm session object
-        pass
+        """
+        Keeps the values needed to resume this session in the store of paused
+        sessions, according to section 8.4.2 in ISO 15118-2. Only ISO 15118-2
+        sessions are paused and resumed, sessions of other protocols aren't
+        kept.
+        """
+        if self.paused_sessions is None:
+            return
+        if self.protocol != Protocol.ISO_15118_2:
+            logger.debug(
+                f"Session {self.session_id} not kept for resumption, "
+                f"pausing isn't supported with {self.protocol}"
+            )
+            return
+        self.paused_sessions.put(PausedSession.from_comm_session(self))
+        logger.info(f"Paused session {self.session_id}")
+
+    def resume_paused_session(
+        self, session_id: str, evcc_id: Union[bytes, str]
+    ) -> bool:
+        """
+        Takes over the values of the paused session with the given session ID,
+        if there is one and it was paused by the same EVCC.
+        Returns True if the session was resumed.
+        """
+        if self.paused_sessions is None:
+            return False
+        paused_session = self.paused_sessions.pop(session_id)
+        if not paused_session or paused_session.protocol != self.protocol:
+            return False
+        if paused_session.evcc_id != evcc_id:
+            logger.warning(
+                f"EVCC {evcc_id} tried to resume session {session_id} "
+                "paused by another EVCC"
+            )
+            return False
+
+        self.session_id = paused_session.session_id
+        self.selected_auth_option = paused_session.selected_auth_option
+        self.selected_services = paused_session.selected_services
+        self.selected_energy_mode = paused_session.selected_energy_mode
+        self.selected_charging_type_is_ac = (
+            paused_session.selected_charging_type_is_ac
+        )
+        self.selected_schedule = paused_session.selected_schedule
+        self.offered_schedules = paused_session.offered_schedules
+        self.contract_cert_chain = paused_session.contract_cert_chain
+        self.resumed_session = paused_session
+        logger.info(f"Resumed paused session {session_id}")
+        return True
 
     def _is_tls(self, transport: Tuple[StreamReader, StreamWriter]) -> bool:
         """
@@ -156,28 +209,76 @@ class CommunicationSessionHandler:
     # pylint: disable=too-many-instance-attributes
 
     def __init__(
-            self, config: Config, codec: IEXICodec, evse_controller: EVSEControllerInterface
+            self,
+            config: Config,
+            codec: IEXICodec,
+            evse_controller: EVSEControllerInterface,
+            paused_sessions: Optional[PausedSessionStore] = None,
     ):
 
         self.list_of_tasks = []
         self.udp_server = None
         self.tcp_server = None
+        self.sdp_responder = None
         self.config = config
         self.evse_controller = evse_controller
-        self.zmq = ZMQHandler()
+        # The requests to the EVSE controller are multiplexed on the
+        # controller's channel, so there's no need for a socket of our own
+        self.zmq = evse_controller.zmq
+        # Disabled for the connectors of a MultiConnectorSECCHandler, which
+        # warms up the shared EXI codec once for all of them
+        self.warm_up_exi_codec = EXI_WARM_UP
 
         # Set the selected EXI codec implementation
         EXI().set_exi_codec(codec)
 
         # Receiving queue for UDP or TCP packets and session
-        # triggers (e.g. pause/terminate)
-        self._rcv_queue = asyncio.Queue()
+        # triggers (e.g. pause/terminate), bounded per lane
+        self._rcv_queue = create_rcv_queue()
 
         # The comm_sessions dict keys are of type str (the IPv6 address), the
         # values are a tuple containing the SECCCommunicationSession and the
         # associated ayncio.Task object (so we can cancel the task when needed)
         self.comm_sessions: Dict[str, (SECCCommunicationSession, asyncio.Task)] = {}
 
+        # The paused sessions, which may be resumed over a new TCP connection.
+        # Shared by all connectors of a MultiConnectorSECCHandler.
+        if paused_sessions is None:
+            paused_sessions = PausedSessionStore(
+                config.paused_session_ttl,
+                config.paused_sessions_max,
+                config.paused_sessions_path,
+            )
+        self.paused_sessions = paused_sessions
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        The queued and dropped items of the receiving queues, the answered
+        and rate limited SDP requests, the EVSE controller's IPC channel and
+        its state cache
+        """
+        metrics = self._rcv_queue.metrics()
+        metrics.update(self.zmq.metrics())
+        metrics.update(self.evse_controller.state_cache.metrics())
+        if self.sdp_responder:
+            metrics.update(self.sdp_responder.metrics())
+        if self.udp_server:
+            for name, value in self.udp_server.rcv_queue_metrics().items():
+                if name.startswith("datagram"):
+                    metrics[f"udp_{name}"] = value
+        return metrics
+
+    async def notify_controller_session_stopped(self):
+        try:
+            await self.zmq.request("finally")
+        except (
+            ControllerTimeoutError,
+            ControllerConnectionError,
+            ControllerRequestError,
+        ) as exc:
+            # The controller's unavailability mustn't stop the handler
+            logger.warning(f"Couldn't notify EVSE controller of session stop: {exc}")
+
     async def start_session_handler(self):
         """
         This method is necessary, because python does not allow
@@ -186,8 +287,21 @@ class CommunicationSessionHandler:
         constructor.
         """
 
-        self.udp_server = UDPServer(self._rcv_queue, self.config.iface)
+        # The grammars are loaded before SDP starts, instead of while the first
+        # SupportedAppProtocolReq waits for its response
+        if self.warm_up_exi_codec:
+            await EXI().warm_up()
+
+        # With several connectors, each UDP server must only receive the SDP
+        # requests of its own interface
         self.tcp_server = TCPServer(self._rcv_queue, self.config.iface)
+        self.sdp_responder = SDPResponder(self.tcp_server, self.config.enforce_tls)
+        self.udp_server = UDPServer(
+            self._rcv_queue,
+            self.config.iface,
+            bind_to_iface=self.config.connector_id is not None,
+            sdp_responder=self.sdp_responder,
+        )
 
         self.list_of_tasks = [
             self.get_from_rcv_queue(self._rcv_queue),
@@ -198,7 +312,13 @@ class CommunicationSessionHandler:
         if not self.config.enforce_tls:
             self.list_of_tasks.append(self.tcp_server.start_no_tls())
 
-        logger.info("Communication session handler started")
+        if self.config.connector_id is not None:
+            logger.info(
+                "Communication session handler started for connector "
+                f"{self.config.connector_id} at {self.config.iface}"
+            )
+        else:
+            logger.info("Communication session handler started")
 
         await wait_for_tasks(self.list_of_tasks)
 
@@ -237,6 +357,7 @@ class CommunicationSessionHandler:
                             self._rcv_queue,
                             self.config,
                             self.evse_controller,
+                            self.paused_sessions,
                         )
 
                     task = asyncio.create_task(
@@ -247,7 +368,7 @@ class CommunicationSessionHandler:
                     self.comm_sessions[notification.ip_address] = (comm_session, task)
                 elif isinstance(notification, StopNotification):
                     try:
-                        await self.zmq.send_message(message_maker("finally",pickle.dumps("Finally done")))
+                        await self.notify_controller_session_stopped()
                         await cancel_task(
 
                             self.comm_sessions[notification.peer_ip_address][1]
@@ -0,0 +1,134 @@
+"""
+A cache of the EVSE controller's slowly changing state (e.g. the EVSE ID, the
+maximum limits and the charge parameters), so that the SECC doesn't request it
+from the controller for each message of the charge loop.
+
+The controller publishes the results of the cacheable operations (see
+controller_wire.OPERATIONS) on a ZMQ PUB socket whenever they change, and
+republishes them periodically. The cache subscribes to them and serves a
+result as long as it's not older than the maximum age. Results that must be
+fresh, like the present voltage and current or the EVSE status (whose
+isolation status CableCheck polls, and which notifies an emergency shutdown),
+aren't cacheable and are always requested from the controller.
+
+Results requested from the controller are cached as well, so that without a
+publishing controller each result is requested at most once per maximum age.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import zmq
+import zmq.asyncio
+
+from iso15118.shared.exceptions import InvalidControllerMessageError
+from iso15118.shared.messages.controller_wire import OPERATIONS, decode_update
+from iso15118.shared.settings import CONTROLLER_STATE_MAX_AGE
+
+logger = logging.getLogger(__name__)
+
+
+class EVSEStateCache:
+    """
+    Caches the results of the EVSE controller's cacheable operations.
+
+    Args:
+        endpoint: The controller's ZMQ endpoint publishing the updates,
+                  ZMQ_FOR_CONTROLLER_UPDATES if None. If neither is set, the
+                  results are only cached as requested.
+        max_age: Time (in seconds) during which a result is served from the
+                 cache, 0 disables the cache
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        max_age: float = CONTROLLER_STATE_MAX_AGE,
+    ) -> None:
+        self.endpoint = endpoint or os.environ.get("ZMQ_FOR_CONTROLLER_UPDATES")
+        self.max_age = max_age
+        # The results keyed by operation and parameters, with the time
+        # (time.monotonic()) they were received
+        self._results: Dict[Tuple, Tuple[float, Any]] = {}
+        self._rcv_task: Optional[asyncio.Task] = None
+        self.socket: Optional[zmq.asyncio.Socket] = None
+        self.hits: int = 0
+        self.misses: int = 0
+        self.updates: int = 0
+        if self.endpoint and self.max_age > 0:
+            socket = zmq.asyncio.Context.instance().socket(zmq.SUB)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.setsockopt(zmq.SUBSCRIBE, b"")
+            socket.connect(self.endpoint)
+            self.socket = socket
+
+    @staticmethod
+    def _key(operation: str, params: Optional[dict]) -> Tuple:
+        return (operation,) + tuple(sorted((params or {}).items()))
+
+    def get(self, operation: str, params: Optional[dict] = None) -> Optional[Any]:
+        """
+        Returns the cached result of the operation with these parameters, or
+        None if the operation isn't cacheable or its result isn't cached or
+        is older than the maximum age.
+        """
+        if self.max_age <= 0 or not OPERATIONS[operation].cacheable:
+            return None
+        self._ensure_receiving()
+        cached = self._results.get(self._key(operation, params))
+        if cached is None or time.monotonic() - cached[0] > self.max_age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return cached[1]
+
+    def put(self, operation: str, params: Optional[dict], value: Any):
+        """Caches the result of the operation, if it's cacheable"""
+        if self.max_age > 0 and OPERATIONS[operation].cacheable:
+            self._results[self._key(operation, params)] = (time.monotonic(), value)
+
+    def _ensure_receiving(self):
+        if self.socket is None:
+            return
+        loop = asyncio.get_running_loop()
+        if (
+            self._rcv_task is None
+            or self._rcv_task.done()
+            or self._rcv_task.get_loop() is not loop
+        ):
+            self._rcv_task = loop.create_task(self._rcv_loop())
+
+    async def _rcv_loop(self):
+        """Caches the results published by the controller"""
+        while True:
+            try:
+                frames: List[bytes] = await self.socket.recv_multipart()
+                operation, params, value = decode_update(frames[-1])
+            except zmq.ZMQError as exc:
+                logger.error(f"Receiving EVSE controller updates failed: {exc}")
+                return
+            except InvalidControllerMessageError as exc:
+                logger.warning(f"Dropped invalid EVSE controller update: {exc}")
+                continue
+            self.updates += 1
+            self.put(operation, params, value)
+
+    async def start(self) -> None:
+        """Starts receiving the controller's updates, if subscribed to them"""
+        self._ensure_receiving()
+
+    def close(self):
+        if self._rcv_task:
+            self._rcv_task.cancel()
+            self._rcv_task = None
+        if self.socket:
+            self.socket.close()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "controller_cache_hits": self.hits,
+            "controller_cache_misses": self.misses,
+            "controller_cache_updates": self.updates,
+        }
@@ -5,8 +5,9 @@ This module contains the abstract class for an SECC to retrieve data from the EV
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, List, Optional
 
+from iso15118.secc.controller.evse_state_cache import EVSEStateCache
 from iso15118.shared.messages.zmq_handler import ZMQHandler
 from iso15118.shared.messages.datatypes import (
     DCEVSEChargeParameter,
@@ -79,11 +80,49 @@ class EVChargeParamsLimits:
     ev_energy_request: Optional[PVEVEnergyRequest] = None
 
 
+@dataclass
+class DCChargeLoopSnapshot:
+    """
+    The EVSE status and limit values of a CurrentDemandRes, as returned at once
+    by EVSEControllerInterface.get_dc_charge_loop_snapshot()
+    """
+
+    dc_evse_status: DCEVSEStatus
+    evse_present_voltage: PVEVSEPresentVoltage
+    evse_present_current: PVEVSEPresentCurrent
+    evse_current_limit_achieved: bool
+    evse_voltage_limit_achieved: bool
+    evse_power_limit_achieved: bool
+    evse_max_voltage_limit: PVEVSEMaxVoltageLimit
+    evse_max_current_limit: PVEVSEMaxCurrentLimit
+    evse_max_power_limit: PVEVSEMaxPowerLimit
+    evse_id: str
+
+
 class EVSEControllerInterface(ABC):
-    def __init__(self):
-        self.zmq = ZMQHandler()
+    def __init__(
+        self,
+        zmq_endpoint: Optional[str] = None,
+        zmq_updates_endpoint: Optional[str] = None,
+    ):
+        self.zmq = ZMQHandler(zmq_endpoint)
+        self.state_cache = EVSEStateCache(zmq_updates_endpoint)
         self.ev_data_context = EVDataContext()
 
+    async def cached_request(
+        self, operation: str, params: Optional[dict] = None
+    ) -> Any:
+        """
+        Returns the result of the EVSE controller's operation from the state
+        cache if it's cacheable and fresh enough, otherwise requests it from
+        the EVSE controller (see evse_state_cache.py).
+        """
+        value = self.state_cache.get(operation, params)
+        if value is None:
+            value = await self.zmq.request(operation, params)
+            self.state_cache.put(operation, params, value)
+        return value
+
     def reset_ev_data_context(self):
         self.ev_data_context = EVDataContext()
 
@@ -644,3 +683,36 @@ class EVSEControllerInterface(ABC):
         - ISO 15118-20
         """
         raise NotImplementedError
+
+    async def get_dc_charge_loop_snapshot(
+        self,
+        protocol: Protocol,
+        voltage: PVEVTargetVoltage,
+        current: PVEVTargetCurrent,
+    ) -> DCChargeLoopSnapshot:
+        """
+        Passes the EV's target voltage and current to the charger (see
+        send_charging_command()) and gets all EVSE status and limit values
+        needed for a CurrentDemandRes.
+
+        This default implementation calls the single getters one after the
+        other. Controllers that talk to the EVSE via IPC should override it to
+        get the values with a single request per charge loop message.
+
+        Relevant for:
+        - DIN SPEC 70121
+        - ISO 15118-2
+        """
+        await self.send_charging_command(voltage, current)
+        return DCChargeLoopSnapshot(
+            dc_evse_status=await self.get_dc_evse_status(),
+            evse_present_voltage=await self.get_evse_present_voltage(),
+            evse_present_current=await self.get_evse_present_current(),
+            evse_current_limit_achieved=await self.is_evse_current_limit_achieved(),
+            evse_voltage_limit_achieved=await self.is_evse_voltage_limit_achieved(),
+            evse_power_limit_achieved=await self.is_evse_power_limit_achieved(),
+            evse_max_voltage_limit=await self.get_evse_max_voltage_limit(),
+            evse_max_current_limit=await self.get_evse_max_current_limit(),
+            evse_max_power_limit=await self.get_evse_max_power_limit(),
+            evse_id=await self.get_evse_id(protocol),
+        )
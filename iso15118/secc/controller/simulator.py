@@ -4,7 +4,6 @@ This module contains the code to retrieve (hardware-related) data from the EVSE
 """
 import logging
 import math
-import pickle
 import time
 from dataclasses import dataclass
 from typing import List, Optional
@@ -12,6 +11,7 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from iso15118.secc.controller.interface import (
+    DCChargeLoopSnapshot,
     EVChargeParamsLimits,
     EVSEControllerInterface,
 )
@@ -117,7 +117,6 @@ from iso15118.shared.messages.iso15118_20.dc import (
     DCChargeParameterDiscoveryResParams,
 )
 from iso15118.shared.settings import V20_EVSE_SERVICES_CONFIG
-from iso15118.shared.messages.zmq_handler import message_maker
 
 logger = logging.getLogger(__name__)
 
@@ -166,9 +165,14 @@ class SimEVSEController(EVSEControllerInterface):
     """
 
     @classmethod
-    async def create(cls):
-        self = SimEVSEController()
+    async def create(
+            cls,
+            zmq_endpoint: Optional[str] = None,
+            zmq_updates_endpoint: Optional[str] = None,
+    ):
+        self = SimEVSEController(zmq_endpoint, zmq_updates_endpoint)
         await self.zmq.start()
+        await self.state_cache.start()
         self.contactor = Contactor.OPENED
         self.ev_data_context = EVDataContext()
         # self.v20_service_id_parameter_mapping = (
@@ -185,10 +189,9 @@ class SimEVSEController(EVSEControllerInterface):
 
     async def get_evse_id(self, protocol: Protocol) -> str:
         if protocol == Protocol.DIN_SPEC_70121:
-            return await self.zmq.send_message(
-                message_maker("get_evse_id", pickle.dumps({"protocol": "DIN"})))
+            return await self.cached_request("get_evse_id", {"protocol": "DIN"})
         elif protocol == Protocol.ISO_15118_2:
-            return await self.zmq.send_message(message_maker("get_evse_id", pickle.dumps({"protocol": "ISO"})))
+            return await self.cached_request("get_evse_id", {"protocol": "ISO"})
 
     async def get_supported_energy_transfer_modes(
             self, protocol: Protocol
@@ -196,19 +199,15 @@ class SimEVSEController(EVSEControllerInterface):
         """Overrides EVSEControllerInterface.get_supported_energy_transfer_modes()."""
         if protocol == Protocol.DIN_SPEC_70121:
             logger.info("get supported energy transfer mods DIN_SPEC_70121")
-            return [
-                await self.zmq.send_message(message_maker("get_supported_energy_transfer_modes",
-                                                          pickle.dumps({"protocol": Protocol.DIN_SPEC_70121})))]
+            return await self.cached_request(
+                "get_supported_energy_transfer_modes", {"protocol": "DIN"})
         elif protocol == Protocol.ISO_15118_2:
             logger.info("get supported energy transfer mods ISO_15118_2")
-            return [
-                await self.zmq.send_message(message_maker("get_supported_energy_transfer_modes", pickle.dumps({
-                    "protocol": Protocol.ISO_15118_2})))]
+            return await self.cached_request(
+                "get_supported_energy_transfer_modes", {"protocol": "ISO"})
         else:
-            return [
-                await self.zmq.send_message(message_maker("get_supported_energy_transfer_modes",
-                                                          pickle.dumps({
-                                                              "protocol": Protocol.ISO_15118_20_AC})))]
+            return await self.cached_request(
+                "get_supported_energy_transfer_modes", {"protocol": "ISO_20"})
 
     async def get_scheduled_se_params(
             self,
@@ -393,7 +392,7 @@ class SimEVSEController(EVSEControllerInterface):
 
     async def is_authorized(self) -> AuthorizationStatus:
         """Overrides EVSEControllerInterface.is_authorized()."""
-        return await self.zmq.send_message(message_maker("is_authorized", pickle.dumps({})))
+        return await self.zmq.request("is_authorized")
 
     async def get_sa_schedule_list_dinspec(
             self, max_schedule_entries: Optional[int], departure_time: int = 0
@@ -512,7 +511,7 @@ class SimEVSEController(EVSEControllerInterface):
         pass
 
     async def stop_charger(self) -> None:
-        self.contactor = await self.zmq.send_message(message_maker('stop_charger', pickle.dumps({})))
+        self.contactor = await self.zmq.request('stop_charger')
 
     async def service_renegotiation_supported(self) -> bool:
         """Overrides EVSEControllerInterface.service_renegotiation_supported()."""
@@ -521,20 +520,20 @@ class SimEVSEController(EVSEControllerInterface):
     async def close_contactor(self) -> Contactor:
         """Overrides EVSEControllerInterface.close_contactor()."""
         self.contactor = Contactor.CLOSED
-        return await self.zmq.send_message(message_maker('close_contactor', pickle.dumps({})))
+        return await self.zmq.request('close_contactor')
 
     async def open_contactor(self) -> Contactor:
         """Overrides EVSEControllerInterface.open_contactor()."""
         self.contactor = Contactor.OPENED
-        return await self.zmq.send_message(message_maker('open_contactor', pickle.dumps({})))
+        return await self.zmq.request('open_contactor')
 
     async def get_contactor_state(self) -> Contactor:
         """Overrides EVSEControllerInterface.get_contactor_state()."""
-        return await self.zmq.send_message(message_maker('check_contactor', pickle.dumps({})))
+        return await self.zmq.request('get_contactor_state')
 
     async def get_evse_status(self) -> EVSEStatus:
         """Overrides EVSEControllerInterface.get_evse_status()."""
-        return await self.zmq.send_message(message_maker('get_evse_status',pickle.dumps({})))
+        return await self.zmq.request('get_evse_status')
 
     # ============================================================================
     # |                          AC-SPECIFIC FUNCTIONS                           |
@@ -642,53 +641,69 @@ class SimEVSEController(EVSEControllerInterface):
 
     async def get_dc_evse_status(self) -> DCEVSEStatus:
         """Overrides EVSEControllerInterface.get_dc_evse_status()."""
-        return await self.zmq.send_message(message_maker('get_dc_evse_status'))
+        return await self.zmq.request('get_dc_evse_status')
 
     async def get_dc_evse_charge_parameter(self) -> DCEVSEChargeParameter:
         """Overrides EVSEControllerInterface.get_dc_evse_charge_parameter()."""
-        return await self.zmq.send_message(message_maker('get_dc_evse_charge_parameter'))
+        return await self.cached_request('get_dc_evse_charge_parameter')
 
     async def get_evse_present_voltage(self) -> PVEVSEPresentVoltage:
         """Overrides EVSEControllerInterface.get_evse_present_voltage()."""
-        return await self.zmq.send_message(message_maker('get_evse_present_voltage'))
+        return await self.zmq.request('get_evse_present_voltage')
 
     async def get_evse_present_current(self) -> PVEVSEPresentCurrent:
         """Overrides EVSEControllerInterface.get_evse_present_current()."""
-        return await self.zmq.send_message(message_maker('get_evse_present_current'))
+        return await self.zmq.request('get_evse_present_current')
 
     async def start_cable_check(self):
-        await self.zmq.send_message(message_maker('start_cable_check'))
+        await self.zmq.request('start_cable_check')
 
     async def set_precharge(
             self, voltage: PVEVTargetVoltage, current: PVEVTargetCurrent
     ):
-        await self.zmq.send_message(message_maker('set_precharge',
-                                                  pickle.dumps({'voltage': voltage, 'current': current})))
+        await self.zmq.request('set_precharge', {'voltage': voltage, 'current': current})
 
     async def send_charging_command(
             self, voltage: PVEVTargetVoltage, current: PVEVTargetCurrent
     ):
-        await self.zmq.send_message(message_maker('send_charging_command',
-                                                  pickle.dumps({'voltage': voltage, 'current': current})))
+        await self.zmq.request('send_charging_command', {
+            'voltage': voltage,
+            'current': current,
+            'soc': self.ev_data_context.soc,
+        })
 
     async def is_evse_current_limit_achieved(self) -> bool:
-        return await self.zmq.send_message(
-            message_maker('is_evse_current_limit_achieved'))
+        return await self.zmq.request('is_evse_current_limit_achieved')
 
     async def is_evse_voltage_limit_achieved(self) -> bool:
-        return await self.zmq.send_message(message_maker('is_evse_voltage_limit_achieved'))
+        return await self.zmq.request('is_evse_voltage_limit_achieved')
 
     async def is_evse_power_limit_achieved(self) -> bool:
-        return await self.zmq.send_message(message_maker('is_evse_power_limit_achieved'))
+        return await self.zmq.request('is_evse_power_limit_achieved')
 
     async def get_evse_max_voltage_limit(self) -> PVEVSEMaxVoltageLimit:
-        return await self.zmq.send_message(message_maker('get_evse_max_voltage_limit'))
+        return await self.cached_request('get_evse_max_voltage_limit')
 
     async def get_evse_max_current_limit(self) -> PVEVSEMaxCurrentLimit:
-        return await self.zmq.send_message(message_maker('get_evse_max_current_limit'))
+        return await self.cached_request('get_evse_max_current_limit')
 
     async def get_evse_max_power_limit(self) -> PVEVSEMaxPowerLimit:
-        return await self.zmq.send_message(message_maker('get_evse_max_power_limit'))
+        return await self.cached_request('get_evse_max_power_limit')
+
+    async def get_dc_charge_loop_snapshot(
+            self,
+            protocol: Protocol,
+            voltage: PVEVTargetVoltage,
+            current: PVEVTargetCurrent,
+    ) -> DCChargeLoopSnapshot:
+        """Overrides EVSEControllerInterface.get_dc_charge_loop_snapshot()."""
+        snapshot: dict = await self.zmq.request('get_dc_charge_loop_snapshot', {
+            'protocol': "DIN" if protocol == Protocol.DIN_SPEC_70121 else "ISO",
+            'voltage': voltage,
+            'current': current,
+            'soc': self.ev_data_context.soc,
+        })
+        return DCChargeLoopSnapshot(**snapshot)
 
     async def get_dc_charge_params_v20(self) -> DCChargeParameterDiscoveryResParams:
         """Overrides EVSEControllerInterface.get_dc_charge_params_v20()."""
@@ -1,3 +1,20 @@
+"""
+The XSD compliant failed responses with minimal payload, which the SECC sends
+when the processing of a request fails (see stop_state_machine() in
+secc_state.py).
+
+The failed responses don't depend on the session, so each table is built once
+per process, when it's first used, and shared as a read-only mapping by all
+sessions. As the response code (and, in ISO 15118-20, the header) differs per
+use, copy_failed_response() returns a shallow copy that overrides them instead
+of mutating the shared response.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from pydantic import BaseModel
+
 from iso15118.shared.messages.datatypes import (
     DCEVSEChargeParameter,
     DCEVSEStatus,
@@ -758,3 +775,40 @@ def init_failed_responses_iso_v20() -> dict:
     }
 
     return failed_response_iso_v20
+
+
+@lru_cache(maxsize=None)
+def failed_responses_din_spec_70121() -> Mapping:
+    """The shared failed responses for DIN SPEC 70121, keyed by request type"""
+    return MappingProxyType(init_failed_responses_din_spec_70121())
+
+
+@lru_cache(maxsize=None)
+def failed_responses_iso_v2() -> Mapping:
+    """The shared failed responses for ISO 15118-2, keyed by request type"""
+    return MappingProxyType(init_failed_responses_iso_v2())
+
+
+@lru_cache(maxsize=None)
+def failed_responses_iso_v20() -> Mapping:
+    """
+    The shared failed responses for ISO 15118-20, keyed by request type. The
+    values are (failed response, namespace, payload type) tuples.
+    """
+    return MappingProxyType(init_failed_responses_iso_v20())
+
+
+def copy_failed_response(
+    failed_response: BaseModel, response_code, session_id: Optional[str] = None
+) -> BaseModel:
+    """
+    Returns a shallow copy of the given shared failed response, with the given
+    response code and, for ISO 15118-20 responses, a header with the given
+    session ID. The shared failed response itself is left unchanged.
+    """
+    update = {"response_code": response_code}
+    if session_id is not None:
+        update["header"] = failed_response.header.copy(
+            update={"session_id": session_id}
+        )
+    return failed_response.copy(update=update)
@@ -1,18 +1,38 @@
 import asyncio
 import logging
 
-from iso15118.secc import SECCHandler
+from iso15118.secc import MultiConnectorSECCHandler, SECCHandler
 from iso15118.secc.controller.simulator import SimEVSEController
+from iso15118.secc.secc_settings import Config
+from iso15118.shared.exi_codec_pool import EXICodecPool
 from iso15118.shared.exificient_exi_codec import ExificientEXICodec
+from iso15118.shared.utils import install_event_loop_policy
 
 logger = logging.getLogger(__name__)
 
 
+async def create_evse_controller(connector_config: Config) -> SimEVSEController:
+    """Creates the EVSE controller of a connector of a multi-connector SECC"""
+    return await SimEVSEController.create(
+        connector_config.zmq_endpoint, connector_config.zmq_updates_endpoint
+    )
+
+
 async def main():
     """
     Entrypoint function that starts the ISO 15118 code running on
     the SECC (Supply Equipment Communication Controller)
     """
+    config = Config()
+    config.load_envs()
+    if config.connectors:
+        # One process for all connectors, which share a pool of EXI codecs
+        await MultiConnectorSECCHandler(
+            exi_codec=EXICodecPool(ExificientEXICodec),
+            evse_controller_factory=create_evse_controller,
+        ).start()
+        return
+
     sim_evse_controller = await SimEVSEController.create()
     await SECCHandler(
         exi_codec=ExificientEXICodec(), evse_controller=sim_evse_controller
@@ -20,6 +40,9 @@ async def main():
 
 
 def run():
+    config = Config()
+    config.load_envs()
+    install_event_loop_policy(config.event_loop)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
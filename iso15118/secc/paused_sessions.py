@@ -0,0 +1,196 @@
+"""
+This module contains the store of paused ISO 15118-2 communication sessions.
+
+When the EVCC pauses a charging session (SessionStopReq with ChargingSession
+set to 'Pause'), the SECC keeps the session's negotiated parameters, keyed by
+the session ID. If the EVCC then resumes the session with a SessionSetupReq
+carrying that session ID (see section 8.4.2 in ISO 15118-2), the SECC joins
+the old session and doesn't need to verify the contract certificate chain,
+authorize, or negotiate the charging schedules again.
+
+The store is bounded in size and drops paused sessions after a time to live.
+Optionally, it's persisted to a file, so that paused sessions survive a
+restart of the SECC. On the event loop, the changes are written shortly after
+they're made (and several changes at once) by a worker thread, so that the
+sessions aren't held up by pickling and file I/O.
+"""
+
+import asyncio
+import logging
+import os
+import pickle
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Optional, Union
+
+from iso15118.shared.messages.datatypes import SelectedService
+from iso15118.shared.messages.enums import AuthEnum, Protocol
+from iso15118.shared.messages.iso15118_2.datatypes import (
+    CertificateChain,
+    EnergyTransferModeEnum,
+    SAScheduleTuple,
+)
+
+if TYPE_CHECKING:
+    from iso15118.secc.comm_session_handler import SECCCommunicationSession
+
+logger = logging.getLogger(__name__)
+
+# Delay (in seconds) after a change before the paused sessions are written, so
+# that the changes made meanwhile are written at once
+SAVE_DELAY = 1.0
+
+
+@dataclass
+class PausedSession:
+    """The values of a paused session that are needed to resume it"""
+
+    session_id: str
+    protocol: Protocol
+    evcc_id: Union[bytes, str, None]
+    selected_auth_option: Optional[AuthEnum]
+    selected_services: List[SelectedService]
+    selected_energy_mode: Optional[EnergyTransferModeEnum]
+    selected_charging_type_is_ac: bool
+    selected_schedule: Optional[int]
+    offered_schedules: List[SAScheduleTuple]
+    # The contract certificate chain verified with the PaymentDetailsReq
+    contract_cert_chain: Optional[CertificateChain]
+    # Whether the EVSE controller authorized the session
+    authorized: bool
+    paused_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_comm_session(
+        cls, comm_session: "SECCCommunicationSession"
+    ) -> "PausedSession":
+        return cls(
+            session_id=comm_session.session_id,
+            protocol=comm_session.protocol,
+            evcc_id=comm_session.evcc_id,
+            selected_auth_option=comm_session.selected_auth_option,
+            selected_services=comm_session.selected_services,
+            selected_energy_mode=comm_session.selected_energy_mode,
+            selected_charging_type_is_ac=comm_session.selected_charging_type_is_ac,
+            selected_schedule=comm_session.selected_schedule,
+            offered_schedules=comm_session.offered_schedules,
+            contract_cert_chain=comm_session.contract_cert_chain,
+            authorized=comm_session.authorized,
+        )
+
+
+class PausedSessionStore:
+    """
+    Keeps the paused sessions, keyed by session ID. If the store is full, the
+    session that was paused first is dropped.
+
+    Args:
+        ttl: Time (in seconds) after which a paused session can't be resumed
+             anymore
+        max_size: Maximum number of paused sessions kept
+        path: File the paused sessions are persisted to, if not None
+        save_delay: Delay (in seconds) after a change before the paused
+                    sessions are written, if on an event loop
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        path: Optional[str] = None,
+        save_delay: float = SAVE_DELAY,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.save_delay = save_delay
+        self._sessions: "OrderedDict[str, PausedSession]" = OrderedDict()
+        self._save_scheduled = False
+        # A single thread, so that the writes don't overlap and are done in
+        # order
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._write_future: Optional[asyncio.Future] = None
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def put(self, paused_session: PausedSession):
+        self._evict_expired()
+        self._sessions.pop(paused_session.session_id, None)
+        self._sessions[paused_session.session_id] = paused_session
+        while len(self._sessions) > self.max_size:
+            session_id, _ = self._sessions.popitem(last=False)
+            logger.debug(f"Dropped paused session {session_id}, store is full")
+        self._save()
+
+    def pop(self, session_id: str) -> Optional[PausedSession]:
+        """
+        Removes and returns the paused session with the given session ID, or
+        returns None if there's none or it expired.
+        """
+        self._evict_expired()
+        paused_session = self._sessions.pop(session_id, None)
+        if paused_session:
+            self._save()
+        return paused_session
+
+    def _evict_expired(self):
+        expired_before = time.time() - self.ttl
+        while self._sessions:
+            session_id, paused_session = next(iter(self._sessions.items()))
+            if paused_session.paused_at > expired_before:
+                break
+            del self._sessions[session_id]
+            logger.debug(f"Paused session {session_id} expired")
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as file:
+                sessions = pickle.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as exc:
+            logger.warning(f"Couldn't load paused sessions from {self.path}: {exc}")
+            return
+
+        for paused_session in sorted(sessions, key=lambda session: session.paused_at):
+            self._sessions[paused_session.session_id] = paused_session
+        self._evict_expired()
+        logger.info(f"Loaded {len(self._sessions)} paused sessions from {self.path}")
+
+    def _save(self):
+        if not self.path or self._save_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on an event loop, e.g. in a tool managing the stored sessions
+            self._write(list(self._sessions.values()))
+            return
+        self._save_scheduled = True
+        loop.call_later(self.save_delay, self._save_in_executor, loop)
+
+    def _save_in_executor(self, loop: asyncio.AbstractEventLoop):
+        self._save_scheduled = False
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="paused-sessions"
+            )
+        self._write_future = loop.run_in_executor(
+            self._executor, self._write, list(self._sessions.values())
+        )
+
+    def _write(self, sessions: List[PausedSession]):
+        # Written to a temporary file first, so that a crash while writing
+        # doesn't corrupt the stored sessions
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                pickle.dump(sessions, file)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.warning(f"Couldn't save paused sessions to {self.path}: {exc}")
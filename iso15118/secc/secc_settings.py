@@ -1,9 +1,10 @@
 import logging
 import os
-from dataclasses import dataclass
-from typing import List, Optional, Type
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Tuple, Type
 
 import environs
+from marshmallow.validate import OneOf
 
 from iso15118.secc.controller.interface import EVSEControllerInterface
 from iso15118.shared.exceptions import (
@@ -11,6 +12,7 @@ from iso15118.shared.exceptions import (
     NoSupportedProtocols,
 )
 from iso15118.shared.messages.enums import AuthEnum, Protocol
+from iso15118.shared.utils import EVENT_LOOPS
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,23 @@ class Config:
     supported_protocols: Optional[List[Protocol]] = None
     supported_auth_options: Optional[List[AuthEnum]] = None
     standby_allowed: bool = False
+    # The connector served by this configuration and the ZMQ endpoints of its
+    # EVSE controller (requests and published updates)
+    connector_id: Optional[str] = None
+    zmq_endpoint: Optional[str] = None
+    zmq_updates_endpoint: Optional[str] = None
+    # The (network interface, connector ID) pairs of a multi-connector SECC,
+    # empty if the SECC serves the single connector at 'iface'
+    connectors: List[Tuple[str, str]] = field(default_factory=list)
+    # Number of worker processes the connectors are sharded across by the
+    # SECC supervisor (see supervisor.py)
+    workers: int = 1
+    # The event loop implementation, one of EVENT_LOOPS
+    event_loop: str = "asyncio"
+    # Paused ISO 15118-2 sessions that can be resumed (see paused_sessions.py)
+    paused_session_ttl: float = 3600.0
+    paused_sessions_max: int = 128
+    paused_sessions_path: Optional[str] = None
     default_protocols = [
         "DIN_SPEC_70121",
         "ISO_15118_2",
@@ -105,8 +124,84 @@ class Config:
         # EV can still use value-added services while not consuming any power.
         self.standby_allowed = env.bool("STANDBY_ALLOWED", default=False)
 
+        # The endpoint of the EVSE controller's ZMQ socket. In multi-connector
+        # mode, '{connector_id}' is replaced by the ID of each connector.
+        self.zmq_endpoint = env.str("ZMQ_FOR_CP_AND_V2G", default=None)
+
+        # The endpoint of the EVSE controller's ZMQ socket publishing updates
+        # of its state, replaced per connector like ZMQ_FOR_CP_AND_V2G. If
+        # empty, the results of the controller are cached as polled.
+        self.zmq_updates_endpoint = env.str("ZMQ_FOR_CONTROLLER_UPDATES", default=None)
+
+        # Connectors served by one SECC process, given as a list of
+        # 'network_interface=connector_id' entries (e.g. 'eth1=1,eth2=2').
+        # If empty, the SECC serves a single connector at NETWORK_INTERFACE.
+        connectors = env.list("CONNECTORS", default=[])
+        self.load_connectors(connectors)
+
+        # Number of worker processes started by the SECC supervisor, at most one
+        # per connector. Defaults to the number of CPU cores.
+        self.workers = env.int("SECC_WORKERS", default=os.cpu_count() or 1)
+
+        # The event loop implementation the SECC runs on, either 'asyncio' or
+        # 'uvloop' (which falls back to 'asyncio' if uvloop isn't installed)
+        self.event_loop = env.str(
+            "EVENT_LOOP", default="asyncio", validate=OneOf(EVENT_LOOPS)
+        )
+
+        # Time (in seconds) during which the EVCC can resume a paused session,
+        # and maximum number of paused sessions kept. If PAUSED_SESSIONS_PATH is
+        # set, the paused sessions are persisted to that file across restarts.
+        self.paused_session_ttl = env.float("PAUSED_SESSION_TTL", default=3600.0)
+        self.paused_sessions_max = env.int("PAUSED_SESSIONS_MAX", default=128)
+        self.paused_sessions_path = env.str("PAUSED_SESSIONS_PATH", default=None)
+
         env.seal()  # raise all errors at once, if any
 
+    def load_connectors(self, read_connectors: List[str]):
+        connectors: List[Tuple[str, str]] = []
+        for entry in filter(None, (entry.strip() for entry in read_connectors)):
+            iface, separator, connector_id = entry.partition("=")
+            if not separator or not iface.strip() or not connector_id.strip():
+                raise ValueError(
+                    f"Invalid connector '{entry}' configured with key "
+                    "'CONNECTORS'. Expected 'network_interface=connector_id'"
+                )
+            connectors.append((iface.strip(), connector_id.strip()))
+
+        connector_ids = [connector_id for _, connector_id in connectors]
+        if len(set(connector_ids)) != len(connector_ids):
+            raise ValueError(f"Duplicate connector IDs configured: {connector_ids}")
+        self.connectors = connectors
+        if connectors:
+            logger.info(f"Loaded connectors: {connectors}")
+
+    def connector_configs(self) -> List["Config"]:
+        """
+        Returns one configuration per connector of a multi-connector SECC,
+        which differ only in the network interface, connector ID and ZMQ
+        endpoint of the EVSE controller.
+        """
+        return [
+            replace(
+                self,
+                iface=iface,
+                connector_id=connector_id,
+                zmq_endpoint=(
+                    self.zmq_endpoint.replace("{connector_id}", connector_id)
+                    if self.zmq_endpoint
+                    else None
+                ),
+                zmq_updates_endpoint=(
+                    self.zmq_updates_endpoint.replace("{connector_id}", connector_id)
+                    if self.zmq_updates_endpoint
+                    else None
+                ),
+                connectors=[],
+            )
+            for iface, connector_id in self.connectors
+        ]
+
     def load_requested_protocols(self, read_protocols: Optional[List[str]]):
         protocols = format_list(read_protocols)
         valid_protocols = list(set(protocols).intersection(self.default_protocols))
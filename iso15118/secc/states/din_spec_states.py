@@ -737,26 +737,20 @@ class CurrentDemand(StateSECC):
         self.comm_session.evse_controller.ev_data_context.soc = (
             current_demand_req.dc_ev_status.ev_ress_soc
         )
-        await self.comm_session.evse_controller.send_charging_command(
-            current_demand_req.ev_target_voltage, current_demand_req.ev_target_current
+        snapshot = await self.comm_session.evse_controller.get_dc_charge_loop_snapshot(
+            Protocol.DIN_SPEC_70121,
+            current_demand_req.ev_target_voltage,
+            current_demand_req.ev_target_current,
         )
 
         current_demand_res: CurrentDemandRes = CurrentDemandRes(
             response_code=ResponseCode.OK,
-            dc_evse_status=await self.comm_session.evse_controller.get_dc_evse_status(),
-            evse_present_voltage=(
-                await self.comm_session.evse_controller.get_evse_present_voltage()
-            ),
-            evse_present_current=(
-                await self.comm_session.evse_controller.get_evse_present_current()
-            ),
+            dc_evse_status=snapshot.dc_evse_status,
+            evse_present_voltage=snapshot.evse_present_voltage,
+            evse_present_current=snapshot.evse_present_current,
             evse_current_limit_achieved=current_demand_req.charging_complete,
-            evse_voltage_limit_achieved=(
-                await self.comm_session.evse_controller.is_evse_voltage_limit_achieved()
-            ),
-            evse_power_limit_achieved=(
-                await self.comm_session.evse_controller.is_evse_power_limit_achieved()
-            ),
+            evse_voltage_limit_achieved=snapshot.evse_voltage_limit_achieved,
+            evse_power_limit_achieved=snapshot.evse_power_limit_achieved,
         )
 
         self.create_next_message(
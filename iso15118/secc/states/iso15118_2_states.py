@@ -8,6 +8,8 @@ import logging
 import time
 from typing import List, Optional, Type, Union
 
+from cryptography.x509 import load_der_x509_certificate
+
 from iso15118.secc.comm_session_handler import SECCCommunicationSession
 from iso15118.secc.controller.interface import EVChargeParamsLimits
 from iso15118.secc.states.secc_state import StateSECC
@@ -86,6 +88,7 @@ from iso15118.shared.messages.iso15118_2.datatypes import (
     CertificateChain,
     ChargeProgress,
     ChargeService,
+    ChargingSession,
     DHPublicKey,
     EncryptedPrivateKey,
     EnergyTransferModeList,
@@ -111,7 +114,9 @@ from iso15118.shared.security import (
     CertPath,
     KeyEncoding,
     KeyPath,
+    check_validity,
     create_signature,
+    encode_elements_to_sign,
     encrypt_priv_key,
     get_cert_cn,
     get_random_bytes,
@@ -120,7 +125,7 @@ from iso15118.shared.security import (
     verify_certs,
     verify_signature,
 )
-from iso15118.shared.states import State, Terminate
+from iso15118.shared.states import Pause, State, Terminate
 
 
 logger = logging.getLogger(__name__)
@@ -167,6 +172,13 @@ class SessionSetup(StateSECC):
             # The EV wants to resume the previously paused charging session
             session_id = self.comm_session.session_id
             self.response_code = ResponseCode.OK_OLD_SESSION_JOINED
+        elif self.comm_session.resume_paused_session(
+            msg.header.session_id, session_setup_req.evcc_id
+        ):
+            # The EV resumes a charging session it paused on an earlier TCP
+            # connection
+            session_id = self.comm_session.session_id
+            self.response_code = ResponseCode.OK_OLD_SESSION_JOINED
         else:
             # False session ID from EV, gracefully assigning new session ID
             logger.warning(
@@ -675,26 +687,10 @@ class CertificateInstallation(StateSECC):
 
         try:
             # Elements to sign, containing its id and the exi encoded stream
-            contract_cert_tuple = (
-                contract_cert_chain.id,
-                EXI().to_exi(contract_cert_chain, Namespace.ISO_V2_MSG_DEF),
-            )
-            encrypted_priv_key_tuple = (
-                encrypted_priv_key.id,
-                EXI().to_exi(encrypted_priv_key, Namespace.ISO_V2_MSG_DEF),
-            )
-            dh_public_key_tuple = (
-                dh_public_key.id,
-                EXI().to_exi(dh_public_key, Namespace.ISO_V2_MSG_DEF),
+            elements_to_sign = encode_elements_to_sign(
+                [contract_cert_chain, encrypted_priv_key, dh_public_key, emaid],
+                Namespace.ISO_V2_MSG_DEF,
             )
-            emaid_tuple = (emaid.id, EXI().to_exi(emaid, Namespace.ISO_V2_MSG_DEF))
-
-            elements_to_sign = [
-                contract_cert_tuple,
-                encrypted_priv_key_tuple,
-                dh_public_key_tuple,
-                emaid_tuple,
-            ]
             # The private key to be used for the signature
             signature_key = load_priv_key(KeyPath.CPS_LEAF_PEM, KeyEncoding.PEM)
 
@@ -768,7 +764,15 @@ class PaymentDetails(StateSECC):
             # TODO Either an MO Root certificate or a V2G Root certificate
             #      could be used to verify, need to be flexible with regards
             #      to the PKI that is used.
-            verify_certs(leaf_cert, sub_ca_certs, CertPath.MO_ROOT_DER)
+            resumed_session = self.comm_session.resumed_session
+            cert_chain = payment_details_req.cert_chain
+            if resumed_session and resumed_session.contract_cert_chain == cert_chain:
+                # Already verified before the session was paused, but the leaf
+                # certificate may have expired since
+                check_validity([load_der_x509_certificate(leaf_cert)])
+                logger.debug("Resumed session, contract certificate chain unchanged")
+            else:
+                verify_certs(leaf_cert, sub_ca_certs, CertPath.MO_ROOT_DER)
 
             # TODO Check if EMAID has correct syntax
 
@@ -900,11 +904,14 @@ class Authorization(StateSECC):
 
         auth_status: EVSEProcessing = EVSEProcessing.ONGOING
         next_state: Type["State"] = Authorization
-        if await self.comm_session.evse_controller.is_authorized() == (
-            AuthorizationStatus.ACCEPTED
+        resumed_session = self.comm_session.resumed_session
+        if (resumed_session and resumed_session.authorized) or (
+            await self.comm_session.evse_controller.is_authorized()
+            == AuthorizationStatus.ACCEPTED
         ):
             auth_status = EVSEProcessing.FINISHED
             next_state = ChargeParameterDiscovery
+            self.comm_session.authorized = True
 
         # TODO GitHub#54: handle REJECTED case
         # TODO Need to distinguish between ONGOING and
@@ -1038,9 +1045,16 @@ class ChargeParameterDiscovery(StateSECC):
 
         if not departure_time:
             departure_time = 0
-        sa_schedule_list = await self.comm_session.evse_controller.get_sa_schedule_list(
-            ev_charge_params_limits, max_schedule_entries, departure_time
-        )
+        resumed_session = self.comm_session.resumed_session
+        if resumed_session and resumed_session.offered_schedules:
+            # The schedules negotiated before the session was paused
+            sa_schedule_list = resumed_session.offered_schedules
+        else:
+            sa_schedule_list = (
+                await self.comm_session.evse_controller.get_sa_schedule_list(
+                    ev_charge_params_limits, max_schedule_entries, departure_time
+                )
+            )
 
         sa_schedule_list_valid = self.validate_sa_schedule_list(
             sa_schedule_list, departure_time
@@ -1518,7 +1532,8 @@ class SessionStop(StateSECC):
         msg = self.check_msg_v2(message, [SessionStopReq])
         if not msg:
             return
-        session_status = msg.body.session_stop_req.charging_session.lower()
+        charging_session = msg.body.session_stop_req.charging_session
+        session_status = charging_session.lower()
         self.comm_session.evse_controller.zmq.set_state("SessionStop")
         self.comm_session.stop_reason = StopNotification(
             True,
@@ -1527,7 +1542,7 @@ class SessionStop(StateSECC):
         )
 
         self.create_next_message(
-            Terminate,
+            Pause if charging_session == ChargingSession.PAUSE else Terminate,
             SessionStopRes(response_code=ResponseCode.OK),
             Timeouts.V2G_SECC_SEQUENCE_TIMEOUT,
             Namespace.ISO_V2_MSG_DEF,
@@ -1876,29 +1891,26 @@ class CurrentDemand(StateSECC):
         self.comm_session.evse_controller.ev_data_context.soc = (
             current_demand_req.dc_ev_status.ev_ress_soc
         )
-        await self.comm_session.evse_controller.send_charging_command(
-            current_demand_req.ev_target_voltage, current_demand_req.ev_target_current
+        snapshot = await self.comm_session.evse_controller.get_dc_charge_loop_snapshot(
+            Protocol.ISO_15118_2,
+            current_demand_req.ev_target_voltage,
+            current_demand_req.ev_target_current,
         )
 
         # We don't care about signed meter values from the EVCC, but if you
         # do, then set receipt_required to True and set the field meter_info
-        evse_controller = self.comm_session.evse_controller
         current_demand_res = CurrentDemandRes(
             response_code=ResponseCode.OK,
-            dc_evse_status=await evse_controller.get_dc_evse_status(),
-            evse_present_voltage=await evse_controller.get_evse_present_voltage(),
-            evse_present_current=await evse_controller.get_evse_present_current(),
-            evse_current_limit_achieved=(
-                await evse_controller.is_evse_current_limit_achieved()
-            ),
-            evse_voltage_limit_achieved=(
-                await evse_controller.is_evse_voltage_limit_achieved()
-            ),
-            evse_power_limit_achieved=await evse_controller.is_evse_power_limit_achieved(),  # noqa
-            evse_max_voltage_limit=await evse_controller.get_evse_max_voltage_limit(),
-            evse_max_current_limit=await evse_controller.get_evse_max_current_limit(),
-            evse_max_power_limit=await evse_controller.get_evse_max_power_limit(),
-            evse_id=await evse_controller.get_evse_id(Protocol.ISO_15118_2),
+            dc_evse_status=snapshot.dc_evse_status,
+            evse_present_voltage=snapshot.evse_present_voltage,
+            evse_present_current=snapshot.evse_present_current,
+            evse_current_limit_achieved=snapshot.evse_current_limit_achieved,
+            evse_voltage_limit_achieved=snapshot.evse_voltage_limit_achieved,
+            evse_power_limit_achieved=snapshot.evse_power_limit_achieved,
+            evse_max_voltage_limit=snapshot.evse_max_voltage_limit,
+            evse_max_current_limit=snapshot.evse_max_current_limit,
+            evse_max_power_limit=snapshot.evse_max_power_limit,
+            evse_id=snapshot.evse_id,
             sa_schedule_tuple_id=self.comm_session.selected_schedule,
             # TODO Could maybe request an OCPP setting that determines
             #      whether or not a receipt is required and when
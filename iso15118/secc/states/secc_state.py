@@ -8,6 +8,12 @@ from abc import ABC
 from typing import List, Optional, Type, TypeVar, Union
 
 from iso15118.secc.comm_session_handler import SECCCommunicationSession
+from iso15118.secc.failed_responses import (
+    copy_failed_response,
+    failed_responses_din_spec_70121,
+    failed_responses_iso_v2,
+    failed_responses_iso_v20,
+)
 from iso15118.shared.messages.app_protocol import (
     ResponseCodeSAP,
     SupportedAppProtocolReq,
@@ -317,13 +323,15 @@ class StateSECC(State, ABC):
 
         if isinstance(faulty_request, V2GMessageV2):
             msg_type = get_msg_type(str(faulty_request))
-            error_res = self.comm_session.failed_responses_isov2.get(msg_type)
-            error_res.response_code = response_code
+            error_res = copy_failed_response(
+                failed_responses_iso_v2().get(msg_type), response_code
+            )
             self.create_next_message(Terminate, error_res, 0, Namespace.ISO_V2_MSG_DEF)
         elif isinstance(faulty_request, V2GMessageDINSPEC):
             msg_type = get_msg_type_dinspec(str(faulty_request))
-            error_res = self.comm_session.failed_responses_din_spec.get(msg_type)
-            error_res.response_code = response_code
+            error_res = copy_failed_response(
+                failed_responses_din_spec_70121().get(msg_type), response_code
+            )
             self.create_next_message(Terminate, error_res, 0, Namespace.DIN_MSG_DEF)
         # Here we could have been more specific and check if it is a V2GRequestV20,
         # but to be consistent with the other if clauses and since there is no negative
@@ -333,11 +341,12 @@ class StateSECC(State, ABC):
                 error_res,
                 namespace,
                 payload_type,
-            ) = self.comm_session.failed_responses_isov20.get(type(faulty_request))
+            ) = failed_responses_iso_v20().get(type(faulty_request))
             # As the Header in the case of -20 is part of the -20 message payload,
             # we need to set the session id of the the current session to it
-            error_res.header.session_id = self.comm_session.session_id
-            error_res.response_code = response_code
+            error_res = copy_failed_response(
+                error_res, response_code, self.comm_session.session_id
+            )
             self.create_next_message(Terminate, error_res, 0, namespace, payload_type)
         elif isinstance(faulty_request, SupportedAppProtocolReq):
             error_res = SupportedAppProtocolRes(response_code=response_code)
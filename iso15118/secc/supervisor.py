@@ -0,0 +1,284 @@
+"""
+Supervisor entry point of a sharded SECC: the connectors configured with
+CONNECTORS are split across several worker processes, each pinned to a CPU
+core and running its own MultiConnectorSECCHandler on its own event loop. So
+the pydantic validation and signature work of many simultaneously starting
+sessions spreads across cores.
+
+The worker processes are spawned (not forked), so they don't share any
+mutable state. A worker that exits is restarted, with a growing delay if it
+keeps crashing right after its start. The workers periodically report their
+metrics, which the supervisor aggregates.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from iso15118.secc import MultiConnectorSECCHandler
+from iso15118.secc.main import create_evse_controller
+from iso15118.secc.secc_settings import Config
+from iso15118.shared.exi_codec_pool import EXICodecPool
+from iso15118.shared.exificient_exi_codec import ExificientEXICodec
+from iso15118.shared.settings import EXI_CODEC_POOL_SIZE
+from iso15118.shared.utils import install_event_loop_policy, wait_for_tasks
+
+logger = logging.getLogger(__name__)
+
+# Interval (in seconds) at which the workers report their metrics and the
+# supervisor logs the aggregated metrics
+METRICS_INTERVAL = 10.0
+# A worker that ran shorter than this (in seconds) is considered to have
+# crashed on start, which delays its restart by an exponential backoff
+MIN_WORKER_UPTIME = 10.0
+MAX_RESTART_DELAY = 30.0
+
+
+def shard_connectors(
+    connectors: List[Tuple[str, str]], workers: int
+) -> List[List[Tuple[str, str]]]:
+    """
+    Splits the connectors round-robin into at most 'workers' shards, so that
+    no worker process is started without a connector.
+    """
+    workers = max(1, min(workers, len(connectors)))
+    return [connectors[index::workers] for index in range(workers)]
+
+
+def _pin_to_cpu(cpu: int):
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, {cpu})
+    except OSError as exc:
+        logger.warning(f"Couldn't pin SECC worker to CPU {cpu}: {exc}")
+
+
+async def _report_metrics(
+    handler: MultiConnectorSECCHandler,
+    index: int,
+    metrics_queue: multiprocessing.Queue,
+    interval: float,
+):
+    while True:
+        await asyncio.sleep(interval)
+        metrics_queue.put_nowait((index, handler.metrics()))
+
+
+async def _run_worker_handler(
+    index: int,
+    connectors: List[Tuple[str, str]],
+    metrics_queue: multiprocessing.Queue,
+    metrics_interval: float,
+):
+    handler = MultiConnectorSECCHandler(
+        exi_codec=EXICodecPool(
+            ExificientEXICodec, size=min(len(connectors), EXI_CODEC_POOL_SIZE)
+        ),
+        evse_controller_factory=create_evse_controller,
+        connectors=connectors,
+        worker_index=index,
+    )
+    await wait_for_tasks(
+        [
+            handler.start(),
+            _report_metrics(handler, index, metrics_queue, metrics_interval),
+        ]
+    )
+
+
+def run_worker(
+    index: int,
+    cpu: int,
+    connectors: List[Tuple[str, str]],
+    metrics_queue: multiprocessing.Queue,
+    metrics_interval: float,
+):
+    """Entry point of a worker process"""
+    _pin_to_cpu(cpu)
+    config = Config()
+    config.load_envs()
+    install_event_loop_policy(config.event_loop)
+    logger.info(f"SECC worker {index} serving connectors {connectors} on CPU {cpu}")
+    try:
+        asyncio.run(
+            _run_worker_handler(index, connectors, metrics_queue, metrics_interval)
+        )
+    except KeyboardInterrupt:
+        logger.debug(f"SECC worker {index} terminated manually")
+
+
+@dataclass
+class Worker:
+    index: int
+    cpu: int
+    connectors: List[Tuple[str, str]]
+    process: Optional[multiprocessing.Process] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    # Restarts in a row after the worker didn't reach MIN_WORKER_UPTIME
+    crashes: int = 0
+    restart_at: Optional[float] = None
+    metrics: Dict[str, int] = field(default_factory=dict)
+
+
+class SECCSupervisor:
+    """
+    Starts one worker process per shard of connectors and keeps them running.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        metrics_interval: float = METRICS_INTERVAL,
+        worker_target: Callable = run_worker,
+    ):
+        if not config.connectors:
+            raise ValueError(
+                "No connectors configured. Configure them in the .env file "
+                "with key 'CONNECTORS'"
+            )
+        if hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = list(range(os.cpu_count() or 1))
+
+        self.metrics_interval = metrics_interval
+        self.worker_target = worker_target
+        self.workers = [
+            Worker(index, cpus[index % len(cpus)], shard)
+            for index, shard in enumerate(
+                shard_connectors(config.connectors, config.workers)
+            )
+        ]
+        self._context = multiprocessing.get_context("spawn")
+        self._metrics_queue = self._context.Queue()
+        self._stopping = False
+
+    def start_worker(self, worker: Worker):
+        worker.process = self._context.Process(
+            target=self.worker_target,
+            args=(
+                worker.index,
+                worker.cpu,
+                worker.connectors,
+                self._metrics_queue,
+                self.metrics_interval,
+            ),
+            name=f"secc-worker-{worker.index}",
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        worker.metrics = {}
+
+    def check_workers(self) -> int:
+        """
+        Restarts the workers that exited, once their restart delay passed.
+        Returns the number of restarted workers.
+        """
+        restarted = 0
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.process is None or worker.process.is_alive():
+                continue
+
+            if worker.restart_at is None:
+                if now - worker.started_at < MIN_WORKER_UPTIME:
+                    worker.crashes += 1
+                else:
+                    worker.crashes = 0
+                delay = (
+                    min(2 ** (worker.crashes - 1), MAX_RESTART_DELAY)
+                    if worker.crashes
+                    else 0
+                )
+                worker.restart_at = now + delay
+                logger.warning(
+                    f"SECC worker {worker.index} exited with code "
+                    f"{worker.process.exitcode}, restarting in {delay} s"
+                )
+
+            if now >= worker.restart_at:
+                worker.restarts += 1
+                self.start_worker(worker)
+                restarted += 1
+        return restarted
+
+    def collect_metrics(self):
+        """Takes over the latest metrics reported by the workers"""
+        while True:
+            try:
+                index, metrics = self._metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.workers[index].metrics = metrics
+
+    def aggregate_metrics(self) -> Dict[str, int]:
+        """Sums up the metrics of all workers"""
+        aggregated: Dict[str, int] = {
+            "workers": len(self.workers),
+            "workers_alive": sum(
+                1
+                for worker in self.workers
+                if worker.process and worker.process.is_alive()
+            ),
+            "worker_restarts": sum(worker.restarts for worker in self.workers),
+        }
+        for worker in self.workers:
+            for name, value in worker.metrics.items():
+                aggregated[name] = aggregated.get(name, 0) + value
+        return aggregated
+
+    def supervise(self, poll_interval: float = 1.0):
+        """Starts all workers and keeps them running until stop() is called"""
+        for worker in self.workers:
+            self.start_worker(worker)
+
+        next_report = time.monotonic() + self.metrics_interval
+        while not self._stopping:
+            time.sleep(poll_interval)
+            if self._stopping:
+                break
+            self.check_workers()
+            self.collect_metrics()
+            if time.monotonic() >= next_report:
+                logger.info(f"SECC metrics: {self.aggregate_metrics()}")
+                next_report += self.metrics_interval
+
+    def request_stop(self, *_):
+        self._stopping = True
+
+    def stop(self, timeout: float = 5.0):
+        """Terminates all workers"""
+        self._stopping = True
+        for worker in self.workers:
+            if worker.process and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process:
+                worker.process.join(timeout)
+                if worker.process.is_alive():
+                    worker.process.kill()
+
+
+def run():
+    config = Config()
+    config.load_envs()
+    supervisor = SECCSupervisor(config)
+    signal.signal(signal.SIGTERM, supervisor.request_stop)
+    try:
+        supervisor.supervise()
+    except KeyboardInterrupt:
+        logger.debug("SECC supervisor terminated manually")
+    finally:
+        supervisor.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,155 @@
+"""
+The fast path of the SECC Discovery Protocol (SDP).
+
+An SDP request is always the same 10 bytes, given its security and transport
+protocol, and so is the SECC's response, as long as the TCP server's address
+and ports don't change. The SDPResponder therefore precomputes the response
+to each of the possible requests and answers an SDP request right from the
+UDPServer's datagram_received() callback, without queueing it for the
+communication session handler or parsing it.
+
+As the EVCC repeats its SDP request up to 50 times every 250 ms, the requests
+of each peer are rate limited.
+"""
+import logging
+import socket
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from iso15118.secc.transport.tcp_server import TCPServer
+from iso15118.shared.messages.enums import ISOV2PayloadTypes, Protocol
+from iso15118.shared.messages.sdp import (
+    SDPRequest,
+    SDPResponse,
+    Security,
+    Transport,
+)
+from iso15118.shared.messages.v2gtp import V2GTPMessage
+from iso15118.shared.settings import SDP_MIN_REQUEST_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of peers whose last SDP request time is kept for the rate
+# limiting. Beyond that, the peer that sent its last request first is forgotten.
+MAX_RATE_LIMITED_PEERS = 1024
+
+
+class SDPResponder:
+    """
+    Answers the SDP requests with precomputed responses, rebuilt whenever the
+    TCP server's address or ports change.
+
+    Args:
+        tcp_server: The TCP server whose address and ports are announced
+        enforce_tls: Whether the SECC only offers TLS (see SECC_ENFORCE_TLS)
+        min_request_interval: Minimum time (in seconds) between two answered
+                              SDP requests of the same peer
+    """
+
+    def __init__(
+        self,
+        tcp_server: TCPServer,
+        enforce_tls: bool,
+        min_request_interval: float = SDP_MIN_REQUEST_INTERVAL,
+    ):
+        self.tcp_server = tcp_server
+        self.enforce_tls = enforce_tls
+        self.min_request_interval = min_request_interval
+        # The SDP responses keyed by the SDP request (both as V2GTP message)
+        self._responses: Dict[bytes, bytes] = {}
+        # The TCP server's (address, TLS port, TCP port) of the responses
+        self._responses_for: Optional[Tuple[str, int, int]] = None
+        # The time of each peer's last answered SDP request
+        self._last_requests: "OrderedDict[str, float]" = OrderedDict()
+        self.answered: int = 0
+        self.rate_limited: int = 0
+
+    def _build_responses(self, ipv6_address: str) -> Dict[bytes, bytes]:
+        # convert IPv6 address from presentation to numeric format
+        ipv6_bytes = socket.inet_pton(socket.AF_INET6, ipv6_address)
+        responses = {}
+        for security in Security.options():
+            for transport in Transport.options():
+                sdp_request = SDPRequest(security, transport)
+                if self.enforce_tls or security == Security.TLS:
+                    port, response_security = self.tcp_server.port_tls, Security.TLS
+                else:
+                    port, response_security = self.tcp_server.port_no_tls, security
+                # The SDPResponse's transport is always TCP, as SDPRequest
+                # with UDP is not supported (see create_sdp_response())
+                sdp_response = SDPResponse(
+                    ipv6_bytes, port, response_security, Transport.TCP
+                )
+                request_bytes = V2GTPMessage(
+                    Protocol.ISO_15118_2,
+                    ISOV2PayloadTypes.SDP_REQUEST,
+                    sdp_request.to_payload(),
+                ).to_bytes()
+                # TODO Determine protocol version
+                responses[request_bytes] = V2GTPMessage(
+                    Protocol.ISO_15118_2,
+                    ISOV2PayloadTypes.SDP_RESPONSE,
+                    sdp_response.to_payload(),
+                ).to_bytes()
+        return responses
+
+    def _get_responses(self) -> Optional[Dict[bytes, bytes]]:
+        ipv6_address = getattr(self.tcp_server, "ipv6_address_host", None)
+        if ipv6_address is None:
+            # The TCP server is not started yet
+            return None
+        responses_for = (
+            ipv6_address,
+            self.tcp_server.port_tls,
+            self.tcp_server.port_no_tls,
+        )
+        if responses_for != self._responses_for:
+            self._responses = self._build_responses(ipv6_address)
+            self._responses_for = responses_for
+            logger.debug(f"Precomputed SDP responses for {responses_for}")
+        return self._responses
+
+    def _is_rate_limited(self, host: str) -> bool:
+        now = time.monotonic()
+        last_request = self._last_requests.get(host)
+        if last_request is not None and now - last_request < self.min_request_interval:
+            return True
+
+        self._last_requests[host] = now
+        self._last_requests.move_to_end(host)
+        if len(self._last_requests) > MAX_RATE_LIMITED_PEERS:
+            self._last_requests.popitem(last=False)
+        return False
+
+    def handle(
+        self,
+        data: bytes,
+        addr: Tuple[str, int],
+        sendto: Callable[[bytes, Tuple[str, int]], None],
+    ) -> bool:
+        """
+        Answers the datagram with 'sendto' if it's an SDP request. Returns
+        False if the datagram is no SDP request known to the fast path (then
+        the communication session handler needs to process it), True if it
+        was answered or dropped because of the rate limiting.
+        """
+        responses = self._get_responses()
+        if responses is None:
+            return False
+        response = responses.get(bytes(data))
+        if response is None:
+            return False
+
+        if self._is_rate_limited(addr[0]):
+            self.rate_limited += 1
+            logger.debug(f"Rate limited SDP request from {addr}")
+            return True
+
+        sendto(response, addr)
+        self.answered += 1
+        logger.debug(f"Answered SDP request from {addr}")
+        return True
+
+    def metrics(self) -> Dict[str, int]:
+        return {"sdp_answered": self.answered, "sdp_rate_limited": self.rate_limited}
@@ -5,7 +5,7 @@ from typing import Tuple
 
 from iso15118.shared.network import get_link_local_full_addr, get_tcp_port
 from iso15118.shared.notifications import TCPClientNotification
-from iso15118.shared.security import get_ssl_context
+from iso15118.shared.security import get_shared_ssl_context
 
 logger = logging.getLogger(__name__)
 
@@ -79,7 +79,7 @@ class TCPServer(asyncio.Protocol):
         server_type = "TCP"
         if tls:
             port = self.port_tls
-            ssl_context = get_ssl_context(True)
+            ssl_context = get_shared_ssl_context(True)
             server_type = "TLS"
         # Initialise socket for IPv6 TCP packets
         # Address family (determines network layer protocol, here IPv6)
@@ -3,14 +3,16 @@ import logging
 import socket
 import struct
 from asyncio import DatagramTransport
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
+from iso15118.secc.transport.sdp_responder import SDPResponder
 from iso15118.shared.messages.v2gtp import V2GTPMessage
 from iso15118.shared.network import SDP_MULTICAST_GROUP, SDP_SERVER_PORT
 from iso15118.shared.notifications import (
     ReceiveTimeoutNotification,
     UDPPacketNotification,
 )
+from iso15118.shared.rcv_queue import ReceiveQueue, create_rcv_queue
 from iso15118.shared.utils import wait_for_tasks
 
 logger = logging.getLogger(__name__)
@@ -33,15 +35,25 @@ class UDPServer(asyncio.DatagramProtocol):
     https://docs.python.org/3/library/asyncio-protocol.html
     """
 
-    def __init__(self, session_handler_queue: asyncio.Queue, iface: str):
+    def __init__(
+        self,
+        session_handler_queue: asyncio.Queue,
+        iface: str,
+        bind_to_iface: bool = False,
+        sdp_responder: Optional[SDPResponder] = None,
+    ):
         self.started: bool = False
         self.iface = iface
+        self.bind_to_iface = bind_to_iface
+        # Answers SDP requests right away, bypassing the receiving queue
+        self.sdp_responder = sdp_responder
         self._session_handler_queue: asyncio.Queue = session_handler_queue
-        self._rcv_queue: asyncio.Queue = asyncio.Queue()
+        # Bounded, so that an SDP flood is dropped here already
+        self._rcv_queue: ReceiveQueue = create_rcv_queue()
         self._transport: Optional[DatagramTransport] = None
 
     @staticmethod
-    def _create_socket(iface: str) -> "socket":
+    def _create_socket(iface: str, bind_to_iface: bool = False) -> "socket":
         """
         This method is necessary because Python does not allow
         async def __init__.
@@ -56,6 +68,15 @@ class UDPServer(asyncio.DatagramProtocol):
         # Allows address to be reused
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
+        # All sockets bound to the SDP server port receive the multicast
+        # datagrams of any interface. If several UDP servers run in one SECC
+        # (one per connector), each one is restricted to its own interface.
+        # Requires the CAP_NET_RAW capability.
+        if bind_to_iface:
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_BINDTODEVICE, iface.encode() + b"\0"
+            )
+
         # Bind the socket to the predefined port for receiving
         # UDP packets (SDP requests)
         sock.bind(("", SDP_SERVER_PORT))
@@ -90,7 +111,7 @@ class UDPServer(asyncio.DatagramProtocol):
         # One protocol instance will be created to serve all client requests
         self._transport, _ = await loop.create_datagram_endpoint(
             lambda: self,
-            sock=self._create_socket(self.iface),
+            sock=self._create_socket(self.iface, self.bind_to_iface),
             reuse_address=True,
         )
 
@@ -123,11 +144,12 @@ class UDPServer(asyncio.DatagramProtocol):
             depends on the transport.
         """
         logger.debug(f"Message received from {addr}: {data.hex()}")
-        try:
-            udp_packet = UDPPacketNotification(bytearray(data), addr)
-            self._rcv_queue.put_nowait((udp_packet, addr))
-        except asyncio.QueueFull:
-            logger.error(f"Dropped packet size {len(data)} from {addr}")
+        if self.sdp_responder and self.sdp_responder.handle(
+            data, addr, self._transport.sendto
+        ):
+            return
+        # Dropped according to the datagram drop policy if the queue is full
+        self._rcv_queue.put_nowait(UDPPacketNotification(bytearray(data), addr))
 
     def error_received(self, exc):
         """
@@ -159,6 +181,10 @@ class UDPServer(asyncio.DatagramProtocol):
         """
         self._transport.sendto(message.to_bytes(), addr)
 
+    def rcv_queue_metrics(self) -> Dict[str, int]:
+        """The queued and dropped datagrams of the receiving queue"""
+        return self._rcv_queue.metrics()
+
     async def rcv_task(self, timeout: int = None):
         """
         This receive task is waiting for a specified time for an answer to the
@@ -171,7 +197,7 @@ class UDPServer(asyncio.DatagramProtocol):
         """
         while True:
             try:
-                udp_packet, _ = await asyncio.wait_for(
+                udp_packet = await asyncio.wait_for(
                     self._rcv_queue.get(), timeout=timeout
                 )
                 self._session_handler_queue.put_nowait(udp_packet)
@@ -10,7 +10,7 @@ import logging
 import pickle
 from abc import ABC, abstractmethod
 from asyncio.streams import StreamReader, StreamWriter
-from typing import List, Optional, Tuple, Type, Union
+from typing import Dict, List, Optional, Tuple, Type, Union
 
 from pydantic import ValidationError
 from typing_extensions import TYPE_CHECKING
@@ -48,9 +48,14 @@ from iso15118.shared.messages.iso15118_20.common_messages import (
 from iso15118.shared.messages.iso15118_20.common_types import (
     V2GMessage as V2GMessageV20,
 )
-from iso15118.shared.messages.v2gtp import V2GTPMessage
-from iso15118.shared.messages.zmq_handler import ZMQHandler
+from iso15118.shared.messages.v2gtp import V2GTPMessage, V2GTPStreamReader
+from iso15118.shared.native_exi_codec import EXITemplate
 from iso15118.shared.notifications import StopNotification
+from iso15118.shared.settings import (
+    SESSION_DATA_LINK_GRACE_PERIOD,
+    SESSION_GRACE_PERIODS,
+    SESSION_TCP_GRACE_PERIOD,
+)
 from iso15118.shared.states import Pause, State, Terminate
 from iso15118.shared.utils import wait_for_tasks
 
@@ -70,6 +75,43 @@ if TYPE_CHECKING:
     from iso15118.secc.comm_session_handler import SECCCommunicationSession
 
 
+def parse_grace_periods(
+    entries: Dict[str, str]
+) -> Dict[Protocol, Tuple[float, float]]:
+    """
+    Parses the per-protocol grace periods configured with SESSION_GRACE_PERIODS,
+    given as {'PROTOCOL': 'data_link:tcp'} entries.
+    """
+    grace_periods: Dict[Protocol, Tuple[float, float]] = {}
+    for protocol, periods in entries.items():
+        try:
+            data_link, tcp = periods.split(":")
+            grace_periods[Protocol[protocol.strip().upper()]] = (
+                float(data_link),
+                float(tcp),
+            )
+        except (KeyError, ValueError) as exc:
+            raise ValueError(
+                f"Invalid grace periods '{protocol}={periods}' configured with key "
+                "'SESSION_GRACE_PERIODS'. Expected 'PROTOCOL=data_link:tcp'"
+            ) from exc
+    return grace_periods
+
+
+_grace_periods = parse_grace_periods(SESSION_GRACE_PERIODS)
+
+
+def session_grace_periods(protocol: Protocol) -> Tuple[float, float]:
+    """
+    Returns the grace periods (in seconds) after which the data link of a
+    stopped session is paused or terminated and, thereafter, its TCP
+    connection is closed.
+    """
+    return _grace_periods.get(
+        protocol, (SESSION_DATA_LINK_GRACE_PERIOD, SESSION_TCP_GRACE_PERIOD)
+    )
+
+
 class SessionStateMachine(ABC):
     """
     Each newly established TCP session initiates a communication session, which
@@ -145,15 +187,14 @@ class SessionStateMachine(ABC):
         else:
             return Namespace.ISO_V20_COMMON_MSG
 
-    async def process_message(self, message: bytes):
+    async def process_message(self, v2gtp_msg: V2GTPMessage):
         """
         The following steps are conducted in this state machine's general
         process_message() function:
 
-        1. Try to create a V2GTP (V2G Transfer Protocol) message from the
-           incoming byte stream.
-        2. If step 1 didn't raise a InvalidV2GTPMessageError then we try to
-           EXI decode the V2GTP payload
+        1. The incoming V2GTP (V2G Transfer Protocol) message was already
+           framed and its header checked by the V2GTPStreamReader.
+        2. EXI decode the V2GTP payload
         3. If step 2 didn't raise an EXIDecodingError then we hand over the
            decoded payload to the current state's process_message() function,
            which will create the next message to send - but only in case a new
@@ -163,11 +204,12 @@ class SessionStateMachine(ABC):
            will always send a next response, even if the next state is Terminate.
            The next state to transition to is also determined by the state's
            process_message() method.
+        4. EXI encode the next message (if any) to create the next V2GTP
+           message. Like the decoding in step 2, this runs off the event loop.
 
         Args:
-            message:    The incoming message from the EVCC/SECC, given as a
-                        bytearray (the payload of a V2GTPMessage).
-                        The message can be a
+            v2gtp_msg:  The incoming V2GTPMessage from the EVCC/SECC.
+                        Its payload can be a
                         - SupportedAppProtocolRequest  (EVCC),
                         - SupportedAppProtocolResponse (SECC),
                         - V2GMessage according to the DIN SPEC 70121 standard,
@@ -176,17 +218,8 @@ class SessionStateMachine(ABC):
 
         Raises:
             MessageProcessingError, FaultyStateImplementationError,
-            EXIDecodingError
+            EXIDecodingError, EXIEncodingError
         """
-        # Step 1
-        try:
-            # First extract the V2GMessage payload from the V2GTPMessage ...
-            v2gtp_msg = V2GTPMessage.from_bytes(self.comm_session.protocol, message)
-        except InvalidV2GTPMessageError as exc:
-            logger.exception("Incoming TCPPacket is not a valid V2GTPMessage")
-            # and then decode the bytearray into the message
-            raise MessageProcessingError from exc
-
         # Step 2
         decoded_message: Union[
             SupportedAppProtocolReq,
@@ -197,7 +230,7 @@ class SessionStateMachine(ABC):
             None,
         ] = None
         try:
-            decoded_message = EXI().from_exi(
+            decoded_message = await EXI().from_exi_async(
                 v2gtp_msg.payload, self.get_exi_ns(v2gtp_msg.payload_type)
             )
         except EXIDecodingError as exc:
@@ -231,6 +264,9 @@ class SessionStateMachine(ABC):
             logger.exception(f"{exc}")
             raise exc
 
+        # Step 4
+        await self.current_state.encode_next_message()
+
         if (
                 self.current_state.next_v2gtp_msg is None
                 and self.current_state.next_state is not Terminate
@@ -293,6 +329,7 @@ class V2GCommunicationSession(SessionStateMachine):
         """
         self.protocol: Protocol = Protocol.UNKNOWN
         self.reader, self.writer = transport
+        self.v2gtp_reader = V2GTPStreamReader(self.reader)
         # For timeout, termination, and pausing notifications
         self.session_handler_queue = session_handler_queue
         self.session_id: str = ""
@@ -322,8 +359,9 @@ class V2GCommunicationSession(SessionStateMachine):
         # or due to a failure (False), plus additional info regarding the reason behind.
         self.stop_reason: Optional[StopNotification] = None
         self.last_message_sent: Optional[V2GTPMessage] = None
+        # The EXI templates of the charge loop messages (see TEMPLATE_MESSAGES)
+        self.exi_templates: Dict[Tuple[str, str], EXITemplate] = {}
         self._started: bool = True
-        self.zmq = ZMQHandler()
         logger.info("Starting a new communication session")
         SessionStateMachine.__init__(self, start_state, comm_session)
 
@@ -343,9 +381,6 @@ class V2GCommunicationSession(SessionStateMachine):
             await wait_for_tasks(tasks)
         finally:
             self._started = False
-            # await self.zmq.send_message(state="finally",
-            #                             message=pickle.dumps("Finally done"),
-            #                             )
 
     @abstractmethod
     def save_session_info(self):
@@ -353,11 +388,15 @@ class V2GCommunicationSession(SessionStateMachine):
 
     async def stop(self, reason: str):
         """
-        Closes the TCP connection after 5 seconds and terminates or pauses the
-        data link for this V2GCommunicationSession object after 2 seconds to
-        make sure any message that needs to be sent can still go through.
-        TODO check if that really makes sense of if TCP should be terminated
-             after 2 s and the data link after 5 s
+        Schedules the termination or pausing of the data link for this
+        V2GCommunicationSession object and the closing of the TCP connection
+        thereafter (by default after 2 and 5 seconds, see
+        session_grace_periods()), to make sure any message that needs to be
+        sent can still go through.
+
+        The teardown runs on the event loop's timers, so this method returns
+        right away and the session handler can release the session as soon
+        as the last message is flushed (see send()).
 
         Especially necessary for the SECC, which needs to send a response with
         a FAILED response code or a SessionStopRes with response code "OK"
@@ -373,19 +412,29 @@ class V2GCommunicationSession(SessionStateMachine):
         else:
             terminate_or_pause = "Terminate"
 
+        data_link_grace_period, tcp_grace_period = session_grace_periods(
+            self.protocol
+        )
         logger.info(
-            f"The data link will {terminate_or_pause} in 2 seconds and "
-            "the TCP connection will close in 5 seconds. "
+            f"The data link will {terminate_or_pause} in {data_link_grace_period} "
+            "seconds and the TCP connection will close in "
+            f"{data_link_grace_period + tcp_grace_period} seconds. "
         )
         logger.info(f"Reason: {reason}")
 
-        await asyncio.sleep(2)
+        loop = asyncio.get_running_loop()
+        loop.call_later(data_link_grace_period, self._end_data_link, terminate_or_pause)
+        loop.call_later(
+            data_link_grace_period + tcp_grace_period, self._close_tcp_connection
+        )
+
+    def _end_data_link(self, terminate_or_pause: str):
         # TODO Signal data link layer to either terminate or pause the data
         #      link connection
         logger.info(f"{terminate_or_pause}d the data link")
-        await asyncio.sleep(3)
+
+    def _close_tcp_connection(self):
         self.writer.close()
-        await self.writer.wait_closed()
         logger.info(
             "TCP connection closed to peer with address "
             f"{self.writer.get_extra_info('peername')}"
@@ -421,12 +470,13 @@ class V2GCommunicationSession(SessionStateMachine):
         """
         while True:
             try:
-                # The biggest message is the Certificate Installation Response,
-                # which is estimated to be maximum between 5k to 6k
-                # TODO check if that still holds with -20 (e.g. cross certs)
-                message = await asyncio.wait_for(self.reader.read(7000), timeout)
+                # Reads exactly one V2GTP message, however TCP segments it
+                message = await asyncio.wait_for(
+                    self.v2gtp_reader.read_message(self.comm_session.protocol),
+                    timeout,
+                )
 
-                if message == b"" and self.reader.at_eof():
+                if message is None:
                     stop_reason: str = "TCP peer closed connection"
                     await self.stop(reason=stop_reason)
                     self.session_handler_queue.put_nowait(
@@ -459,6 +509,17 @@ class V2GCommunicationSession(SessionStateMachine):
                 await self.stop(reason=error_msg)
                 self.session_handler_queue.put_nowait(self.stop_reason)
                 return
+            except InvalidV2GTPMessageError as exc:
+                # The message boundaries in the TCP stream are lost
+                logger.exception("Incoming TCPPacket is not a valid V2GTPMessage")
+                stop_reason: str = f"{exc.__class__.__name__} occurred: {exc}"
+                self.stop_reason = StopNotification(
+                    False, stop_reason, self.writer.get_extra_info("peername")
+                )
+
+                await self.stop(reason=stop_reason)
+                self.session_handler_queue.put_nowait(self.stop_reason)
+                return
 
             try:
                 # This will create the values needed for the next state, such as
@@ -93,6 +93,13 @@ class EXIDecodingError(Exception):
     """Is thrown when trying to EXI decode an incoming byte stream"""
 
 
+class EXIGrammarError(Exception):
+    """
+    Is thrown when an EXI grammar cannot be built from an XSD schema, e.g.
+    because the schema uses a construct the native EXI codec does not support
+    """
+
+
 class InvalidSettingsValueError(Exception):
     """
     Is thrown when a setting is read and the value is invalid.
@@ -221,3 +228,28 @@ class NoSupportedProtocols(Exception):
 
 class NoSupportedAuthenticationModes(Exception):
     """Is thrown when no supported authentication modes are configured"""
+
+
+class ControllerTimeoutError(Exception):
+    """
+    Is thrown when the EVSE controller doesn't reply to a request within the
+    request's deadline
+    """
+
+
+class ControllerConnectionError(Exception):
+    """
+    Is thrown when a request to the EVSE controller failed, or was dropped
+    because the connection to the controller was reset
+    """
+
+
+class ControllerRequestError(Exception):
+    """Is thrown when the EVSE controller replies to a request with an error"""
+
+
+class InvalidControllerMessageError(Exception):
+    """
+    Is thrown when a request to or a reply from the EVSE controller can't be
+    decoded, e.g. because of an unsupported wire format version
+    """
@@ -1,14 +1,23 @@
+import asyncio
 import base64
+import hashlib
+import inspect
 import json
 import logging
+import threading
 from base64 import b64decode, b64encode
-from typing import Union
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
+from pydantic import BaseModel as PydanticBaseModel
 from pydantic import ValidationError
 
 from iso15118.shared.exceptions import EXIDecodingError, EXIEncodingError
+from iso15118.shared.exi_codec_pool import EXICodecPool, StructuredEXICodecPool
+from iso15118.shared.exi_warm_up import warm_up_exi_codec
 from iso15118.shared.exificient_exi_codec import ExificientEXICodec
-from iso15118.shared.iexi_codec import IEXICodec
+from iso15118.shared.iexi_codec import IEXICodec, IStructuredEXICodec
 from iso15118.shared.messages import BaseModel
 from iso15118.shared.messages.app_protocol import (
     SupportedAppProtocolReq,
@@ -17,55 +26,177 @@ from iso15118.shared.messages.app_protocol import (
 from iso15118.shared.messages.din_spec.msgdef import V2GMessage as V2GMessageDINSPEC
 from iso15118.shared.messages.enums import Namespace
 from iso15118.shared.messages.iso15118_2.msgdef import V2GMessage as V2GMessageV2
-from iso15118.shared.messages.iso15118_20.ac import (
-    ACChargeLoopReq,
-    ACChargeLoopRes,
-    ACChargeParameterDiscoveryReq,
-    ACChargeParameterDiscoveryRes,
-)
-from iso15118.shared.messages.iso15118_20.common_messages import (
-    AuthorizationReq as AuthorizationReqV20,
-)
-from iso15118.shared.messages.iso15118_20.common_messages import (
-    AuthorizationRes,
-    AuthorizationSetupReq,
-    AuthorizationSetupRes,
-    CertificateInstallationReq,
-    CertificateInstallationRes,
-    PowerDeliveryReq,
-    PowerDeliveryRes,
-    ScheduleExchangeReq,
-    ScheduleExchangeRes,
-    ServiceDetailReq,
-    ServiceDetailRes,
-    ServiceDiscoveryReq,
-    ServiceDiscoveryRes,
-    ServiceSelectionReq,
-    ServiceSelectionRes,
-    SessionSetupReq,
-    SessionSetupRes,
-    SessionStopReq,
-    SessionStopRes,
+from iso15118.shared.messages.iso15118_20 import (
+    ac,
+    acd_p,
+    common_messages,
+    dc,
+    wpt,
 )
 from iso15118.shared.messages.iso15118_20.common_types import (
     V2GMessage as V2GMessageV20,
 )
-from iso15118.shared.messages.iso15118_20.dc import (
-    DCCableCheckReq,
-    DCCableCheckRes,
-    DCChargeLoopReq,
-    DCChargeLoopRes,
-    DCChargeParameterDiscoveryReq,
-    DCChargeParameterDiscoveryRes,
-    DCPreChargeReq,
-    DCPreChargeRes,
-    DCWeldingDetectionReq,
-    DCWeldingDetectionRes,
+from iso15118.shared.messages.xmldsig import Signature, SignedInfo
+from iso15118.shared.native_exi_codec import EXITemplate, NativeEXICodec
+from iso15118.shared.settings import (
+    EXI_CACHE_SIZE,
+    EXI_CODEC_THREADS,
+    MESSAGE_LOG_EXI,
+    MESSAGE_LOG_JSON,
 )
-from iso15118.shared.settings import MESSAGE_LOG_EXI, MESSAGE_LOG_JSON
 
 logger = logging.getLogger(__name__)
 
+# The messages that are sent repeatedly throughout a session with only a few
+# changed values, and are therefore encoded by patching an EXI template
+TEMPLATE_MESSAGES = {
+    "CurrentDemandReq",
+    "CurrentDemandRes",
+    "ChargingStatusReq",
+    "ChargingStatusRes",
+    "AC_ChargeLoopReq",
+    "AC_ChargeLoopRes",
+    "DC_ChargeLoopReq",
+    "DC_ChargeLoopRes",
+}
+
+# The messages whose EXI encodings are kept in the EXIResultCache, as they are
+# identical across sessions or sent again unchanged: the SupportedAppProtocol
+# handshake, the offered services and the certificate chains of signed
+# messages. Failed responses are cached as well (see EXI._is_cached()). Other
+# messages carry per-session or changing values (e.g. the charge loop
+# messages), so hashing them would only cost time and evict these.
+CACHED_MESSAGES = {
+    "supportedAppProtocolReq",
+    "supportedAppProtocolRes",
+    "ServiceDiscoveryRes",
+    "CertificateChain",
+}
+
+
+# A bytes field index maps the (aliased) field names of a pydantic model, whose
+# type is bytes or List[bytes], to True and the field names of nested models
+# (or lists thereof) with bytes fields to the index of that nested model
+BytesFieldIndex = Dict[str, Union[bool, "BytesFieldIndex"]]
+
+
+class MessageEntry(NamedTuple):
+    """
+    The pydantic class of a root element, the parser for its content and the
+    index of its bytes fields
+    """
+
+    msg_class: Type[BaseModel]
+    parse: Callable[[dict], BaseModel]
+    bytes_fields: BytesFieldIndex
+
+
+def _build_bytes_field_index(
+    model: Type[PydanticBaseModel], indexes: Dict[type, BytesFieldIndex]
+) -> BytesFieldIndex:
+    """
+    Collects the fields of the model (and its nested models) that hold bytes,
+    which the JSON representation carries Base64 encoded.
+    """
+    if model in indexes:
+        return indexes[model]
+    index: BytesFieldIndex = {}
+    indexes[model] = index
+    for field in model.__fields__.values():
+        # For List[X], type_ is X
+        field_type = field.type_
+        if not inspect.isclass(field_type):
+            continue
+        if issubclass(field_type, bytes):
+            index[field.alias] = True
+        elif issubclass(field_type, PydanticBaseModel):
+            nested_index = _build_bytes_field_index(field_type, indexes)
+            if nested_index:
+                index[field.alias] = nested_index
+    return index
+
+
+def _decode_bytes_fields(content, index: BytesFieldIndex):
+    """
+    Base64 decodes the values of all bytes fields of the given content (a dict
+    or a list of dicts) in place
+    """
+    if isinstance(content, list):
+        for item in content:
+            _decode_bytes_fields(item, index)
+        return
+    if not isinstance(content, dict):
+        return
+    for key, value in content.items():
+        node = index.get(key)
+        if node is None:
+            continue
+        if node is True:
+            if isinstance(value, list):
+                content[key] = [b64decode(item) for item in value]
+            else:
+                content[key] = b64decode(value)
+        else:
+            _decode_bytes_fields(value, node)
+
+
+def _build_message_registry() -> Dict[Tuple[str, str], MessageEntry]:
+    """
+    Maps each (namespace, root element name) pair that from_exi() can decode to
+    the pydantic class of that root element. The ISO 15118-20 messages are
+    collected from their message modules, so newly added messages are picked
+    up without touching the EXI codec.
+    """
+    roots: Dict[Tuple[str, str], Type[BaseModel]] = {
+        (Namespace.SAP, "supportedAppProtocolReq"): SupportedAppProtocolReq,
+        (Namespace.SAP, "supportedAppProtocolRes"): SupportedAppProtocolRes,
+        (Namespace.DIN_MSG_DEF, "V2G_Message"): V2GMessageDINSPEC,
+        (Namespace.ISO_V2_MSG_DEF, "V2G_Message"): V2GMessageV2,
+        (Namespace.XML_DSIG, "SignedInfo"): SignedInfo,
+        (Namespace.XML_DSIG, "Signature"): Signature,
+    }
+
+    v20_modules = {
+        Namespace.ISO_V20_COMMON_MSG: common_messages,
+        Namespace.ISO_V20_AC: ac,
+        Namespace.ISO_V20_DC: dc,
+        Namespace.ISO_V20_WPT: wpt,
+        Namespace.ISO_V20_ACDP: acd_p,
+    }
+    for namespace, module in v20_modules.items():
+        for msg_class in vars(module).values():
+            if (
+                not inspect.isclass(msg_class)
+                or not issubclass(msg_class, BaseModel)
+                or msg_class.__module__ != module.__name__
+            ):
+                continue
+            # Messages either extend V2GMessage or (if not yet implemented)
+            # at least return their XSD-conform name with __str__()
+            if not (
+                issubclass(msg_class, V2GMessageV20) or "__str__" in vars(msg_class)
+            ):
+                continue
+            msg_name = str(msg_class.construct())
+            if msg_name.endswith(("Req", "Res")):
+                roots[(namespace, msg_name)] = msg_class
+                # The ISO 15118-20 messages are also found by their name only,
+                # in case a message is decoded with another -20 namespace
+                roots[(Namespace.ISO_V20_BASE, msg_name)] = msg_class
+
+    indexes: Dict[type, BytesFieldIndex] = {}
+    return {
+        (namespace.value, root): MessageEntry(
+            msg_class,
+            msg_class.parse_obj,
+            _build_bytes_field_index(msg_class, indexes),
+        )
+        for (namespace, root), msg_class in roots.items()
+    }
+
+
+MESSAGE_REGISTRY = _build_message_registry()
+
 
 class CustomJSONEncoder(json.JSONEncoder):
     """
@@ -81,72 +212,57 @@ class CustomJSONEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, o)
 
 
-class CustomJSONDecoder(json.JSONDecoder):
+class EXIResultCache:
     """
-    Custom JSON decoder to allow the decoding of Base64 encoded bytes back to
-    raw bytes.
-
-    We use a custom object_hook() function for json.JSONDecoder to match the
-    corresponding ISO 15118 message and datatype fields that we know have a
-    bytes value and are serialised as Base64 encoded (base64_encoded_fields_set)
-    and then decode each matching dict entry from Base64 back to raw bytes.
+    A bounded, thread-safe LRU cache of EXI encoded messages. Some responses
+    are identical across sessions (e.g. the SupportedAppProtocolRes for a
+    given list of offered protocols) or repeat within a session, so there's
+    no need to run them through the EXI codec again. Only those messages are
+    cached (see CACHED_MESSAGES).
+
+    The key is a stable hash of the message content (the JSON representation
+    with sorted keys) plus the XSD namespace.
     """
 
-    base64_encoded_fields_set = {
-        "Certificate",
-        "DHPublicKey",
-        "GenChallenge",
-        "MeterSignature",
-        "OEMProvisioningCert",
-        "SECP521_EncryptedPrivateKey",
-        "SigMeterReading",
-        "TPM_EncryptedPrivateKey",
-        "Value",
-        "value",
-        "X448_EncryptedPrivateKey",
-        "DigestValue",
-    }
-
-    def __init__(self, *args, **kwargs):
-        json.JSONDecoder.__init__(self, object_hook=self.object_hook, *args, **kwargs)
-
-    def object_hook(self, dct) -> dict:
-        for field in self.base64_encoded_fields_set.intersection(set(dct)):
-            # 'Value' (or 'value') can be an integer field in the pydantic model
-            # PhysicalValue (ISO 15118-2) and RationalNumber (ISO 15118-20) and
-            # a string in EMAID. But it can also be a bytes field in the
-            # pydantic model EncryptedPrivateKey. So we need to make sure to
-            # only Base64 decode the one that is for sure not of type integer
-            # or string. But for the string case, we need to distinguish
-            # between a Base64 encoded string and a normal string (like the
-            # one in EMAID).
-            # TODO Need to find a better way, feels more and more like a hack
-            if field in ("Value", "value") and isinstance(dct[field], int):
-                continue
-
-            if field in ("Value", "value") and isinstance(dct[field], str):
-                # Trying to distinguish and EMAID value string from an
-                # EncryptedPrivateKey value string. The latter is Base64
-                # encoded. An EMAID is 14 or 15 characters long, a Base64
-                # encoded EncryptedPrivateKey is definitely bigger.
-                # Feels like a hack, is a hack, but what else shall we do ...?
-                if len(dct[field]) <= 15:
-                    continue
-
-            if field == "Certificate" and isinstance(dct[field], list):
-                # The types CertificateChain and SubCertificates both have fields
-                # with the name `Certificate`. However, in `CertificateChain`
-                # the field is of the type bytes, whilst in `SubCertificates` is
-                # of the type list[bytes].
-                # This difference needs to be taken into account; so here we look
-                # for the list type, decode its elements and substitute the entry
-                # in the dict with the new list.
-                certificate_list = [b64decode(value) for value in dct[field]]
-                dct[field] = certificate_list
-                continue
-
-            dct[field] = b64decode(dct[field])
-        return dct
+    def __init__(self, max_size: int = EXI_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(message_dict: dict, protocol_ns: str) -> bytes:
+        content = json.dumps(message_dict, cls=CustomJSONEncoder, sort_keys=True)
+        key = hashlib.blake2b(content.encode(), digest_size=16)
+        key.update(protocol_ns.encode())
+        return key.digest()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            exi_stream = self._entries.get(key)
+            if exi_stream is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return exi_stream
+
+    def put(self, key: bytes, exi_stream: bytes):
+        with self._lock:
+            self._entries[key] = exi_stream
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class EXI:
@@ -154,6 +270,16 @@ class EXI:
     This Singleton class holds onto the EXI codec this session is initialized with.
     If a codec is not specified an instance of the fallback codec is returned.
     The codec to be used will be requested during encode and decode operations.
+
+    The async variants to_exi_async() and from_exi_async() run the codec on a
+    bounded thread pool (see EXI_CODEC_THREADS), so that a slow encoding or
+    decoding doesn't stall the event loop and with it all other sessions. The
+    thread pool has at least as many threads as an EXICodecPool has workers,
+    so that all of them can be busy at once.
+
+    Encoded messages of CACHED_MESSAGES and failed responses are kept in an
+    LRU cache (see EXI_CACHE_SIZE), so that such a message whose content was
+    encoded before skips the codec entirely.
     """
 
     _instance = None
@@ -162,11 +288,20 @@ class EXI:
         if cls._instance is None:
             cls._instance = super(EXI, cls).__new__(cls)
             cls._instance.exi_codec = None
+            cls._instance.executor = None
+            cls._instance.executor_size = 0
+            cls._instance.cache = EXIResultCache()
         return cls._instance
 
     def set_exi_codec(self, codec: IEXICodec):
         logger.info(f"EXI Codec version: {codec.get_version()}")
         self.exi_codec = codec
+        # Another codec may encode differently (e.g. schema-informed or not)
+        self.cache.clear()
+        if self.executor is not None and self.executor_size < self._executor_size():
+            # Too few threads to feed all workers of the pool
+            self.executor.shutdown(wait=False)
+            self.executor = None
 
     def get_exi_codec(self) -> IEXICodec:
         """
@@ -176,6 +311,94 @@ class EXI:
             self.exi_codec = ExificientEXICodec()
         return self.exi_codec
 
+    def get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool the async EXI operations run on, which is
+        created on first use
+        """
+        if self.executor is None:
+            self.executor_size = self._executor_size()
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.executor_size, thread_name_prefix="exi-codec"
+            )
+        return self.executor
+
+    def _executor_size(self) -> int:
+        if isinstance(self.exi_codec, EXICodecPool):
+            return max(EXI_CODEC_THREADS, self.exi_codec.size)
+        return EXI_CODEC_THREADS
+
+    async def warm_up(self) -> bool:
+        """
+        Round-trips a sample message of each namespace through the EXI codec on
+        the codec's thread pool (see exi_warm_up.py), so that the first
+        communication session doesn't pay for loading the grammars. Meant to
+        be awaited before the SDP server or client starts.
+
+        Returns True if the codec handled all sample messages.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        success = await loop.run_in_executor(
+            self.get_executor(), warm_up_exi_codec, self.get_exi_codec()
+        )
+        logger.info(
+            f"EXI codec ready after {(loop.time() - start) * 1000:.0f} ms warm-up"
+            + ("" if success else " (with failures, see warnings)")
+        )
+        return success
+
+    async def to_exi_async(
+        self,
+        msg_element: BaseModel,
+        protocol_ns: str,
+        templates: Optional[Dict[Tuple[str, str], EXITemplate]] = None,
+    ) -> bytes:
+        """
+        Awaitable variant of to_exi(), which encodes the message on the EXI
+        codec's thread pool instead of the event loop. As the caller awaits
+        the result, messages of the same session are still encoded in order.
+
+        If the session's templates are given, the message is encoded with
+        to_exi_from_template().
+
+        Raises:
+            EXIEncodingError
+        """
+        loop = asyncio.get_running_loop()
+        if templates is not None:
+            return await loop.run_in_executor(
+                self.get_executor(),
+                self.to_exi_from_template,
+                msg_element,
+                protocol_ns,
+                templates,
+            )
+        return await loop.run_in_executor(
+            self.get_executor(), self.to_exi, msg_element, protocol_ns
+        )
+
+    async def from_exi_async(
+        self, exi_message: bytes, namespace: str
+    ) -> Union[
+        SupportedAppProtocolReq,
+        SupportedAppProtocolRes,
+        V2GMessageV2,
+        V2GMessageV20,
+        V2GMessageDINSPEC,
+    ]:
+        """
+        Awaitable variant of from_exi(), which decodes the message on the EXI
+        codec's thread pool instead of the event loop.
+
+        Raises:
+            EXIDecodingError
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.get_executor(), self.from_exi, exi_message, namespace
+        )
+
     def to_exi(self, msg_element: BaseModel, protocol_ns: str) -> bytes:
         """
         Encodes the message into a bytes stream using the EXI codec
@@ -190,44 +413,48 @@ class EXI:
             A bytes object, representing the EXI encoded message
         """
         msg_to_dct: dict = msg_element.dict(by_alias=True, exclude_none=True)
-        try:
-            # Pydantic does not export the name of the model itself to a dict,
-            # so we need to add it (the message names like 'SessionSetupReq')
-            if (
-                str(msg_element) == "CertificateChain"
-                and protocol_ns == Namespace.ISO_V2_MSG_DEF
-            ):
-                # TODO: If we add `ContractSignatureCertChain` as the return of __str__
-                #       for the CertificateChain class, do we still need this if clause?
-                # In case of CertificateInstallationRes and CertificateUpdateRes,
-                # str(message) would not be 'ContractSignatureCertChain' but
-                # 'CertificateChain' (the type of ContractSignatureCertChain)
-                message_dict = {"ContractSignatureCertChain": msg_to_dct}
-            elif str(msg_element) == "CertificateChain" and protocol_ns.startswith(
-                Namespace.ISO_V20_BASE
-            ):
-                # TODO: If we add `CPSCertificateChain` as the return of __str__
-                #       for a unique class for V20 or even call it CPSCertificateChain
-                #       do we still need this if clause?
-                # In case of CertificateInstallationRes,
-                # str(message) would not be 'CPSCertificateChain' but
-                # 'CertificateChain' (the type of CPSCertificateChain)
-                message_dict = {"CPSCertificateChain": msg_to_dct}
-            elif str(msg_element) == "SignedCertificateChain":
-                # TODO: If we add `OEMProvisioningCertificateChain` as the
-                #  return of __str__ for the SignedCertificateChain class, do we still
-                #  need this if clause?
-                # In case of CertificateInstallationReq,
-                # str(message) would not be 'OEMProvisioningCertificateChain' but
-                # 'SignedCertificateChain' (the type of OEMProvisioningCertificateChain)
-                message_dict = {"OEMProvisioningCertificateChain": msg_to_dct}
-            elif isinstance(msg_element, V2GMessageV2) or isinstance(
-                msg_element, V2GMessageDINSPEC
-            ):
-                message_dict = {"V2G_Message": msg_to_dct}
-            else:
-                message_dict = {str(msg_element): msg_to_dct}
+        message_dict = self._wrap_message(msg_element, msg_to_dct, protocol_ns)
+
+        cache_key = None
+        if self.cache.max_size > 0 and self._is_cached(msg_element):
+            try:
+                cache_key = self.cache.make_key(message_dict, protocol_ns)
+            except Exception as exc:
+                raise EXIEncodingError(
+                    f"EXIEncodingError for {str(msg_element)}: {exc}"
+                ) from exc
+            exi_stream = self.cache.get(cache_key)
+            if exi_stream is not None:
+                self._log_exi_stream(exi_stream)
+                return exi_stream
+
+        exi_stream = self._encode(msg_element, message_dict, protocol_ns)
+        if cache_key is not None:
+            self.cache.put(cache_key, exi_stream)
+        return exi_stream
 
+    def _encode(
+        self, msg_element: BaseModel, message_dict: dict, protocol_ns: str
+    ) -> bytes:
+        if isinstance(self.exi_codec, IStructuredEXICodec):
+            # The codec takes the dict as is, no need for the JSON text and
+            # the Base64 encoding of the bytes fields
+            if MESSAGE_LOG_JSON:
+                logger.debug(
+                    f"Message to encode: \n{message_dict} "
+                    f"\nXSD namespace: {protocol_ns}"
+                )
+            try:
+                exi_stream = self.exi_codec.encode_dict(message_dict, protocol_ns)
+            except Exception as exc:
+                logger.error(f"EXIEncodingError for {str(msg_element)}: {exc}")
+                raise EXIEncodingError(
+                    f"EXIEncodingError for {str(msg_element)}: " f"{exc}"
+                ) from exc
+            self._log_exi_stream(exi_stream)
+            return exi_stream
+
+        try:
             msg_content = json.dumps(message_dict, cls=CustomJSONEncoder)
         except Exception as exc:
             raise EXIEncodingError(
@@ -248,6 +475,182 @@ class EXI:
                 f"EXIEncodingError for {str(msg_element)}: " f"{exc}"
             ) from exc
 
+        self._log_exi_stream(exi_stream)
+        return exi_stream
+
+    def to_exi_many(
+        self, msg_elements: List[BaseModel], protocol_ns: str
+    ) -> List[bytes]:
+        """
+        Encodes several messages (or message elements) of the same namespace,
+        e.g. the elements referenced by a signature, with a single
+        encode_many() call of the EXI codec for all of them that aren't
+        cached yet.
+
+        Returns:
+            The EXI encoded messages, in the order of msg_elements
+
+        Raises:
+            EXIEncodingError
+        """
+        if isinstance(self.exi_codec, IStructuredEXICodec):
+            # These codecs run in-process, there's no call boundary to save
+            return [
+                self.to_exi(msg_element, protocol_ns) for msg_element in msg_elements
+            ]
+
+        exi_streams: List[Optional[bytes]] = []
+        cache_keys: List[Optional[bytes]] = []
+        to_encode: List[Tuple[str, str]] = []
+        for msg_element in msg_elements:
+            msg_to_dct: dict = msg_element.dict(by_alias=True, exclude_none=True)
+            message_dict = self._wrap_message(msg_element, msg_to_dct, protocol_ns)
+            try:
+                cache_key = (
+                    self.cache.make_key(message_dict, protocol_ns)
+                    if self.cache.max_size > 0 and self._is_cached(msg_element)
+                    else None
+                )
+                exi_stream = self.cache.get(cache_key) if cache_key else None
+                if exi_stream is None:
+                    msg_content = json.dumps(message_dict, cls=CustomJSONEncoder)
+                    to_encode.append((msg_content, protocol_ns))
+            except Exception as exc:
+                raise EXIEncodingError(
+                    f"EXIEncodingError for {str(msg_element)}: {exc}"
+                ) from exc
+            exi_streams.append(exi_stream)
+            cache_keys.append(cache_key)
+
+        if to_encode:
+            if MESSAGE_LOG_JSON:
+                for msg_content, _ in to_encode:
+                    logger.debug(
+                        f"Message to encode: \n{msg_content} "
+                        f"\nXSD namespace: {protocol_ns}"
+                    )
+            try:
+                encoded = iter(self.exi_codec.encode_many(to_encode))
+            except Exception as exc:
+                names = ", ".join(str(msg_element) for msg_element in msg_elements)
+                logger.error(f"EXIEncodingError for {names}: {exc}")
+                raise EXIEncodingError(f"EXIEncodingError for {names}: {exc}") from exc
+
+            for index, exi_stream in enumerate(exi_streams):
+                if exi_stream is None:
+                    exi_streams[index] = next(encoded)
+                    if cache_keys[index] is not None:
+                        self.cache.put(cache_keys[index], exi_streams[index])
+
+        for exi_stream in exi_streams:
+            self._log_exi_stream(exi_stream)
+        return exi_streams
+
+    def to_exi_from_template(
+        self,
+        msg_element: BaseModel,
+        protocol_ns: str,
+        templates: Dict[Tuple[str, str], EXITemplate],
+    ) -> bytes:
+        """
+        Encodes a message that is sent repeatedly (see TEMPLATE_MESSAGES) by
+        patching the changed values into the EXI template of its first
+        encoding, which is kept in the given (per session) templates. Falls
+        back to a full encoding, which replaces the template, if the message
+        can't be patched, e.g. because the encoded width of a value changed.
+
+        Codecs other than the NativeEXICodec (or a pool of them) don't expose
+        the positions of the encoded values, so the message is encoded with
+        to_exi() instead.
+
+        Raises:
+            EXIEncodingError
+        """
+        if not isinstance(self.exi_codec, (NativeEXICodec, StructuredEXICodecPool)):
+            return self.to_exi(msg_element, protocol_ns)
+
+        msg_to_dct: dict = msg_element.dict(by_alias=True, exclude_none=True)
+        message_dict = self._wrap_message(msg_element, msg_to_dct, protocol_ns)
+        key = (protocol_ns, str(msg_element))
+
+        template = templates.get(key)
+        exi_stream = template.patch(message_dict) if template else None
+        if exi_stream is None:
+            if MESSAGE_LOG_JSON:
+                logger.debug(
+                    f"Compiling EXI template for: \n{message_dict} "
+                    f"\nXSD namespace: {protocol_ns}"
+                )
+            try:
+                template = self.exi_codec.compile_template(message_dict, protocol_ns)
+            except Exception as exc:
+                logger.error(f"EXIEncodingError for {str(msg_element)}: {exc}")
+                raise EXIEncodingError(
+                    f"EXIEncodingError for {str(msg_element)}: {exc}"
+                ) from exc
+            templates[key] = template
+            exi_stream = template.exi_stream
+
+        self._log_exi_stream(exi_stream)
+        return exi_stream
+
+    @staticmethod
+    def _is_cached(msg_element: BaseModel) -> bool:
+        """Whether the message's EXI encoding is kept in the cache"""
+        name = str(msg_element)
+        if name in CACHED_MESSAGES:
+            return True
+        if not name.endswith("Res"):
+            return False
+        if isinstance(msg_element, (V2GMessageV2, V2GMessageDINSPEC)):
+            msg_element = msg_element.body.get_message()
+        response_code = getattr(msg_element, "response_code", None)
+        return response_code is not None and response_code.startswith("FAILED")
+
+    @staticmethod
+    def _wrap_message(
+        msg_element: BaseModel, msg_to_dct: dict, protocol_ns: str
+    ) -> dict:
+        """
+        Pydantic does not export the name of the model itself to a dict,
+        so we need to add it (the message names like 'SessionSetupReq')
+        """
+        if (
+            str(msg_element) == "CertificateChain"
+            and protocol_ns == Namespace.ISO_V2_MSG_DEF
+        ):
+            # TODO: If we add `ContractSignatureCertChain` as the return of __str__
+            #       for the CertificateChain class, do we still need this if clause?
+            # In case of CertificateInstallationRes and CertificateUpdateRes,
+            # str(message) would not be 'ContractSignatureCertChain' but
+            # 'CertificateChain' (the type of ContractSignatureCertChain)
+            return {"ContractSignatureCertChain": msg_to_dct}
+        if str(msg_element) == "CertificateChain" and protocol_ns.startswith(
+            Namespace.ISO_V20_BASE
+        ):
+            # TODO: If we add `CPSCertificateChain` as the return of __str__
+            #       for a unique class for V20 or even call it CPSCertificateChain
+            #       do we still need this if clause?
+            # In case of CertificateInstallationRes,
+            # str(message) would not be 'CPSCertificateChain' but
+            # 'CertificateChain' (the type of CPSCertificateChain)
+            return {"CPSCertificateChain": msg_to_dct}
+        if str(msg_element) == "SignedCertificateChain":
+            # TODO: If we add `OEMProvisioningCertificateChain` as the
+            #  return of __str__ for the SignedCertificateChain class, do we still
+            #  need this if clause?
+            # In case of CertificateInstallationReq,
+            # str(message) would not be 'OEMProvisioningCertificateChain' but
+            # 'SignedCertificateChain' (the type of OEMProvisioningCertificateChain)
+            return {"OEMProvisioningCertificateChain": msg_to_dct}
+        if isinstance(msg_element, V2GMessageV2) or isinstance(
+            msg_element, V2GMessageDINSPEC
+        ):
+            return {"V2G_Message": msg_to_dct}
+        return {str(msg_element): msg_to_dct}
+
+    @staticmethod
+    def _log_exi_stream(exi_stream: bytes):
         if MESSAGE_LOG_EXI:
             logger.debug(f"EXI-encoded message: \n{exi_stream.hex()}")
             logger.debug(
@@ -255,8 +658,6 @@ class EXI:
                 f"\n{base64.b64encode(exi_stream).hex()}"
             )
 
-        return exi_stream
-
     def from_exi(
         self, exi_message: bytes, namespace: str
     ) -> Union[
@@ -288,19 +689,26 @@ class EXI:
                 f"\n{base64.b64encode(exi_message).hex()}"
             )
 
+        structured_codec = isinstance(self.exi_codec, IStructuredEXICodec)
         try:
-            exi_decoded = self.exi_codec.decode(exi_message, namespace)
+            if structured_codec:
+                # Bytes fields are decoded as bytes already, no need for
+                # the Base64 decoding with the bytes field index
+                decoded_dict = self.exi_codec.decode_dict(exi_message, namespace)
+            else:
+                exi_decoded = self.exi_codec.decode(exi_message, namespace)
         except Exception as exc:
             raise EXIDecodingError(
                 f"EXIDecodingError ({exc.__class__.__name__}): " f"{exc}"
             ) from exc
-        try:
-            decoded_dict = json.loads(exi_decoded, cls=CustomJSONDecoder)
-        except json.JSONDecodeError as exc:
-            raise EXIDecodingError(
-                f"JSON decoding error ({exc.__class__.__name__}) while "
-                f"processing decoded EXI: {exc}"
-            ) from exc
+        if not structured_codec:
+            try:
+                decoded_dict = json.loads(exi_decoded)
+            except json.JSONDecodeError as exc:
+                raise EXIDecodingError(
+                    f"JSON decoding error ({exc.__class__.__name__}) while "
+                    f"processing decoded EXI: {exc}"
+                ) from exc
 
         if MESSAGE_LOG_JSON:
             logger.debug(
@@ -308,76 +716,30 @@ class EXI:
             )
 
         try:
-            if namespace == Namespace.SAP and "supportedAppProtocolReq" in decoded_dict:
-                return SupportedAppProtocolReq.parse_obj(
-                    decoded_dict["supportedAppProtocolReq"]
+            # The message name (e.g. SessionSetupReq or V2G_Message) is the
+            # first key of the dict, its content is parsed into the message
+            msg_name = next(iter(decoded_dict), None)
+            entry = MESSAGE_REGISTRY.get((namespace, msg_name))
+            if not entry and namespace.startswith(Namespace.ISO_V20_BASE):
+                entry = MESSAGE_REGISTRY.get((Namespace.ISO_V20_BASE, msg_name))
+            if not entry:
+                logger.error(
+                    "Unable to identify message to parse given the message "
+                    f"name {msg_name} and namespace {namespace}"
                 )
-
-            if namespace == Namespace.SAP and "supportedAppProtocolRes" in decoded_dict:
-                return SupportedAppProtocolRes.parse_obj(
-                    decoded_dict["supportedAppProtocolRes"]
-                )
-
-            if namespace == Namespace.DIN_MSG_DEF:
-                return V2GMessageDINSPEC.parse_obj(decoded_dict["V2G_Message"])
-
-            if namespace == Namespace.ISO_V2_MSG_DEF:
-                return V2GMessageV2.parse_obj(decoded_dict["V2G_Message"])
-
-            if namespace.startswith(Namespace.ISO_V20_BASE):
-                # The message name is the first key of the dict
-                msg_name = next(iter(decoded_dict))
-                # When parsing the dict, we need to remove the first key, which is
-                # the message name itself (e.g. SessionSetupReq)
-                msg_dict = decoded_dict[msg_name]
-                msg_classes_dict = {
-                    "SessionSetupReq": SessionSetupReq,
-                    "SessionSetupRes": SessionSetupRes,
-                    "AuthorizationSetupReq": AuthorizationSetupReq,
-                    "AuthorizationSetupRes": AuthorizationSetupRes,
-                    "CertificateInstallationReq": CertificateInstallationReq,
-                    "CertificateInstallationRes": CertificateInstallationRes,
-                    "AuthorizationReq": AuthorizationReqV20,
-                    "AuthorizationRes": AuthorizationRes,
-                    "ServiceDiscoveryReq": ServiceDiscoveryReq,
-                    "ServiceDiscoveryRes": ServiceDiscoveryRes,
-                    "ServiceDetailReq": ServiceDetailReq,
-                    "ServiceDetailRes": ServiceDetailRes,
-                    "ServiceSelectionReq": ServiceSelectionReq,
-                    "ServiceSelectionRes": ServiceSelectionRes,
-                    "AC_ChargeParameterDiscoveryReq": ACChargeParameterDiscoveryReq,
-                    "AC_ChargeParameterDiscoveryRes": ACChargeParameterDiscoveryRes,
-                    "DC_ChargeParameterDiscoveryReq": DCChargeParameterDiscoveryReq,
-                    "DC_ChargeParameterDiscoveryRes": DCChargeParameterDiscoveryRes,
-                    "ScheduleExchangeReq": ScheduleExchangeReq,
-                    "ScheduleExchangeRes": ScheduleExchangeRes,
-                    "DC_CableCheckReq": DCCableCheckReq,
-                    "DC_CableCheckRes": DCCableCheckRes,
-                    "DC_PreChargeReq": DCPreChargeReq,
-                    "DC_PreChargeRes": DCPreChargeRes,
-                    "PowerDeliveryReq": PowerDeliveryReq,
-                    "PowerDeliveryRes": PowerDeliveryRes,
-                    "AC_ChargeLoopReq": ACChargeLoopReq,
-                    "AC_ChargeLoopRes": ACChargeLoopRes,
-                    "DC_ChargeLoopReq": DCChargeLoopReq,
-                    "DC_ChargeLoopRes": DCChargeLoopRes,
-                    "DC_WeldingDetectionReq": DCWeldingDetectionReq,
-                    "DC_WeldingDetectionRes": DCWeldingDetectionRes,
-                    "SessionStopReq": SessionStopReq,
-                    "SessionStopRes": SessionStopRes,
-                    # TODO add all the other message types and states
-                }
-                msg_class = msg_classes_dict.get(msg_name)
-                if not msg_class:
-                    logger.error(
-                        "Unable to identify message to parse given the message "
-                        f"name {msg_name}"
-                    )
-                    raise EXIDecodingError(f"Unable to decode {msg_name}")
-
-                return msg_class.parse_obj(msg_dict)
-
-            raise EXIDecodingError("Can't identify protocol to use for decoding")
+                raise EXIDecodingError(f"Unable to decode {msg_name}")
+
+            msg_content = decoded_dict[msg_name]
+            if not structured_codec and entry.bytes_fields:
+                try:
+                    _decode_bytes_fields(msg_content, entry.bytes_fields)
+                except (TypeError, ValueError) as exc:
+                    raise EXIDecodingError(
+                        f"Base64 decoding error ({exc.__class__.__name__}) "
+                        f"while processing decoded EXI: {exc}"
+                    ) from exc
+
+            return entry.parse(msg_content)
         except ValidationError as exc:
             raise EXIDecodingError(
                 f"Error parsing the decoded EXI into a Pydantic class: {exc}. "
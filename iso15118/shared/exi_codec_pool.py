@@ -0,0 +1,296 @@
+"""
+A pool of EXI codec workers, so that the EXI work of many concurrent
+communication sessions isn't serialised through a single codec instance
+(e.g. a single JavaGateway in case of the ExificientEXICodec).
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from iso15118.shared.iexi_codec import IEXICodec, IStructuredEXICodec
+from iso15118.shared.settings import (
+    EXI_CODEC_HEALTH_CHECK_INTERVAL,
+    EXI_CODEC_POOL_SIZE,
+    EXI_CODEC_WORKER_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# The codec instance of a worker process, see _ProcessCodec
+_process_codec: Optional[IEXICodec] = None
+
+
+def _init_process_codec(codec_factory: Callable[[], IEXICodec]):
+    global _process_codec
+    _process_codec = codec_factory()
+
+
+def _process_encode(message: str, namespace: str) -> bytes:
+    return _process_codec.encode(message, namespace)
+
+
+def _process_decode(stream: bytes, namespace: str) -> str:
+    return _process_codec.decode(stream, namespace)
+
+
+def _process_encode_many(messages: List[Tuple[str, str]]) -> List[bytes]:
+    return _process_codec.encode_many(messages)
+
+
+def _process_decode_many(streams: List[Tuple[bytes, str]]) -> List[str]:
+    return _process_codec.decode_many(streams)
+
+
+def _process_encode_dict(message: dict, namespace: str) -> bytes:
+    return _process_codec.encode_dict(message, namespace)
+
+
+def _process_decode_dict(stream: bytes, namespace: str) -> dict:
+    return _process_codec.decode_dict(stream, namespace)
+
+
+def _process_compile_template(message: dict, namespace: str):
+    return _process_codec.compile_template(message, namespace)
+
+
+def _process_get_version() -> str:
+    return _process_codec.get_version()
+
+
+class _ProcessCodec(IEXICodec):
+    """
+    Runs a codec in a dedicated worker process. The codec factory must be
+    picklable (e.g. the codec class itself).
+    """
+
+    def __init__(self, codec_factory: Callable[[], IEXICodec], timeout: float):
+        self.timeout = timeout
+        self.executor = ProcessPoolExecutor(
+            max_workers=1,
+            initializer=_init_process_codec,
+            initargs=(codec_factory,),
+        )
+
+    def encode(self, message: str, namespace: str) -> bytes:
+        future = self.executor.submit(_process_encode, message, namespace)
+        return future.result(self.timeout)
+
+    def decode(self, stream: bytes, namespace: str) -> str:
+        future = self.executor.submit(_process_decode, stream, namespace)
+        return future.result(self.timeout)
+
+    def encode_many(self, messages: List[Tuple[str, str]]) -> List[bytes]:
+        future = self.executor.submit(_process_encode_many, messages)
+        return future.result(self.timeout)
+
+    def decode_many(self, streams: List[Tuple[bytes, str]]) -> List[str]:
+        future = self.executor.submit(_process_decode_many, streams)
+        return future.result(self.timeout)
+
+    def encode_dict(self, message: dict, namespace: str) -> bytes:
+        future = self.executor.submit(_process_encode_dict, message, namespace)
+        return future.result(self.timeout)
+
+    def decode_dict(self, stream: bytes, namespace: str) -> dict:
+        future = self.executor.submit(_process_decode_dict, stream, namespace)
+        return future.result(self.timeout)
+
+    def compile_template(self, message: dict, namespace: str):
+        future = self.executor.submit(_process_compile_template, message, namespace)
+        return future.result(self.timeout)
+
+    def get_version(self) -> str:
+        return self.executor.submit(_process_get_version).result(self.timeout)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _CodecWorker:
+    def __init__(
+        self,
+        index: int,
+        codec_factory: Callable[[], IEXICodec],
+        use_processes: bool,
+        timeout: float,
+    ):
+        self.index = index
+        self.codec_factory = codec_factory
+        self.use_processes = use_processes
+        self.timeout = timeout
+        self.restarts = 0
+        self.codec: IEXICodec = self._create_codec()
+
+    def _create_codec(self) -> IEXICodec:
+        if self.use_processes:
+            return _ProcessCodec(self.codec_factory, self.timeout)
+        return self.codec_factory()
+
+    def is_healthy(self) -> bool:
+        try:
+            self.codec.get_version()
+            return True
+        except Exception as exc:
+            logger.warning(f"EXI codec worker {self.index} is unhealthy: {exc}")
+            return False
+
+    def restart(self):
+        logger.warning(f"Restarting EXI codec worker {self.index}")
+        close = getattr(self.codec, "close", None)
+        if close:
+            try:
+                close()
+            except Exception as exc:
+                logger.debug(f"Closing EXI codec worker {self.index} failed: {exc}")
+        self.codec = self._create_codec()
+        self.restarts += 1
+
+
+class EXICodecPool(IEXICodec):
+    """
+    Fans encode and decode requests out across a fixed number of codec
+    workers. Each worker owns its own codec instance, created by the given
+    codec factory, either in this process (e.g. one JavaGateway per
+    ExificientEXICodec) or in a dedicated worker process, which lets CPU bound
+    codecs like the NativeEXICodec scale with the number of cores.
+
+    A worker whose request fails is health checked (get_version()) and
+    restarted if it doesn't respond anymore, in which case the request is
+    retried once on the restarted worker. Idle workers are also health checked
+    periodically if a health check interval is given.
+
+    The pool is thread-safe, so it can be used with EXI().to_exi_async() and
+    EXI().from_exi_async(), which run on EXI_CODEC_THREADS threads. A request
+    waits for an idle worker for at most the worker timeout, so that the
+    synchronous EXI calls on the event loop (e.g. the encoding of signed
+    fragments) can't stall it for longer.
+
+    If the codec factory is a codec class implementing IStructuredEXICodec
+    (e.g. the NativeEXICodec), the pool is a StructuredEXICodecPool, which
+    delegates encode_dict(), decode_dict() and compile_template() as well.
+    """
+
+    def __new__(cls, codec_factory: Callable[[], IEXICodec], *args, **kwargs):
+        if (
+            cls is EXICodecPool
+            and isinstance(codec_factory, type)
+            and issubclass(codec_factory, IStructuredEXICodec)
+        ):
+            cls = StructuredEXICodecPool
+        return super().__new__(cls)
+
+    def __init__(
+        self,
+        codec_factory: Callable[[], IEXICodec],
+        size: int = EXI_CODEC_POOL_SIZE,
+        use_processes: bool = False,
+        health_check_interval: float = EXI_CODEC_HEALTH_CHECK_INTERVAL,
+        timeout: float = EXI_CODEC_WORKER_TIMEOUT,
+    ):
+        if size < 1:
+            raise ValueError(f"EXI codec pool size must be at least 1, got {size}")
+        self.size = size
+        self.timeout = timeout
+        self.workers: List[_CodecWorker] = [
+            _CodecWorker(index, codec_factory, use_processes, timeout)
+            for index in range(size)
+        ]
+        self._idle_workers: "queue.Queue[_CodecWorker]" = queue.Queue()
+        for worker in self.workers:
+            self._idle_workers.put(worker)
+
+        self._stopped = threading.Event()
+        if health_check_interval > 0:
+            threading.Thread(
+                target=self._health_check_loop,
+                args=(health_check_interval,),
+                name="exi-codec-pool-health",
+                daemon=True,
+            ).start()
+
+    def encode(self, message: str, namespace: str) -> bytes:
+        return self._run(lambda codec: codec.encode(message, namespace))
+
+    def decode(self, stream: bytes, namespace: str) -> str:
+        return self._run(lambda codec: codec.decode(stream, namespace))
+
+    def encode_many(self, messages: List[Tuple[str, str]]) -> List[bytes]:
+        # The whole batch goes to one worker, so that it's a single call
+        return self._run(lambda codec: codec.encode_many(messages))
+
+    def decode_many(self, streams: List[Tuple[bytes, str]]) -> List[str]:
+        return self._run(lambda codec: codec.decode_many(streams))
+
+    def get_version(self) -> str:
+        return f"EXICodecPool ({self.size} workers): {self._run(IEXICodec.get_version)}"
+
+    def _run(self, operation: Callable[[IEXICodec], object]):
+        try:
+            worker = self._idle_workers.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No idle EXI codec worker within {self.timeout} s"
+            ) from None
+        try:
+            try:
+                return operation(worker.codec)
+            except Exception:
+                # An invalid message raises as well, so only a worker that
+                # fails the health check is considered to have crashed
+                if worker.is_healthy():
+                    raise
+                worker.restart()
+                return operation(worker.codec)
+        finally:
+            self._idle_workers.put(worker)
+
+    def check_health(self) -> int:
+        """
+        Health checks all currently idle workers and restarts the unhealthy
+        ones. Returns the number of restarted workers.
+        """
+        restarted = 0
+        for _ in range(self._idle_workers.qsize()):
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if not worker.is_healthy():
+                    worker.restart()
+                    restarted += 1
+            except Exception as exc:
+                logger.error(
+                    f"Failed to restart EXI codec worker {worker.index}: {exc}"
+                )
+            finally:
+                self._idle_workers.put(worker)
+        return restarted
+
+    def _health_check_loop(self, interval: float):
+        while not self._stopped.wait(interval):
+            self.check_health()
+
+    def close(self):
+        """Stops the health checks and the worker processes (if any)"""
+        self._stopped.set()
+        for worker in self.workers:
+            close = getattr(worker.codec, "close", None)
+            if close:
+                close()
+
+
+class StructuredEXICodecPool(EXICodecPool, IStructuredEXICodec):
+    """An EXICodecPool of codecs implementing IStructuredEXICodec"""
+
+    def encode_dict(self, message: dict, namespace: str) -> bytes:
+        return self._run(lambda codec: codec.encode_dict(message, namespace))
+
+    def decode_dict(self, stream: bytes, namespace: str) -> dict:
+        return self._run(lambda codec: codec.decode_dict(stream, namespace))
+
+    def compile_template(self, message: dict, namespace: str):
+        """See NativeEXICodec.compile_template()"""
+        return self._run(lambda codec: codec.compile_template(message, namespace))
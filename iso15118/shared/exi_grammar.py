@@ -0,0 +1,834 @@
+"""
+Schema-informed EXI grammars (W3C EXI 1.0, sections 7 and 8.5) built from the
+XSD files shipped in iso15118/shared/schemas.
+
+Only the subset of XML Schema that is used by the SupportedAppProtocol,
+DIN SPEC 70121, ISO 15118-2, ISO 15118-20 and XML signature schemas is
+supported. The grammars follow the EXI options mandated for V2G
+communication: bit-packed alignment, non-strict grammars, no fidelity options
+and an EXI header without options.
+"""
+import logging
+import os
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from iso15118.shared.exceptions import EXIGrammarError
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.settings import SCHEMAS_PATH
+
+logger = logging.getLogger(__name__)
+
+XSD_NS = "http://www.w3.org/2001/XMLSchema"
+
+# A qualified name is represented as (namespace URI, local name)
+QName = Tuple[str, str]
+
+# Maps the namespace of each XSD schema document to its file (relative to
+# SCHEMAS_PATH). Imports are resolved via this mapping first, so that the
+# schemaLocation attributes of the original schemas don't need to be touched.
+SCHEMA_FILES: Dict[str, str] = {
+    Namespace.SAP.value: "V2G_CI_AppProtocol.xsd",
+    Namespace.DIN_MSG_DEF.value: "din_spec/V2G_CI_MsgDef.xsd",
+    Namespace.DIN_MSG_BODY.value: "din_spec/V2G_CI_MsgBody.xsd",
+    Namespace.DIN_MSG_DT.value: "din_spec/V2G_CI_MsgDataTypes.xsd",
+    "urn:din:70121:2012:MsgHeader": "din_spec/V2G_CI_MsgHeader.xsd",
+    Namespace.ISO_V2_MSG_DEF.value: "iso15118_2/V2G_CI_MsgDef.xsd",
+    Namespace.ISO_V2_MSG_BODY.value: "iso15118_2/V2G_CI_MsgBody.xsd",
+    Namespace.ISO_V2_MSG_DT.value: "iso15118_2/V2G_CI_MsgDataTypes.xsd",
+    "urn:iso:15118:2:2013:MsgHeader": "iso15118_2/V2G_CI_MsgHeader.xsd",
+    Namespace.ISO_V20_COMMON_MSG.value: "iso15118_20/V2G_CI_CommonMessages.xsd",
+    Namespace.ISO_V20_COMMON_TYPES.value: "iso15118_20/V2G_CI_CommonTypes.xsd",
+    Namespace.ISO_V20_AC.value: "iso15118_20/V2G_CI_AC.xsd",
+    Namespace.ISO_V20_DC.value: "iso15118_20/V2G_CI_DC.xsd",
+    Namespace.ISO_V20_WPT.value: "iso15118_20/V2G_CI_WPT.xsd",
+    Namespace.ISO_V20_ACDP.value: "iso15118_20/V2G_CI_ACDP.xsd",
+    Namespace.XML_DSIG.value: "xmldsig-core-schema.xsd",
+}
+
+# Event types of a grammar production
+AT, SE, EE, CH, ED, SE_ANY, CH_UNTYPED = range(7)
+
+# EXI datatype representations (EXI 1.0, section 7.1)
+STRING = "string"
+BOOLEAN = "boolean"
+HEX_BINARY = "hexBinary"
+BASE64_BINARY = "base64Binary"
+INTEGER = "integer"
+UNSIGNED_INTEGER = "unsignedInteger"
+N_BIT_INTEGER = "nBitInteger"
+ENUMERATION = "enumeration"
+
+_STRING_TYPES = {
+    "string",
+    "normalizedString",
+    "token",
+    "language",
+    "Name",
+    "NCName",
+    "NMTOKEN",
+    "ID",
+    "IDREF",
+    "ENTITY",
+    "anyURI",
+    "anySimpleType",
+}
+
+_INTEGER_TYPES = {
+    "integer": (None, None),
+    "nonNegativeInteger": (0, None),
+    "positiveInteger": (1, None),
+    "nonPositiveInteger": (None, 0),
+    "negativeInteger": (None, -1),
+    "long": (-(2**63), 2**63 - 1),
+    "int": (-(2**31), 2**31 - 1),
+    "short": (-(2**15), 2**15 - 1),
+    "byte": (-(2**7), 2**7 - 1),
+    "unsignedLong": (0, 2**64 - 1),
+    "unsignedInt": (0, 2**32 - 1),
+    "unsignedShort": (0, 2**16 - 1),
+    "unsignedByte": (0, 2**8 - 1),
+}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _width(number_of_values: int) -> int:
+    """Number of bits needed for an n-bit unsigned integer, ceil(log2(n))"""
+    return (number_of_values - 1).bit_length() if number_of_values > 1 else 0
+
+
+class Datatype:
+    """The EXI representation of a simple type value"""
+
+    __slots__ = ("kind", "lower", "width", "values", "base_kind")
+
+    def __init__(
+        self,
+        kind: str,
+        lower: int = 0,
+        width: int = 0,
+        values: Tuple[str, ...] = (),
+        base_kind: str = STRING,
+    ):
+        self.kind = kind
+        # Offset of an n-bit integer, which is encoded as (value - lower)
+        self.lower = lower
+        # Number of bits of an n-bit integer or an enumeration index
+        self.width = width
+        # The enumeration values in schema order
+        self.values = values
+        # The datatype representation an enumeration value is derived from
+        self.base_kind = base_kind
+
+    def __repr__(self) -> str:
+        return f"Datatype({self.kind})"
+
+
+class AttributeUse:
+    __slots__ = ("qname", "datatype", "required")
+
+    def __init__(self, qname: QName, datatype: Datatype, required: bool):
+        self.qname = qname
+        self.datatype = datatype
+        self.required = required
+
+
+class Production:
+    """
+    A production of a (normalised) EXI grammar. The event code is the index of
+    the production within its state.
+    """
+
+    __slots__ = ("event", "code", "qname", "decl", "datatype", "is_list", "next")
+
+    def __init__(
+        self,
+        event: int,
+        qname: Optional[QName] = None,
+        decl: Optional["ElementDecl"] = None,
+        datatype: Optional[Datatype] = None,
+        is_list: bool = False,
+        next_state: Optional["State"] = None,
+    ):
+        self.event = event
+        self.code = 0
+        self.qname = qname
+        self.decl = decl
+        self.datatype = datatype
+        self.is_list = is_list
+        self.next = next_state
+
+    def copy(self) -> "Production":
+        return Production(
+            self.event, self.qname, self.decl, self.datatype, self.is_list, self.next
+        )
+
+
+class State:
+    """
+    A non-terminal of an EXI grammar together with its first level productions,
+    sorted by event code. Non-strict element grammars always have second level
+    productions (e.g. SE(*) or xsi:type), which we never emit but which
+    account for the width of the first level event codes.
+    """
+
+    __slots__ = ("productions", "width", "by_name", "end", "characters")
+
+    def __init__(self, productions: List[Production], second_level: bool = True):
+        self.productions = productions
+        self.width = _width(len(productions) + (1 if second_level else 0))
+        self.by_name: Dict[str, Production] = {}
+        self.end: Optional[Production] = None
+        self.characters: Optional[Production] = None
+        for code, production in enumerate(productions):
+            production.code = code
+            if production.event in (AT, SE):
+                self.by_name.setdefault(production.qname[1], production)
+            elif production.event in (EE, ED):
+                self.end = production
+            elif production.event == CH:
+                self.characters = production
+
+
+class TypeGrammar:
+    __slots__ = ("start", "simple")
+
+    def __init__(self, start: State, simple: bool):
+        self.start = start
+        # True if the type has simple content and no attributes, in which case
+        # the element's value is a plain JSON value rather than an object
+        self.simple = simple
+
+
+class ElementDecl:
+    """A global or local element declaration"""
+
+    __slots__ = ("qname", "abstract", "type_key", "_schema", "_doc", "_node")
+
+    def __init__(
+        self,
+        schema: "SchemaGrammar",
+        doc: "_SchemaDocument",
+        node: ET.Element,
+        qname: QName,
+    ):
+        self.qname = qname
+        self.abstract = node.get("abstract") == "true"
+        self._schema = schema
+        self._doc = doc
+        self._node = node
+        self.type_key = schema.type_key(doc, node)
+
+    @property
+    def grammar(self) -> TypeGrammar:
+        return self._schema.element_grammar(self)
+
+    def __repr__(self) -> str:
+        return f"ElementDecl({self.qname[1]})"
+
+
+class _SchemaDocument:
+    """A single parsed XSD file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.prefixes: Dict[str, str] = {}
+        for _, (prefix, uri) in ET.iterparse(path, events=("start-ns",)):
+            self.prefixes.setdefault(prefix, uri)
+        self.root = ET.parse(path).getroot()
+        self.target_ns = self.root.get("targetNamespace", "")
+        self.elements_qualified = self.root.get("elementFormDefault") == "qualified"
+        self.attributes_qualified = self.root.get("attributeFormDefault") == "qualified"
+
+    def resolve(self, name: str) -> QName:
+        prefix, _, local = name.rpartition(":")
+        try:
+            return self.prefixes[prefix], local
+        except KeyError as exc:
+            raise EXIGrammarError(
+                f"Unknown namespace prefix '{prefix}' in {self.path}"
+            ) from exc
+
+
+class _Terminal:
+    __slots__ = ("decl", "order", "is_list")
+
+    def __init__(self, decl: Optional[ElementDecl], order: int, is_list: bool):
+        # decl is None for an element wildcard (SE(*))
+        self.decl = decl
+        self.order = order
+        self.is_list = is_list
+
+
+class _ContentAutomaton:
+    """
+    Thompson construction of the particle grammars of a complex type
+    (EXI 1.0, section 8.5.4.1.6). Counted repetitions are unrolled, so the
+    subset construction in `states()` yields the same productions per state
+    as the normalised EXI grammar (section 8.5.4.2).
+    """
+
+    def __init__(self, schema: "SchemaGrammar"):
+        self.schema = schema
+        self.epsilon: List[List[int]] = []
+        self.edges: List[List[Tuple[_Terminal, int]]] = []
+        self.order = 0
+
+    def node(self) -> int:
+        self.epsilon.append([])
+        self.edges.append([])
+        return len(self.epsilon) - 1
+
+    def build(self, particle: tuple, start: int, repeated: bool = False) -> int:
+        kind, term, min_occurs, max_occurs = particle
+        is_list = repeated or max_occurs is None or max_occurs > 1
+
+        def build_term(node: int) -> int:
+            if kind == "element":
+                end = self.node()
+                for decl in self.schema.substitution_members(term):
+                    self.order += 1
+                    self.edges[node].append((_Terminal(decl, self.order, is_list), end))
+                return end
+            if kind == "any":
+                end = self.node()
+                self.order += 1
+                self.edges[node].append((_Terminal(None, self.order, is_list), end))
+                return end
+            if kind == "sequence":
+                for child in term:
+                    node = self.build(child, node, is_list)
+                return node
+            # choice
+            end = self.node()
+            for child in term:
+                self.epsilon[self.build(child, node, is_list)].append(end)
+            if not term:
+                self.epsilon[node].append(end)
+            return end
+
+        current = start
+        for _ in range(min_occurs):
+            current = build_term(current)
+        if max_occurs is None:
+            loop = self.node()
+            self.epsilon[current].append(loop)
+            self.epsilon[build_term(loop)].append(loop)
+            return loop
+        end = self.node()
+        self.epsilon[current].append(end)
+        for _ in range(max_occurs - min_occurs):
+            current = build_term(current)
+            self.epsilon[current].append(end)
+        return end
+
+    def _closure(self, nodes) -> frozenset:
+        stack = list(nodes)
+        seen = set(stack)
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(seen)
+
+    def states(self, start: int, final: int, mixed: bool) -> State:
+        """Determinises the automaton and returns the initial state"""
+        initial = self._closure([start])
+        states: Dict[frozenset, State] = {}
+        pending: List[Tuple[frozenset, List[Tuple[Production, frozenset]]]] = []
+        todo = [initial]
+        while todo:
+            key = todo.pop()
+            if key in states:
+                continue
+            # Terminals with the same qualified name are merged into a single
+            # production, ordered by the first occurrence in the schema
+            grouped: Dict[Optional[QName], list] = {}
+            for node in key:
+                for terminal, target in self.edges[node]:
+                    group_key = terminal.decl.qname if terminal.decl else None
+                    group = grouped.get(group_key)
+                    if group is None:
+                        grouped[group_key] = [
+                            terminal.order,
+                            terminal.decl,
+                            terminal.is_list,
+                            {target},
+                        ]
+                    else:
+                        group[0] = min(group[0], terminal.order)
+                        group[2] = group[2] or terminal.is_list
+                        group[3].add(target)
+
+            transitions = []
+            for _, decl, is_list, targets in sorted(
+                (g for k, g in grouped.items() if k is not None), key=lambda g: g[0]
+            ):
+                production = Production(
+                    SE, qname=decl.qname, decl=decl, is_list=is_list
+                )
+                transitions.append((production, self._closure(targets)))
+            if None in grouped:
+                transitions.append(
+                    (Production(SE_ANY), self._closure(grouped[None][3]))
+                )
+            productions = [production for production, _ in transitions]
+            if final in key:
+                productions.append(Production(EE))
+            if mixed:
+                productions.append(Production(CH_UNTYPED))
+            states[key] = State(productions)
+            pending.append((key, transitions))
+            todo.extend(target for _, target in transitions)
+
+        for key, transitions in pending:
+            for production, target in transitions:
+                production.next = states[target]
+        if mixed:
+            for state in states.values():
+                state.productions[-1].next = state
+        return states[initial]
+
+
+class SchemaGrammar:
+    """
+    The schema-informed grammars of an XSD schema and all the schemas it
+    imports. Element and type grammars are built lazily on first use and then
+    cached for the lifetime of the process.
+    """
+
+    def __init__(self, namespace: str):
+        try:
+            root_file = SCHEMA_FILES[namespace]
+        except KeyError as exc:
+            raise EXIGrammarError(f"No XSD schema known for {namespace}") from exc
+
+        self.namespace = namespace
+        self._docs: List[_SchemaDocument] = []
+        self.elements: Dict[QName, ElementDecl] = {}
+        self._types: Dict[QName, Tuple[_SchemaDocument, ET.Element]] = {}
+        self._local_decls: Dict[ET.Element, ElementDecl] = {}
+        self._substitutions: Dict[QName, List[QName]] = {}
+        self._members: Dict[QName, List[ElementDecl]] = {}
+        self._grammars: Dict[tuple, TypeGrammar] = {}
+        self._datatypes: Dict[tuple, Datatype] = {}
+
+        self._load(os.path.join(SCHEMAS_PATH, root_file), set())
+        for doc in self._docs:
+            self._collect_types(doc)
+        for doc in self._docs:
+            self._collect_elements(doc)
+
+        self.document = self._document_state()
+        self.fragment = self._fragment_state()
+
+    # Schema loading
+    def _load(self, path: str, loaded: set):
+        path = os.path.abspath(path)
+        if path in loaded:
+            return
+        loaded.add(path)
+        doc = _SchemaDocument(path)
+        self._docs.append(doc)
+        for child in doc.root:
+            if _local(child.tag) not in ("import", "include"):
+                continue
+            known_file = SCHEMA_FILES.get(child.get("namespace", ""))
+            if known_file:
+                self._load(os.path.join(SCHEMAS_PATH, known_file), loaded)
+            elif child.get("schemaLocation"):
+                location = os.path.join(
+                    os.path.dirname(path), child.get("schemaLocation")
+                )
+                self._load(location, loaded)
+
+    def _collect_types(self, doc: _SchemaDocument):
+        for child in doc.root:
+            if _local(child.tag) in ("complexType", "simpleType"):
+                self._types[(doc.target_ns, child.get("name"))] = (doc, child)
+
+    def _collect_elements(self, doc: _SchemaDocument):
+        for child in doc.root:
+            if _local(child.tag) != "element":
+                continue
+            qname = (doc.target_ns, child.get("name"))
+            self.elements[qname] = ElementDecl(self, doc, child, qname)
+            if child.get("substitutionGroup"):
+                head = doc.resolve(child.get("substitutionGroup"))
+                self._substitutions.setdefault(head, []).append(qname)
+            for node in child.iter():
+                if node is not child:
+                    self._add_local_decl(doc, node)
+        for child in doc.root:
+            if _local(child.tag) == "complexType":
+                for node in child.iter():
+                    self._add_local_decl(doc, node)
+
+    def _add_local_decl(self, doc: _SchemaDocument, node: ET.Element):
+        if _local(node.tag) != "element" or node.get("name") is None:
+            return
+        form = node.get("form")
+        qualified = form == "qualified" if form else doc.elements_qualified
+        qname = (doc.target_ns if qualified else "", node.get("name"))
+        self._local_decls[node] = ElementDecl(self, doc, node, qname)
+
+    def substitution_members(self, decl: ElementDecl) -> List[ElementDecl]:
+        """
+        The element itself and all elements of its substitution group, sorted
+        lexicographically by local name and namespace (EXI 1.0, 8.5.4.1.6)
+        """
+        members = self._members.get(decl.qname)
+        if members is None:
+            qnames = []
+            todo = [decl.qname]
+            while todo:
+                qname = todo.pop()
+                qnames.append(qname)
+                todo.extend(self._substitutions.get(qname, []))
+            if len(qnames) == 1:
+                members = [decl]
+            else:
+                qnames.sort(key=lambda q: (q[1], q[0]))
+                members = [self.elements[qname] for qname in qnames]
+            self._members[decl.qname] = members
+        return members
+
+    def preload(self) -> int:
+        """
+        Builds the grammars of all element declarations up front, instead of
+        on first use. Returns the number of built type grammars.
+        """
+        for decl in list(self.elements.values()) + list(self._local_decls.values()):
+            if decl.abstract:
+                continue
+            try:
+                decl.grammar
+            except EXIGrammarError as exc:
+                # Only fails for unsupported constructs, which the encoder and
+                # decoder report as soon as a message actually uses them
+                logger.debug(f"Skipped preloading grammar of {decl}: {exc}")
+        return len(self._grammars)
+
+    # Document and fragment grammars
+    def _document_state(self) -> State:
+        productions = [
+            Production(SE, qname=decl.qname, decl=decl)
+            for _, decl in sorted(
+                self.elements.items(), key=lambda item: (item[0][1], item[0][0])
+            )
+        ]
+        productions.append(Production(SE_ANY))
+        state = State(productions, second_level=False)
+        doc_end = State([Production(ED)], second_level=False)
+        for production in productions:
+            production.next = doc_end
+        return state
+
+    def _fragment_state(self) -> State:
+        by_qname: Dict[QName, Optional[ElementDecl]] = {}
+        for decl in list(self.elements.values()) + list(self._local_decls.values()):
+            known = by_qname.get(decl.qname, decl)
+            if known is not None and known.type_key != decl.type_key:
+                # Different types for the same qualified name would require
+                # the relaxed ElementFragment grammar, which is not supported
+                known = None
+            by_qname[decl.qname] = known
+        productions = [
+            Production(SE, qname=qname, decl=decl)
+            for qname, decl in sorted(
+                by_qname.items(), key=lambda i: (i[0][1], i[0][0])
+            )
+        ]
+        productions.append(Production(SE_ANY))
+        productions.append(Production(ED))
+        state = State(productions, second_level=False)
+        for production in productions:
+            production.next = state
+        return state
+
+    # Types
+    def type_key(self, doc: _SchemaDocument, node: ET.Element) -> tuple:
+        if node.get("type"):
+            return ("type",) + doc.resolve(node.get("type"))
+        for child in node:
+            if _local(child.tag) in ("complexType", "simpleType"):
+                return ("anonymous", id(child))
+        if node.get("ref"):
+            return self.elements[doc.resolve(node.get("ref"))].type_key
+        return ("type", XSD_NS, "anyType")
+
+    def element_grammar(self, decl: ElementDecl) -> TypeGrammar:
+        grammar = self._grammars.get(decl.type_key)
+        if grammar is None:
+            grammar = self._build_element_grammar(decl)
+            self._grammars[decl.type_key] = grammar
+        return grammar
+
+    def _build_element_grammar(self, decl: ElementDecl) -> TypeGrammar:
+        doc, node = decl._doc, decl._node
+        if node.get("type"):
+            qname = doc.resolve(node.get("type"))
+            if qname[0] == XSD_NS:
+                if qname[1] == "anyType":
+                    raise EXIGrammarError(f"anyType of {decl} is not supported")
+                return self._type_grammar([], None, self._datatype(doc, qname), False)
+            doc, node = self._named_type(qname)
+        else:
+            for child in node:
+                if _local(child.tag) in ("complexType", "simpleType"):
+                    node = child
+                    break
+            else:
+                raise EXIGrammarError(f"anyType of {decl} is not supported")
+
+        if _local(node.tag) == "simpleType":
+            return self._type_grammar([], None, self._simple_datatype(doc, node), False)
+        attributes, particle, datatype, mixed = self._complex_type(doc, node)
+        return self._type_grammar(attributes, particle, datatype, mixed)
+
+    def _named_type(self, qname: QName) -> Tuple[_SchemaDocument, ET.Element]:
+        try:
+            return self._types[qname]
+        except KeyError as exc:
+            raise EXIGrammarError(f"Unknown type {qname[1]} ({qname[0]})") from exc
+
+    def _type_grammar(
+        self,
+        attributes: List[AttributeUse],
+        particle: Optional[tuple],
+        datatype: Optional[Datatype],
+        mixed: bool,
+    ) -> TypeGrammar:
+        if datatype is not None:
+            content = State(
+                [Production(CH, datatype=datatype, next_state=State([Production(EE)]))]
+            )
+        elif particle is not None:
+            automaton = _ContentAutomaton(self)
+            start = automaton.node()
+            final = automaton.build(particle, start)
+            content = automaton.states(start, final, mixed)
+        else:
+            productions = [Production(EE)]
+            if mixed:
+                productions.append(Production(CH_UNTYPED))
+            content = State(productions)
+            if mixed:
+                productions[-1].next = content
+
+        # Attribute uses are sorted lexicographically (EXI 1.0, 8.5.4.1.3.1)
+        # and precede the content of the type
+        attributes = sorted(attributes, key=lambda a: (a.qname[1], a.qname[0]))
+        state = content
+        states: List[State] = [content]
+        for index in reversed(range(len(attributes))):
+            productions = []
+            for position in range(index, len(attributes)):
+                attribute = attributes[position]
+                productions.append(
+                    Production(
+                        AT,
+                        qname=attribute.qname,
+                        datatype=attribute.datatype,
+                        next_state=states[len(attributes) - position - 1],
+                    )
+                )
+                if attribute.required:
+                    break
+            else:
+                productions.extend(p.copy() for p in content.productions)
+            state = State(productions)
+            states.append(state)
+        return TypeGrammar(state, simple=datatype is not None and not attributes)
+
+    def _complex_type(
+        self, doc: _SchemaDocument, node: ET.Element
+    ) -> Tuple[List[AttributeUse], Optional[tuple], Optional[Datatype], bool]:
+        """
+        Returns the attribute uses, the content particle, the simple content
+        datatype and whether or not the content is mixed
+        """
+        attributes: List[AttributeUse] = []
+        particle = None
+        datatype = None
+        mixed = node.get("mixed") == "true"
+        for child in node:
+            tag = _local(child.tag)
+            if tag in ("sequence", "choice", "all", "element", "any"):
+                particle = self._particle(doc, child)
+            elif tag == "attribute":
+                self._add_attribute(doc, child, attributes)
+            elif tag in ("complexContent", "simpleContent"):
+                mixed = mixed or child.get("mixed") == "true"
+                derivation = next(c for c in child if _local(c.tag) != "annotation")
+                base = doc.resolve(derivation.get("base"))
+                if base[0] == XSD_NS:
+                    base_attributes, base_particle = [], None
+                    base_datatype = (
+                        self._datatype(doc, base) if base[1] != "anyType" else None
+                    )
+                else:
+                    base_doc, base_node = self._named_type(base)
+                    if _local(base_node.tag) == "simpleType":
+                        base_attributes, base_particle = [], None
+                        base_datatype = self._simple_datatype(base_doc, base_node)
+                    else:
+                        (
+                            base_attributes,
+                            base_particle,
+                            base_datatype,
+                            base_mixed,
+                        ) = self._complex_type(base_doc, base_node)
+                        mixed = mixed or base_mixed
+                own_attributes, own_particle, _, own_mixed = self._complex_type(
+                    doc, derivation
+                )
+                mixed = mixed or own_mixed
+                attributes = base_attributes + own_attributes
+                if _local(derivation.tag) == "restriction" and tag == "complexContent":
+                    particle = own_particle
+                elif base_particle is not None and own_particle is not None:
+                    particle = ("sequence", [base_particle, own_particle], 1, 1)
+                else:
+                    particle = base_particle or own_particle
+                datatype = base_datatype if tag == "simpleContent" else None
+            elif tag in ("attributeGroup", "anyAttribute", "group"):
+                raise EXIGrammarError(f"XSD construct '{tag}' is not supported")
+        return attributes, particle, datatype, mixed
+
+    def _add_attribute(
+        self, doc: _SchemaDocument, node: ET.Element, attributes: List[AttributeUse]
+    ):
+        if node.get("use") == "prohibited":
+            return
+        form = node.get("form")
+        qualified = form == "qualified" if form else doc.attributes_qualified
+        qname = (doc.target_ns if qualified else "", node.get("name"))
+        if node.get("type"):
+            datatype = self._datatype(doc, doc.resolve(node.get("type")))
+        else:
+            inline = [c for c in node if _local(c.tag) == "simpleType"]
+            datatype = (
+                self._simple_datatype(doc, inline[0]) if inline else Datatype(STRING)
+            )
+        attributes[:] = [a for a in attributes if a.qname != qname]
+        attributes.append(AttributeUse(qname, datatype, node.get("use") == "required"))
+
+    def _particle(self, doc: _SchemaDocument, node: ET.Element) -> tuple:
+        tag = _local(node.tag)
+        min_occurs = int(node.get("minOccurs", "1"))
+        max_occurs = node.get("maxOccurs", "1")
+        max_occurs = None if max_occurs == "unbounded" else int(max_occurs)
+        if tag == "element":
+            if node.get("ref"):
+                decl = self.elements[doc.resolve(node.get("ref"))]
+            else:
+                decl = self._local_decls[node]
+            return "element", decl, min_occurs, max_occurs
+        if tag == "any":
+            return "any", None, min_occurs, max_occurs
+        if tag == "all":
+            raise EXIGrammarError("XSD construct 'all' is not supported")
+        children = [
+            self._particle(doc, child)
+            for child in node
+            if _local(child.tag) in ("sequence", "choice", "all", "element", "any")
+        ]
+        return tag, children, min_occurs, max_occurs
+
+    # Simple types
+    def _datatype(self, doc: _SchemaDocument, qname: QName) -> Datatype:
+        if qname[0] == XSD_NS:
+            return self._create_datatype(self._builtin(qname[1]))
+        type_doc, node = self._named_type(qname)
+        if _local(node.tag) != "simpleType":
+            raise EXIGrammarError(f"{qname[1]} is not a simple type")
+        return self._simple_datatype(type_doc, node)
+
+    def _simple_datatype(self, doc: _SchemaDocument, node: ET.Element) -> Datatype:
+        key = (id(node),)
+        datatype = self._datatypes.get(key)
+        if datatype is None:
+            datatype = self._create_datatype(self._simple_type_facets(doc, node))
+            self._datatypes[key] = datatype
+        return datatype
+
+    @staticmethod
+    def _builtin(name: str) -> tuple:
+        if name in _STRING_TYPES:
+            return STRING, None, None, None
+        if name in _INTEGER_TYPES:
+            return (INTEGER,) + _INTEGER_TYPES[name] + (None,)
+        if name in (BOOLEAN, HEX_BINARY, BASE64_BINARY):
+            return name, None, None, None
+        raise EXIGrammarError(f"XSD datatype {name} is not supported")
+
+    def _simple_type_facets(self, doc: _SchemaDocument, node: ET.Element) -> tuple:
+        """
+        Returns a tuple (datatype family, lower bound, upper bound,
+        enumeration values) for a simpleType derived by restriction
+        """
+        restriction = next((c for c in node if _local(c.tag) == "restriction"), None)
+        if restriction is None:
+            raise EXIGrammarError("Simple types derived by list or union not supported")
+        if restriction.get("base"):
+            base = doc.resolve(restriction.get("base"))
+            if base[0] == XSD_NS:
+                family, lower, upper, enumeration = self._builtin(base[1])
+            else:
+                family, lower, upper, enumeration = self._simple_type_facets(
+                    *self._named_type(base)
+                )
+        else:
+            inline = next(c for c in restriction if _local(c.tag) == "simpleType")
+            family, lower, upper, enumeration = self._simple_type_facets(doc, inline)
+
+        values = []
+        for facet in restriction:
+            name, value = _local(facet.tag), facet.get("value")
+            if name == "enumeration":
+                values.append(value)
+            elif family == INTEGER and name in ("minInclusive", "minExclusive"):
+                bound = int(value) + (1 if name == "minExclusive" else 0)
+                lower = bound if lower is None else max(lower, bound)
+            elif family == INTEGER and name in ("maxInclusive", "maxExclusive"):
+                bound = int(value) - (1 if name == "maxExclusive" else 0)
+                upper = bound if upper is None else min(upper, bound)
+        return family, lower, upper, tuple(values) if values else enumeration
+
+    @staticmethod
+    def _create_datatype(facets: tuple) -> Datatype:
+        family, lower, upper, enumeration = facets
+        if enumeration:
+            return Datatype(
+                ENUMERATION,
+                width=_width(len(enumeration)),
+                values=enumeration,
+                base_kind=family,
+            )
+        if family != INTEGER:
+            return Datatype(family)
+        # EXI 1.0, section 7.1.9: bounded ranges of up to 4096 values use an
+        # n-bit unsigned integer, non-negative ranges the unsigned integer
+        if lower is not None and upper is not None and upper - lower < 4096:
+            return Datatype(
+                N_BIT_INTEGER, lower=lower, width=(upper - lower).bit_length()
+            )
+        if lower is not None and lower >= 0:
+            return Datatype(UNSIGNED_INTEGER)
+        return Datatype(INTEGER)
+
+
+@lru_cache(maxsize=None)
+def load_schema_grammar(namespace: str) -> SchemaGrammar:
+    """
+    Returns the (cached) schema-informed grammar for the XSD schema identified
+    by the given namespace
+    """
+    logger.debug(f"Loading EXI grammar for {namespace}")
+    return SchemaGrammar(namespace)
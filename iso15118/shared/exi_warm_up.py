@@ -0,0 +1,171 @@
+"""
+Warms up an EXI codec before the first communication session starts.
+
+The first EXI message of each namespace otherwise pays for loading the
+namespace's grammars (and, in case of the ExificientEXICodec, for the JIT
+warm-up of the JVM), which happens right when the EV waits for the response
+to its SupportedAppProtocolReq. Warming up round-trips a small bundled corpus
+of sample messages per namespace through the codec, and preloads all element
+grammars of the NativeEXICodec.
+"""
+import json
+import logging
+import time
+from typing import Dict, List
+
+from iso15118.shared.exi_codec_pool import EXICodecPool
+from iso15118.shared.exi_grammar import load_schema_grammar
+from iso15118.shared.iexi_codec import IEXICodec
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from iso15118.shared.settings import EXI_WARM_UP_ROUNDS
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID = "ABCDEF0102030405"
+HEADER_V20 = {"SessionID": SESSION_ID, "TimeStamp": 1653038400}
+
+# One or more sample messages per namespace, in the JSON representation that
+# is exchanged with the codec
+WARM_UP_CORPUS: Dict[str, List[dict]] = {
+    Namespace.SAP.value: [
+        {
+            "supportedAppProtocolReq": {
+                "AppProtocol": [
+                    {
+                        "ProtocolNamespace": Namespace.ISO_V2_MSG_DEF.value,
+                        "VersionNumberMajor": 2,
+                        "VersionNumberMinor": 0,
+                        "SchemaID": 1,
+                        "Priority": 1,
+                    }
+                ]
+            }
+        },
+        {"supportedAppProtocolRes": {"ResponseCode": "OK_SuccessfulNegotiation"}},
+    ],
+    Namespace.DIN_MSG_DEF.value: [
+        {
+            "V2G_Message": {
+                "Header": {"SessionID": "00"},
+                "Body": {"SessionSetupReq": {"EVCCID": "0A0B0C0D0E0F"}},
+            }
+        }
+    ],
+    Namespace.ISO_V2_MSG_DEF.value: [
+        {
+            "V2G_Message": {
+                "Header": {"SessionID": "00"},
+                "Body": {"SessionSetupReq": {"EVCCID": "0A0B0C0D0E0F"}},
+            }
+        }
+    ],
+    Namespace.ISO_V20_COMMON_MSG.value: [
+        {"SessionSetupReq": {"Header": HEADER_V20, "EVCCID": "WMIV1234567890ABCDEX"}}
+    ],
+    Namespace.ISO_V20_AC.value: [
+        {
+            "AC_ChargeParameterDiscoveryReq": {
+                "Header": HEADER_V20,
+                "AC_CPDReqEnergyTransferMode": {
+                    "EVMaximumChargePower": {"Exponent": 3, "Value": 11},
+                    "EVMinimumChargePower": {"Exponent": 0, "Value": 100},
+                },
+            }
+        }
+    ],
+    Namespace.ISO_V20_DC.value: [{"DC_CableCheckReq": {"Header": HEADER_V20}}],
+    Namespace.ISO_V20_WPT.value: [
+        {
+            "WPT_PairingReq": {
+                "Header": HEADER_V20,
+                "EVProcessing": "Finished",
+                "EVResultCode": "EVResultSuccess",
+            }
+        }
+    ],
+    Namespace.ISO_V20_ACDP.value: [
+        {
+            "ACDP_VehiclePositioningReq": {
+                "Header": HEADER_V20,
+                "EVMobilityStatus": True,
+                "EVPositioningSupport": False,
+            }
+        }
+    ],
+    Namespace.XML_DSIG.value: [
+        {
+            "SignedInfo": {
+                "CanonicalizationMethod": {
+                    "Algorithm": "http://www.w3.org/TR/canonical-exi/"
+                },
+                "SignatureMethod": {
+                    "Algorithm": "http://www.w3.org/2001/04/xmldsig-more#ecdsa-sha256"
+                },
+                "Reference": [
+                    {
+                        "Transforms": {
+                            "Transform": [
+                                {"Algorithm": "http://www.w3.org/TR/canonical-exi/"}
+                            ]
+                        },
+                        "DigestMethod": {
+                            "Algorithm": "http://www.w3.org/2001/04/xmlenc#sha256"
+                        },
+                        "DigestValue": "0bXgPQBlvuVrMXmERTBR61TKGPwOCRYXT4s8d6mPSqk=",
+                        "URI": "#ID1",
+                    }
+                ],
+            }
+        }
+    ],
+}
+
+
+def preload_grammars() -> int:
+    """
+    Loads the schema grammars of all namespaces of the NativeEXICodec and
+    builds all of their element grammars. Returns the number of built grammars.
+    """
+    return sum(load_schema_grammar(namespace).preload() for namespace in WARM_UP_CORPUS)
+
+
+def warm_up_exi_codec(codec: IEXICodec, rounds: int = EXI_WARM_UP_ROUNDS) -> bool:
+    """
+    Round-trips the warm-up corpus through the given codec (through each
+    worker in case of an EXICodecPool). Failures are logged, but don't stop
+    the warm-up, as the codec may still work for the other namespaces.
+
+    Returns True if all sample messages could be encoded and decoded.
+    """
+    if isinstance(codec, EXICodecPool):
+        return all(
+            [warm_up_exi_codec(worker.codec, rounds) for worker in codec.workers]
+        )
+
+    if isinstance(codec, NativeEXICodec):
+        start = time.perf_counter()
+        grammars = preload_grammars()
+        logger.debug(
+            f"Preloaded {grammars} EXI grammars in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+    success = True
+    for namespace, messages in WARM_UP_CORPUS.items():
+        start = time.perf_counter()
+        try:
+            for _ in range(rounds):
+                for message in messages:
+                    exi_stream = codec.encode(json.dumps(message), namespace)
+                    codec.decode(exi_stream, namespace)
+        except Exception as exc:
+            logger.warning(f"EXI codec warm-up failed for namespace {namespace}: {exc}")
+            success = False
+            continue
+        logger.debug(
+            f"Warmed up EXI codec for namespace {namespace} in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+
+    return success
@@ -1,6 +1,8 @@
 import json
 import logging
+import struct
 from builtins import Exception
+from typing import List, Tuple
 
 from iso15118.shared.iexi_codec import IEXICodec
 from iso15118.shared.settings import JAR_FILE_PATH
@@ -8,6 +10,30 @@ from iso15118.shared.settings import JAR_FILE_PATH
 logger = logging.getLogger(__name__)
 
 
+def pack_streams(streams: List[bytes]) -> bytes:
+    """
+    Concatenates EXI streams into one byte array, each prefixed with its
+    length as a 4 byte unsigned big-endian integer. That's how a batch of
+    streams crosses the py4j gateway as a single byte[].
+    """
+    return b"".join(struct.pack(">I", len(stream)) + stream for stream in streams)
+
+
+def unpack_streams(data: bytes) -> List[bytes]:
+    """Splits a byte array created by pack_streams() into the EXI streams"""
+    streams: List[bytes] = []
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        (length,) = struct.unpack_from(">I", view, offset)
+        offset += 4
+        if offset + length > len(view):
+            raise ValueError("Truncated EXI stream batch")
+        streams.append(bytes(view[offset : offset + length]))
+        offset += length
+    return streams
+
+
 def compare_messages(json_to_encode, decoded_json):
     json_obj = json.loads(json_to_encode)
     decoded_json_obj = json.loads(decoded_json)
@@ -26,6 +52,9 @@ class ExificientEXICodec(IEXICodec):
         )
 
         self.exi_codec = self.gateway.jvm.com.siemens.ct.exi.main.cmd.EXICodec()
+        # Whether the EXICodec provides encode_many() and decode_many(), which
+        # is found out on the first batch call
+        self.batch_supported = True
 
     def encode(self, message: str, namespace: str) -> bytes:
         """
@@ -50,6 +79,65 @@ class ExificientEXICodec(IEXICodec):
             raise Exception(self.exi_codec.get_last_decoding_error())
         return decoded_message
 
+    def encode_many(self, messages: List[Tuple[str, str]]) -> List[bytes]:
+        """
+        Encodes all messages with a single gateway call of the EXICodec's
+        encode_many(String), which takes a JSON array of [message, namespace]
+        pairs and returns the EXI streams packed as by pack_streams() (or null
+        if any message fails).
+        Falls back to one encode() call per message, if the EXICodec.jar
+        doesn't provide encode_many().
+        """
+        if len(messages) < 2 or not self.batch_supported:
+            return super().encode_many(messages)
+
+        from py4j.protocol import Py4JError, Py4JJavaError, Py4JNetworkError
+
+        try:
+            packed = self.exi_codec.encode_many(json.dumps(messages))
+        except (Py4JJavaError, Py4JNetworkError):
+            raise
+        except Py4JError as exc:
+            # Raised for a method that doesn't exist on the Java side
+            logger.debug(f"EXICodec doesn't support batch calls: {exc}")
+            self.batch_supported = False
+            return super().encode_many(messages)
+
+        if packed is None:
+            raise Exception(self.exi_codec.get_last_encoding_error())
+        return unpack_streams(packed)
+
+    def decode_many(self, streams: List[Tuple[bytes, str]]) -> List[str]:
+        """
+        Decodes all EXI streams with a single gateway call of the EXICodec's
+        decode_many(byte[], String), which takes the streams packed as by
+        pack_streams() and a JSON array of their namespaces, and returns a
+        JSON array of the decoded messages (or null if any stream fails).
+        Falls back to one decode() call per stream, if the EXICodec.jar
+        doesn't provide decode_many().
+        """
+        if len(streams) < 2 or not self.batch_supported:
+            return super().decode_many(streams)
+
+        from py4j.protocol import Py4JError, Py4JJavaError, Py4JNetworkError
+
+        try:
+            decoded_messages = self.exi_codec.decode_many(
+                pack_streams([stream for stream, _ in streams]),
+                json.dumps([namespace for _, namespace in streams]),
+            )
+        except (Py4JJavaError, Py4JNetworkError):
+            raise
+        except Py4JError as exc:
+            # Raised for a method that doesn't exist on the Java side
+            logger.debug(f"EXICodec doesn't support batch calls: {exc}")
+            self.batch_supported = False
+            return super().decode_many(streams)
+
+        if decoded_messages is None:
+            raise Exception(self.exi_codec.get_last_decoding_error())
+        return json.loads(decoded_messages)
+
     def get_version(self) -> str:
         """
         Returns the version of the Exificient codec
@@ -1,4 +1,5 @@
 from abc import ABCMeta, abstractmethod
+from typing import List, Tuple
 
 
 class IEXICodec(metaclass=ABCMeta):
@@ -23,3 +24,50 @@ class IEXICodec(metaclass=ABCMeta):
     @abstractmethod
     def get_version(self) -> str:
         pass
+
+    def encode_many(self, messages: List[Tuple[str, str]]) -> List[bytes]:
+        """
+        Encodes several messages to EXI in one call, so that codecs with an
+        expensive call boundary (e.g. the py4j gateway of the
+        ExificientEXICodec) can cross it once per batch instead of once per
+        message.
+        Messages: List of (message payload, namespace) tuples
+        Returns the EXI bytes streams in the order of the messages
+        """
+        return [self.encode(message, namespace) for message, namespace in messages]
+
+    def decode_many(self, streams: List[Tuple[bytes, str]]) -> List[str]:
+        """
+        Decodes several EXI streams in one call, see encode_many()
+        Streams: List of (EXI bytes stream, namespace) tuples
+        Returns the message payloads in the order of the streams
+        """
+        return [self.decode(stream, namespace) for stream, namespace in streams]
+
+
+class IStructuredEXICodec(IEXICodec):
+    """
+    An EXI codec that works on Python structures instead of JSON text. The
+    message dicts are the ones produced by pydantic's
+    dict(by_alias=True, exclude_none=True), i.e. bytes fields stay raw bytes
+    and don't need to be Base64 en-/decoded.
+    """
+
+    @abstractmethod
+    def encode_dict(self, message: dict, namespace: str) -> bytes:
+        """
+        Encodes passed message to EXI
+        Message: Dict with the root element name as its only key
+        Namespace: String indicating the schema to be used while encoding
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode_dict(self, stream: bytes, namespace: str) -> dict:
+        """
+        Decodes EXI stream to a dict with the root element name as its only
+        key. Values of base64Binary type are returned as raw bytes.
+        Stream: EXI bytes stream
+        Namespace: String indicating the schema to be used while decoding
+        """
+        raise NotImplementedError
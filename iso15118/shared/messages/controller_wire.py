@@ -0,0 +1,588 @@
+"""
+The wire format of the requests to the EVSE controller and of its replies
+(see zmq_handler.py and controller/main.py).
+
+Each message starts with a fixed header: the wire format version, the message
+kind (request, reply, error or update) and the code of the operation. A
+request then carries the SECC's state and the operation's parameters, a reply
+the operation's result and an error reply the error message. An update, which
+the controller publishes unrequested when the result of a cacheable operation
+changes (see evse_state_cache.py), carries the parameters and the result.
+
+The layout of the parameters and results is defined by each operation's
+schema (see OPERATIONS). Physical values, the DC EVSE status, booleans,
+integers and enums (by their index in the enum) have fixed layouts. Strings and
+lists are length prefixed. Models without a fixed layout (e.g. the charge
+parameters) are JSON encoded. When this module is imported, each schema is
+compiled into an encoder and a decoder, which pack and unpack all consecutive
+fixed size fields with a single struct call.
+
+Unlike unpickling, decoding a message can't run arbitrary code. Models with a
+fixed layout are decoded without running the pydantic validators, which are
+most of the cost of decoding a pickled model.
+
+Codes of operations and the order of enum members must not change within a
+wire format version. New operations and enum members may be appended.
+"""
+import struct
+from dataclasses import dataclass
+from enum import Enum, IntEnum
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from iso15118.shared.exceptions import (
+    ControllerRequestError,
+    InvalidControllerMessageError,
+)
+from iso15118.shared.messages.datatypes import (
+    DCEVSEChargeParameter,
+    DCEVSEStatus,
+    DCEVSEStatusCode,
+    EVSENotification,
+    PhysicalValue,
+    PVEVSEMaxCurrentLimit,
+    PVEVSEMaxPowerLimit,
+    PVEVSEMaxVoltageLimit,
+    PVEVSEPresentCurrent,
+    PVEVSEPresentVoltage,
+    PVEVTargetCurrent,
+    PVEVTargetVoltage,
+)
+from iso15118.shared.messages.enums import (
+    AuthorizationStatus,
+    Contactor,
+    EnergyTransferModeEnum,
+    IsolationLevel,
+    UnitSymbol,
+)
+from iso15118.shared.messages.iso15118_20.common_types import EVSEStatus
+from iso15118.shared.messages.iso15118_20.dc import (
+    BPTDCChargeParameterDiscoveryResParams,
+    DCChargeParameterDiscoveryResParams,
+)
+
+WIRE_VERSION = 1
+
+
+class MessageKind(IntEnum):
+    REQUEST = 0
+    REPLY = 1
+    ERROR = 2
+    UPDATE = 3
+
+
+# Wire format version, message kind and operation code
+HEADER = struct.Struct("!BBH")
+
+
+class WireType:
+    """
+    The layout of a value on the wire. Fixed size types define their struct
+    format and how a value is flattened into (and rebuilt from) the struct's
+    values, variable length types encode and decode their value themselves.
+    """
+
+    # The struct format (without byte order) of a fixed size type
+    fmt: Optional[str] = None
+
+    def compile(self):
+        if self.fmt is not None:
+            self._struct = struct.Struct("!" + self.fmt)
+
+    def flatten(self, value: Any) -> Tuple:
+        raise NotImplementedError
+
+    def unflatten(self, values: Iterator) -> Any:
+        raise NotImplementedError
+
+    def encode(self, value: Any) -> bytes:
+        return self._struct.pack(*self.flatten(value))
+
+    def decode(self, data: bytes, offset: int) -> Tuple[Any, int]:
+        """Returns the decoded value and the offset of the data following it"""
+        values = self._struct.unpack_from(data, offset)
+        return self.unflatten(iter(values)), offset + self._struct.size
+
+
+class Scalar(WireType):
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.compile()
+
+    def flatten(self, value: Any) -> Tuple:
+        return (value,)
+
+    def unflatten(self, values: Iterator) -> Any:
+        return next(values)
+
+
+class Nothing(WireType):
+    """The result of operations that only acknowledge the request"""
+
+    fmt = ""
+
+    def __init__(self):
+        self.compile()
+
+    def flatten(self, value: Any) -> Tuple:
+        return ()
+
+    def unflatten(self, values: Iterator) -> Any:
+        return None
+
+
+class EnumType(WireType):
+    """An enum member, encoded as its index in the enum"""
+
+    fmt = "B"
+
+    def __init__(self, enum: Type[Enum]):
+        self.enum = enum
+        self.members: List[Enum] = list(enum)
+        self.indices: Dict[Enum, int] = {
+            member: index for index, member in enumerate(self.members)
+        }
+        self.compile()
+
+    def flatten(self, value: Any) -> Tuple:
+        return (self.indices[self.enum(value)],)
+
+    def unflatten(self, values: Iterator) -> Any:
+        return self.members[next(values)]
+
+
+class OptionalType(WireType):
+    """A fixed size value or None, preceded by a flag whether it's present"""
+
+    def __init__(self, wire_type: WireType):
+        self.wire_type = wire_type
+        self.fmt = "?" + wire_type.fmt
+        self.compile()
+        # The values of the absent value
+        self._absent = struct.Struct("!" + wire_type.fmt).unpack(
+            bytes(struct.calcsize("!" + wire_type.fmt))
+        )
+
+    def flatten(self, value: Any) -> Tuple:
+        if value is None:
+            return (False,) + self._absent
+        return (True,) + self.wire_type.flatten(value)
+
+    def unflatten(self, values: Iterator) -> Any:
+        present = next(values)
+        value = self.wire_type.unflatten(values)
+        return value if present else None
+
+
+class String(WireType):
+    """A UTF-8 string, preceded by its length"""
+
+    length = struct.Struct("!H")
+
+    def encode(self, value: str) -> bytes:
+        encoded = value.encode()
+        return self.length.pack(len(encoded)) + encoded
+
+    def decode(self, data: bytes, offset: int) -> Tuple[str, int]:
+        (length,) = self.length.unpack_from(data, offset)
+        offset += self.length.size
+        if offset + length > len(data):
+            raise InvalidControllerMessageError("String exceeds the message")
+        return data[offset : offset + length].decode(), offset + length
+
+
+class EnumList(WireType):
+    """A list of enum members, preceded by its length"""
+
+    def __init__(self, enum: Type[Enum]):
+        self.member = EnumType(enum)
+
+    def encode(self, value: Sequence[Enum]) -> bytes:
+        indices = list(chain.from_iterable(map(self.member.flatten, value)))
+        return struct.pack(f"!B{len(indices)}B", len(indices), *indices)
+
+    def decode(self, data: bytes, offset: int) -> Tuple[List[Enum], int]:
+        length = data[offset]
+        indices = struct.unpack_from(f"!{length}B", data, offset + 1)
+        return [self.member.members[index] for index in indices], offset + 1 + length
+
+
+class JSONModel(WireType):
+    """A pydantic model without a fixed layout, encoded as JSON string"""
+
+    string = String()
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+
+    def encode(self, value: BaseModel) -> bytes:
+        return self.string.encode(value.json())
+
+    def decode(self, data: bytes, offset: int) -> Tuple[BaseModel, int]:
+        json, offset = self.string.decode(data, offset)
+        try:
+            return self.model.parse_raw(json), offset
+        except ValidationError as exc:
+            raise InvalidControllerMessageError(str(exc)) from exc
+
+
+class Record(WireType):
+    """
+    A sequence of named fields, taken from and decoded into a dict or, if a
+    model is given, a pydantic model. A record is of fixed size if all of its
+    fields are.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[Tuple[str, WireType]],
+        model: Optional[Type[BaseModel]] = None,
+    ):
+        self.fields = list(fields)
+        self.model = model
+        if all(wire_type.fmt is not None for _, wire_type in self.fields):
+            self.fmt = "".join(wire_type.fmt for _, wire_type in self.fields)
+        self.compile()
+
+    def compile(self):
+        super().compile()
+        # Consecutive fixed size fields are packed into one struct
+        self._segments: List[Union[Record, Tuple[str, WireType]]] = []
+        fixed: List[Tuple[str, WireType]] = []
+        for name, wire_type in self.fields:
+            if wire_type.fmt is not None:
+                fixed.append((name, wire_type))
+                continue
+            if fixed:
+                self._segments.append(Record(fixed))
+                fixed = []
+            self._segments.append((name, wire_type))
+        if fixed and self.fmt is None:
+            self._segments.append(Record(fixed))
+
+    def _get(self, value: Any, name: str) -> Any:
+        if self.model:
+            return getattr(value, name)
+        return value.get(name)
+
+    def _build(self, values: Dict[str, Any]) -> Any:
+        if self.model:
+            # The values are valid by their layout
+            return self.model.construct(**values)
+        return values
+
+    def flatten(self, value: Any) -> Tuple:
+        return tuple(
+            chain.from_iterable(
+                wire_type.flatten(self._get(value, name))
+                for name, wire_type in self.fields
+            )
+        )
+
+    def unflatten(self, values: Iterator) -> Any:
+        return self._build(
+            {name: wire_type.unflatten(values) for name, wire_type in self.fields}
+        )
+
+    def encode(self, value: Any) -> bytes:
+        if self.fmt is not None:
+            return super().encode(value)
+        parts = []
+        for segment in self._segments:
+            if isinstance(segment, Record):
+                parts.append(
+                    segment.encode(
+                        {name: self._get(value, name) for name, _ in segment.fields}
+                    )
+                )
+            else:
+                name, wire_type = segment
+                parts.append(wire_type.encode(self._get(value, name)))
+        return b"".join(parts)
+
+    def decode(self, data: bytes, offset: int) -> Tuple[Any, int]:
+        if self.fmt is not None:
+            return super().decode(data, offset)
+        values: Dict[str, Any] = {}
+        for segment in self._segments:
+            if isinstance(segment, Record):
+                segment_values, offset = segment.decode(data, offset)
+                values.update(segment_values)
+            else:
+                name, wire_type = segment
+                values[name], offset = wire_type.decode(data, offset)
+        return self._build(values), offset
+
+
+BOOL = Scalar("?")
+INT8 = Scalar("b")
+INT16 = Scalar("h")
+UINT16 = Scalar("H")
+STRING = String()
+NOTHING = Nothing()
+
+
+def physical_value(model: Type[PhysicalValue]) -> Record:
+    return Record(
+        [("multiplier", INT8), ("value", INT16), ("unit", EnumType(UnitSymbol))],
+        model,
+    )
+
+
+DC_EVSE_STATUS = Record(
+    [
+        ("notification_max_delay", UINT16),
+        ("evse_notification", EnumType(EVSENotification)),
+        ("evse_isolation_status", OptionalType(EnumType(IsolationLevel))),
+        ("evse_status_code", EnumType(DCEVSEStatusCode)),
+    ],
+    DCEVSEStatus,
+)
+CONTACTOR = EnumType(Contactor)
+SOC = OptionalType(INT8)
+
+EV_TARGETS = [
+    ("voltage", physical_value(PVEVTargetVoltage)),
+    ("current", physical_value(PVEVTargetCurrent)),
+]
+
+
+@dataclass
+class Operation:
+    """
+    An operation of the EVSE controller, identified on the wire by its code.
+    The controller publishes the result of cacheable operations, which the
+    SECC may then serve from its cache. Results that must be fresh (e.g. the
+    present voltage, or the EVSE status with its isolation status and
+    emergency shutdown notifications) aren't cacheable.
+    """
+
+    name: str
+    code: int
+    request: Record
+    reply: WireType
+    cacheable: bool = False
+
+
+OPERATIONS: Dict[str, Operation] = {
+    operation.name: operation
+    for operation in [
+        Operation("starting", 1, Record([]), NOTHING),
+        Operation("finally", 2, Record([]), NOTHING),
+        Operation("get_state", 3, Record([("state", STRING)]), NOTHING),
+        Operation("cp_thead", 4, Record([("message", STRING)]), STRING),
+        Operation(
+            "get_evse_id", 10, Record([("protocol", STRING)]), STRING, cacheable=True
+        ),
+        Operation(
+            "get_supported_energy_transfer_modes",
+            11,
+            Record([("protocol", STRING)]),
+            EnumList(EnergyTransferModeEnum),
+            cacheable=True,
+        ),
+        Operation("is_authorized", 12, Record([]), EnumType(AuthorizationStatus)),
+        Operation("get_evse_status", 13, Record([]), JSONModel(EVSEStatus)),
+        Operation("close_contactor", 20, Record([]), CONTACTOR),
+        Operation("open_contactor", 21, Record([]), CONTACTOR),
+        Operation("get_contactor_state", 22, Record([]), CONTACTOR),
+        Operation("stop_charger", 23, Record([]), CONTACTOR),
+        Operation("get_dc_evse_status", 30, Record([]), DC_EVSE_STATUS),
+        Operation(
+            "get_dc_evse_charge_parameter",
+            31,
+            Record([]),
+            JSONModel(DCEVSEChargeParameter),
+            cacheable=True,
+        ),
+        Operation(
+            "get_evse_present_voltage",
+            32,
+            Record([]),
+            physical_value(PVEVSEPresentVoltage),
+        ),
+        Operation(
+            "get_evse_present_current",
+            33,
+            Record([]),
+            physical_value(PVEVSEPresentCurrent),
+        ),
+        Operation("start_cable_check", 34, Record([]), NOTHING),
+        Operation("set_precharge", 35, Record(EV_TARGETS), NOTHING),
+        Operation(
+            "send_charging_command", 36, Record(EV_TARGETS + [("soc", SOC)]), NOTHING
+        ),
+        Operation("is_evse_current_limit_achieved", 37, Record([]), BOOL),
+        Operation("is_evse_voltage_limit_achieved", 38, Record([]), BOOL),
+        Operation("is_evse_power_limit_achieved", 39, Record([]), BOOL),
+        Operation(
+            "get_evse_max_voltage_limit",
+            40,
+            Record([]),
+            physical_value(PVEVSEMaxVoltageLimit),
+            cacheable=True,
+        ),
+        Operation(
+            "get_evse_max_current_limit",
+            41,
+            Record([]),
+            physical_value(PVEVSEMaxCurrentLimit),
+            cacheable=True,
+        ),
+        Operation(
+            "get_evse_max_power_limit",
+            42,
+            Record([]),
+            physical_value(PVEVSEMaxPowerLimit),
+            cacheable=True,
+        ),
+        Operation(
+            "get_dc_charge_loop_snapshot",
+            43,
+            Record([("protocol", STRING)] + EV_TARGETS + [("soc", SOC)]),
+            Record(
+                [
+                    ("dc_evse_status", DC_EVSE_STATUS),
+                    ("evse_present_voltage", physical_value(PVEVSEPresentVoltage)),
+                    ("evse_present_current", physical_value(PVEVSEPresentCurrent)),
+                    ("evse_current_limit_achieved", BOOL),
+                    ("evse_voltage_limit_achieved", BOOL),
+                    ("evse_power_limit_achieved", BOOL),
+                    ("evse_max_voltage_limit", physical_value(PVEVSEMaxVoltageLimit)),
+                    ("evse_max_current_limit", physical_value(PVEVSEMaxCurrentLimit)),
+                    ("evse_max_power_limit", physical_value(PVEVSEMaxPowerLimit)),
+                    ("evse_id", STRING),
+                ]
+            ),
+        ),
+        Operation(
+            "get_dc_charge_params_v20",
+            50,
+            Record([]),
+            JSONModel(DCChargeParameterDiscoveryResParams),
+            cacheable=True,
+        ),
+        Operation(
+            "get_dc_bpt_charge_params_v20",
+            51,
+            Record([]),
+            JSONModel(BPTDCChargeParameterDiscoveryResParams),
+            cacheable=True,
+        ),
+    ]
+}
+
+OPERATIONS_BY_CODE: Dict[int, Operation] = {
+    operation.code: operation for operation in OPERATIONS.values()
+}
+
+
+def _operation(name: str) -> Operation:
+    try:
+        return OPERATIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown EVSE controller operation '{name}'") from None
+
+
+def _decode_header(data: bytes) -> Tuple[MessageKind, int]:
+    try:
+        version, kind, code = HEADER.unpack_from(data)
+    except struct.error as exc:
+        raise InvalidControllerMessageError(str(exc)) from exc
+    if version != WIRE_VERSION:
+        raise InvalidControllerMessageError(
+            f"Wire format version {version} not supported (expected {WIRE_VERSION})"
+        )
+    try:
+        return MessageKind(kind), code
+    except ValueError:
+        raise InvalidControllerMessageError(f"Unknown message kind {kind}") from None
+
+
+def _decode(wire_type: WireType, data: bytes, offset: int) -> Tuple[Any, int]:
+    try:
+        return wire_type.decode(data, offset)
+    except (struct.error, IndexError, ValueError, UnicodeDecodeError) as exc:
+        raise InvalidControllerMessageError(str(exc)) from exc
+
+
+def encode_request(
+    operation: str, params: Optional[dict] = None, state: str = ""
+) -> bytes:
+    op = _operation(operation)
+    return b"".join(
+        (
+            HEADER.pack(WIRE_VERSION, MessageKind.REQUEST, op.code),
+            STRING.encode(state),
+            op.request.encode(params or {}),
+        )
+    )
+
+
+def decode_request(data: bytes) -> Tuple[str, str, dict]:
+    """Returns the operation's name, the SECC's state and the parameters"""
+    kind, code = _decode_header(data)
+    op = OPERATIONS_BY_CODE.get(code)
+    if kind != MessageKind.REQUEST or op is None:
+        raise InvalidControllerMessageError(f"No request of a known operation ({code})")
+    state, offset = _decode(STRING, data, HEADER.size)
+    params, _ = _decode(op.request, data, offset)
+    return op.name, state, params
+
+
+def encode_reply(operation: str, value: Any) -> bytes:
+    op = _operation(operation)
+    return HEADER.pack(WIRE_VERSION, MessageKind.REPLY, op.code) + op.reply.encode(
+        value
+    )
+
+
+def encode_error(operation: Optional[str], message: str) -> bytes:
+    """Encodes an error reply, the operation is None if it's unknown"""
+    code = OPERATIONS[operation].code if operation in OPERATIONS else 0
+    return HEADER.pack(WIRE_VERSION, MessageKind.ERROR, code) + STRING.encode(message)
+
+
+def decode_reply(operation: str, data: bytes) -> Any:
+    """
+    Returns the result of the operation. Raises a ControllerRequestError if
+    the controller replied with an error.
+    """
+    op = _operation(operation)
+    kind, code = _decode_header(data)
+    if kind == MessageKind.ERROR:
+        message, _ = _decode(STRING, data, HEADER.size)
+        raise ControllerRequestError(f"{operation} failed: {message}")
+    if kind != MessageKind.REPLY or code != op.code:
+        raise InvalidControllerMessageError(f"No reply to {operation}")
+    value, _ = _decode(op.reply, data, HEADER.size)
+    return value
+
+
+def encode_update(operation: str, params: Optional[dict], value: Any) -> bytes:
+    """Encodes the result of a cacheable operation, published by the controller"""
+    op = _operation(operation)
+    if not op.cacheable:
+        raise ValueError(f"EVSE controller operation '{operation}' isn't cacheable")
+    return b"".join(
+        (
+            HEADER.pack(WIRE_VERSION, MessageKind.UPDATE, op.code),
+            op.request.encode(params or {}),
+            op.reply.encode(value),
+        )
+    )
+
+
+def decode_update(data: bytes) -> Tuple[str, dict, Any]:
+    """Returns the operation's name, its parameters and its result"""
+    kind, code = _decode_header(data)
+    op = OPERATIONS_BY_CODE.get(code)
+    if kind != MessageKind.UPDATE or op is None or not op.cacheable:
+        raise InvalidControllerMessageError(
+            f"No update of a cacheable operation ({code})"
+        )
+    params, offset = _decode(op.request, data, HEADER.size)
+    value, _ = _decode(op.reply, data, offset)
+    return op.name, params, value
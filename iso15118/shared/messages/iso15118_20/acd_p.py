@@ -10,3 +10,195 @@ Pydantic's Field class is used to be able to create a json schema of each model
 (or class) that matches the definitions in the XSD schema, including the XSD
 element names by using the 'alias' attribute.
 """
+from enum import Enum
+
+from pydantic import Field
+
+from iso15118.shared.messages import BaseModel
+from iso15118.shared.messages.enums import INT_16_MAX, INT_16_MIN
+from iso15118.shared.messages.iso15118_20.common_types import (
+    Processing,
+    RationalNumber,
+    V2GRequest,
+    V2GResponse,
+)
+
+
+class CPStatus(str, Enum):
+    """See cpStatusType in V2G_CI_ACDP.xsd"""
+
+    STATE_A = "StateA"
+    STATE_B = "StateB"
+    STATE_C = "StateC"
+    STATE_D = "StateD"
+    STATE_E = "StateE"
+
+
+class EVErrorCode(str, Enum):
+    """See errorCodeType in V2G_CI_ACDP.xsd"""
+
+    OK_NO_EV_ERROR = "OK_NoEVError"
+    FAILED = "FAILED"
+    FAILED_EMERGENCY_EVENT = "FAILED_EmergencyEvent"
+    FAILED_BREAKER = "FAILED_Breaker"
+    FAILED_RESS_TEMPERATURE_INHIBIT = "FAILED_RESSTemperatureInhibit"
+    FAILED_RESS = "FAILED_RESS"
+    FAILED_CHARGING_CURRENT_DIFFERENTIAL = "FAILED_ChargingCurrentDifferential"
+    FAILED_CHARGING_VOLTAGE_OUT_OF_RANGE = "FAILED_ChargingVoltageOutOfRange"
+    FAILED_RESERVED_1 = "FAILED_Reserved1"
+    FAILED_RESERVED_2 = "FAILED_Reserved2"
+
+
+class IsolationStatus(str, Enum):
+    """See isolationStatusType in V2G_CI_ACDP.xsd"""
+
+    INVALID = "Invalid"
+    SAFE = "Safe"
+    WARNING = "Warning"
+    FAULT = "Fault"
+
+
+class ElectricalChargingDeviceStatus(str, Enum):
+    """See electricalChargingDeviceStatusType in V2G_CI_ACDP.xsd"""
+
+    STATE_A = "State_A"
+    STATE_B = "State_B"
+    STATE_C = "State_C"
+    STATE_D = "State_D"
+
+
+class MechanicalChargingDeviceStatus(str, Enum):
+    """See mechanicalChargingDeviceStatusType in V2G_CI_ACDP.xsd"""
+
+    HOME = "Home"
+    MOVING = "Moving"
+    END_POSITION = "EndPosition"
+
+
+class EVTechnicalStatus(BaseModel):
+    """See EVTechnicalStatusType in V2G_CI_ACDP.xsd"""
+
+    ev_ready_to_charge: bool = Field(..., alias="EVReadyToCharge")
+    ev_immobilization_request: bool = Field(..., alias="EVImmobilizationRequest")
+    ev_immobilized: bool = Field(None, alias="EVImmobilized")
+    ev_wlan_strength: RationalNumber = Field(None, alias="EVWLANStrength")
+    ev_cp_status: CPStatus = Field(None, alias="EVCPStatus")
+    ev_soc: int = Field(None, ge=0, le=100, alias="EVSOC")
+    ev_error_code: EVErrorCode = Field(None, alias="EVErrorCode")
+    ev_timeout: bool = Field(None, alias="EVTimeout")
+
+
+class ACDPVehiclePositioningReq(V2GRequest):
+    """See section 8.3.4.7.5.2 in ISO 15118-20"""
+
+    ev_mobility_status: bool = Field(..., alias="EVMobilityStatus")
+    ev_positioning_support: bool = Field(..., alias="EVPositioningSupport")
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_VehiclePositioningReq"
+
+
+class ACDPVehiclePositioningRes(V2GResponse):
+    """See section 8.3.4.7.5.3 in ISO 15118-20"""
+
+    evse_processing: Processing = Field(..., alias="EVSEProcessing")
+    evse_positioning_support: bool = Field(..., alias="EVSEPositioningSupport")
+    # XSD type short (16 bit integer) with value range [-32768..32767]
+    ev_relative_x_deviation: int = Field(
+        ..., ge=INT_16_MIN, le=INT_16_MAX, alias="EVRelativeXDeviation"
+    )
+    ev_relative_y_deviation: int = Field(
+        ..., ge=INT_16_MIN, le=INT_16_MAX, alias="EVRelativeYDeviation"
+    )
+    contact_window_xc: int = Field(
+        ..., ge=INT_16_MIN, le=INT_16_MAX, alias="ContactWindowXc"
+    )
+    contact_window_yc: int = Field(
+        ..., ge=INT_16_MIN, le=INT_16_MAX, alias="ContactWindowYc"
+    )
+    ev_in_charge_position: bool = Field(..., alias="EVInChargePosition")
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_VehiclePositioningRes"
+
+
+class ACDPConnectReq(V2GRequest):
+    """See section 8.3.4.7.6.2 in ISO 15118-20"""
+
+    ev_electrical_charging_device_status: ElectricalChargingDeviceStatus = Field(
+        ..., alias="EVElectricalChargingDeviceStatus"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_ConnectReq"
+
+
+class ACDPConnectRes(V2GResponse):
+    """See section 8.3.4.7.6.3 in ISO 15118-20"""
+
+    evse_processing: Processing = Field(..., alias="EVSEProcessing")
+    evse_electrical_charging_device_status: ElectricalChargingDeviceStatus = Field(
+        ..., alias="EVSEElectricalChargingDeviceStatus"
+    )
+    evse_mechanical_charging_device_status: MechanicalChargingDeviceStatus = Field(
+        ..., alias="EVSEMechanicalChargingDeviceStatus"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_ConnectRes"
+
+
+class ACDPDisconnectReq(ACDPConnectReq):
+    """
+    See section 8.3.4.7.7.2 in ISO 15118-20. The XSD reuses the type of the
+    ACDP_ConnectReq.
+    """
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_DisconnectReq"
+
+
+class ACDPDisconnectRes(ACDPConnectRes):
+    """
+    See section 8.3.4.7.7.3 in ISO 15118-20. The XSD reuses the type of the
+    ACDP_ConnectRes.
+    """
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_DisconnectRes"
+
+
+class ACDPSystemStatusReq(V2GRequest):
+    """See section 8.3.4.7.8.2 in ISO 15118-20"""
+
+    ev_technical_status: EVTechnicalStatus = Field(..., alias="EVTechnicalStatus")
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_SystemStatusReq"
+
+
+class ACDPSystemStatusRes(V2GResponse):
+    """See section 8.3.4.7.8.3 in ISO 15118-20"""
+
+    evse_mechanical_charging_device_status: MechanicalChargingDeviceStatus = Field(
+        ..., alias="EVSEMechanicalChargingDeviceStatus"
+    )
+    evse_ready_to_charge: bool = Field(..., alias="EVSEReadyToCharge")
+    evse_isolation_status: IsolationStatus = Field(..., alias="EVSEIsolationStatus")
+    evse_disabled: bool = Field(..., alias="EVSEDisabled")
+    evse_utility_interrupt_event: bool = Field(..., alias="EVSEUtilityInterruptEvent")
+    evse_emergency_shutdown: bool = Field(..., alias="EVSEEmergencyShutdown")
+    evse_malfunction: bool = Field(..., alias="EVSEMalfunction")
+    ev_in_charge_position: bool = Field(..., alias="EVInChargePosition")
+    ev_association_status: bool = Field(..., alias="EVAssociationStatus")
+
+    def __str__(self):
+        # The XSD-conform name
+        return "ACDP_SystemStatusRes"
@@ -1,6 +1,6 @@
 """
 This modules contains classes which implement all the elements of the
-ISO 15118-20 XSD file V2G_CI_DC.xsd (see folder 'schemas').
+ISO 15118-20 XSD file V2G_CI_WPT.xsd (see folder 'schemas').
 These are the V2GMessages exchanged between the EVCC and the SECC specifically
 for wireless power transfer (WPT) charging.
 
@@ -10,3 +10,561 @@ Pydantic's Field class is used to be able to create a json schema of each model
 (or class) that matches the definitions in the XSD schema, including the XSD
 element names by using the 'alias' attribute.
 """
+from enum import Enum
+from typing import List
+
+from pydantic import Field, conbytes, constr, root_validator
+
+from iso15118.shared.messages import BaseModel
+from iso15118.shared.messages.enums import (
+    INT_16_MAX,
+    INT_16_MIN,
+    UINT_8_MAX,
+    UINT_16_MAX,
+)
+from iso15118.shared.messages.iso15118_20.common_types import (
+    ChargeLoopReq,
+    ChargeLoopRes,
+    ChargeParameterDiscoveryReq,
+    ChargeParameterDiscoveryRes,
+    Identifier,
+    NumericID,
+    Processing,
+    RationalNumber,
+    V2GRequest,
+    V2GResponse,
+)
+from iso15118.shared.validators import one_field_must_be_set
+
+# WPT_DataContainerType
+DataContainer = conbytes(max_length=256)
+# bssidType (the MAC address of the access point as upper case hex string)
+BSSID = constr(max_length=12)
+# ipaddressType (the IPv6 address of the SECC as upper case hex string)
+IPAddress = constr(max_length=39)
+
+
+class FinePositioningMethod(str, Enum):
+    """See WPT_FinePositioningMethodType in V2G_CI_WPT.xsd"""
+
+    MANUAL = "Manual"
+    LF_TX_EV = "LF_TxEV"
+    LF_TX_PRIMARY_DEVICE = "LF_TxPrimaryDevice"
+    LPE = "LPE"
+    PROPRIETARY = "Proprietary"
+
+
+class PairingMethod(str, Enum):
+    """See WPT_PairingMethodType in V2G_CI_WPT.xsd"""
+
+    EXTERNAL_CONFIRMATION = "External confirmation"
+    LPE = "LPE"
+    LF_TX_EV = "LF_TxEV"
+    LF_TX_PRIMARY_DEVICE = "LF_TxPrimaryDevice"
+    OPTICAL = "Optical"
+    PROPRIETARY = "Proprietary"
+
+
+class AlignmentCheckMethod(str, Enum):
+    """See WPT_AlignmentCheckMethodType in V2G_CI_WPT.xsd"""
+
+    POWER_CHECK = "PowerCheck"
+    LPE = "LPE"
+    PROPRIETARY = "Proprietary"
+
+
+class EVPCChargeDiagnostics(str, Enum):
+    """See WPT_EVPCChargeDiagnosticsType in V2G_CI_WPT.xsd"""
+
+    NO_ISSUE = "EVPCNoIssue"
+    TEMP_OVERHEAT_DETECTED = "EVPCTempOverheatDetected"
+    POWER_TRANSFER_ANOMALY_DETECTED = "EVPCPowerTransferAnomalyDetected"
+    ANOMALY_DETECTED = "EVPCAnomalyDetected"
+
+
+class SPCChargeDiagnostics(str, Enum):
+    """See WPT_SPCChargeDiagnosticsType in V2G_CI_WPT.xsd"""
+
+    NO_ISSUE = "SPCNoIssue"
+    FOD_DETECTED = "SPCFODDetected"
+    LOP_DETECTED = "SPCLOPDetected"
+    TEMP_OVERHEAT_DETECTED = "SPCTempOverheatDetected"
+    POWER_TRANSFER_ANOMALY_DETECTED = "SPCPowerTransferAnomalyDetected"
+    ANOMALY_DETECTED = "SPCAnomalyDetected"
+
+
+class PowerClass(str, Enum):
+    """See WPT_PowerClassType in V2G_CI_WPT.xsd"""
+
+    MF_WPT1 = "MF-WPT1"
+    MF_WPT2 = "MF-WPT2"
+    MF_WPT3 = "MF-WPT3"
+    MF_WPT4 = "MF-WPT4"
+
+
+class EVResult(str, Enum):
+    """See WPT_EVResultType in V2G_CI_WPT.xsd"""
+
+    UNKNOWN = "EVResultUnknown"
+    SUCCESS = "EVResultSuccess"
+    FAILED = "EVResultFailed"
+
+
+class FinePositioningMethodList(BaseModel):
+    """See WPT_FinePositioningMethodListType in V2G_CI_WPT.xsd"""
+
+    methods: List[FinePositioningMethod] = Field(
+        ..., max_items=8, alias="WPT_FinePositioningMethod"
+    )
+
+
+class PairingMethodList(BaseModel):
+    """See WPT_PairingMethodListType in V2G_CI_WPT.xsd"""
+
+    methods: List[PairingMethod] = Field(..., max_items=8, alias="WPT_PairingMethod")
+
+
+class AlignmentCheckMethodList(BaseModel):
+    """See WPT_AlignmentCheckMethodListType in V2G_CI_WPT.xsd"""
+
+    methods: List[AlignmentCheckMethod] = Field(
+        ..., max_items=8, alias="WPT_AlignmentCheckMethod"
+    )
+
+
+class EVPCPowerControlParameter(BaseModel):
+    """See WPT_EVPCPowerControlParameterType in V2G_CI_WPT.xsd"""
+
+    coil_current_request: RationalNumber = Field(..., alias="EVPCCoilCurrentRequest")
+    coil_current_information: RationalNumber = Field(
+        ..., alias="EVPCCoilCurrentInformation"
+    )
+    current_output_information: RationalNumber = Field(
+        ..., alias="EVPCCurrentOutputInformation"
+    )
+    voltage_output_information: RationalNumber = Field(
+        ..., alias="EVPCVoltageOutputInformation"
+    )
+
+
+class SPCPowerControlParameter(BaseModel):
+    """See WPT_SPCPowerControlParameterType in V2G_CI_WPT.xsd"""
+
+    primary_device_coil_current_information: RationalNumber = Field(
+        ..., alias="SPCPrimaryDeviceCoilCurrentInformation"
+    )
+
+
+class CoordinateXYZ(BaseModel):
+    """See WPT_CoordinateXYZType in V2G_CI_WPT.xsd"""
+
+    # XSD type short (16 bit integer) with value range [-32768..32767]
+    x: int = Field(..., ge=INT_16_MIN, le=INT_16_MAX, alias="Coord_X")
+    y: int = Field(..., ge=INT_16_MIN, le=INT_16_MAX, alias="Coord_Y")
+    z: int = Field(..., ge=INT_16_MIN, le=INT_16_MAX, alias="Coord_Z")
+
+
+class TxRxSpecData(BaseModel):
+    """See WPT_TxRxSpecDataType in V2G_CI_WPT.xsd"""
+
+    tx_rx_identifier: NumericID = Field(..., alias="TxRxIdentifier")
+    tx_rx_position: CoordinateXYZ = Field(..., alias="TxRxPosition")
+    tx_rx_orientation: CoordinateXYZ = Field(..., alias="TxRxOrientation")
+
+
+class TxRxPulseOrder(BaseModel):
+    """See WPT_TxRxPulseOrderType in V2G_CI_WPT.xsd"""
+
+    index_number: int = Field(..., ge=0, le=UINT_16_MAX, alias="IndexNumber")
+    tx_rx_identifier: NumericID = Field(..., alias="TxRxIdentifier")
+
+
+class TxRxPackageSpecData(BaseModel):
+    """See WPT_TxRxPackageSpecDataType in V2G_CI_WPT.xsd"""
+
+    pulse_sequence_order: List[TxRxPulseOrder] = Field(
+        ..., min_items=2, max_items=255, alias="PulseSequenceOrder"
+    )
+    pulse_separation_time: int = Field(
+        ..., ge=0, le=UINT_16_MAX, alias="PulseSeparationTime"
+    )
+    pulse_duration: int = Field(..., ge=0, le=UINT_16_MAX, alias="PulseDuration")
+    package_separation_time: int = Field(
+        ..., ge=0, le=UINT_16_MAX, alias="PackageSeparationTime"
+    )
+
+
+class LFTransmitterData(BaseModel):
+    """See WPT_LF_TransmitterDataType in V2G_CI_WPT.xsd"""
+
+    number_of_transmitters: int = Field(
+        ..., ge=0, le=UINT_8_MAX, alias="NumberOfTransmitters"
+    )
+    signal_frequency: RationalNumber = Field(..., alias="SignalFrequency")
+    tx_spec_data: List[TxRxSpecData] = Field(
+        ..., min_items=2, max_items=255, alias="TxSpecData"
+    )
+    tx_package_spec_data: TxRxPackageSpecData = Field(None, alias="TxPackageSpecData")
+
+
+class LFReceiverData(BaseModel):
+    """See WPT_LF_ReceiverDataType in V2G_CI_WPT.xsd"""
+
+    number_of_receivers: int = Field(
+        ..., ge=0, le=UINT_8_MAX, alias="NumberOfReceivers"
+    )
+    rx_spec_data: List[TxRxSpecData] = Field(
+        ..., min_items=2, max_items=255, alias="RxSpecData"
+    )
+
+
+class LFSystemSetupData(BaseModel):
+    """See WPT_LF_SystemSetupDataType in V2G_CI_WPT.xsd"""
+
+    transmitter_setup_data: LFTransmitterData = Field(
+        None, alias="LF_TransmitterSetupData"
+    )
+    receiver_setup_data: LFReceiverData = Field(None, alias="LF_ReceiverSetupData")
+
+    @root_validator(pre=True)
+    def either_transmitter_or_receiver(cls, values):
+        """
+        Either transmitter_setup_data or receiver_setup_data must be set
+        (XSD choice).
+
+        Pydantic validators are "class methods",
+        see https://pydantic-docs.helpmanual.io/usage/validators/
+        """
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+        if one_field_must_be_set(
+            [
+                "transmitter_setup_data",
+                "LF_TransmitterSetupData",
+                "receiver_setup_data",
+                "LF_ReceiverSetupData",
+            ],
+            values,
+            True,
+        ):
+            return values
+
+
+class LFTxData(BaseModel):
+    """See WPT_LF_TxDataType in V2G_CI_WPT.xsd"""
+
+    tx_identifier: NumericID = Field(..., alias="TxIdentifier")
+    eirp: RationalNumber = Field(..., alias="EIRP")
+
+
+class LFTxDataList(BaseModel):
+    """See WPT_LF_TxDataListType in V2G_CI_WPT.xsd"""
+
+    tx_data: LFTxData = Field(..., alias="WPT_LF_TxDataList")
+
+
+class LFRxRSSI(BaseModel):
+    """See WPT_LF_RxRSSIType in V2G_CI_WPT.xsd"""
+
+    tx_identifier: NumericID = Field(..., alias="TxIdentifier")
+    rssi: RationalNumber = Field(..., alias="RSSI")
+
+
+class LFRxRSSIList(BaseModel):
+    """See WPT_LF_RxRSSIListType in V2G_CI_WPT.xsd"""
+
+    rssi_data: LFRxRSSI = Field(..., alias="RSSIDataList")
+
+
+class LFRxData(BaseModel):
+    """See WPT_LF_RxDataType in V2G_CI_WPT.xsd"""
+
+    rx_identifier: NumericID = Field(..., alias="RxIdentifier")
+    rssi_data: LFRxRSSIList = Field(..., alias="RSSIData")
+
+
+class LFRxDataList(BaseModel):
+    """See WPT_LF_RxDataListType in V2G_CI_WPT.xsd"""
+
+    rx_data: LFRxData = Field(..., alias="WPT_LF_RxDataList")
+
+
+class LFDataPackage(BaseModel):
+    """See WPT_LF_DataPackageType in V2G_CI_WPT.xsd"""
+
+    package_index: int = Field(..., ge=0, le=UINT_8_MAX, alias="PackageIndex")
+    tx_data: LFTxDataList = Field(None, alias="LF_TxData")
+    rx_data: LFRxDataList = Field(None, alias="LF_RxData")
+
+    @root_validator(pre=True)
+    def either_tx_or_rx_data(cls, values):
+        """
+        Either tx_data or rx_data must be set (XSD choice).
+
+        Pydantic validators are "class methods",
+        see https://pydantic-docs.helpmanual.io/usage/validators/
+        """
+        # pylint: disable=no-self-argument
+        # pylint: disable=no-self-use
+        if one_field_must_be_set(
+            ["tx_data", "LF_TxData", "rx_data", "LF_RxData"], values, True
+        ):
+            return values
+
+
+class LFDataPackageList(BaseModel):
+    """See WPT_LF_DataPackageListType in V2G_CI_WPT.xsd"""
+
+    num_packages: int = Field(..., ge=0, le=UINT_8_MAX, alias="NumPackages")
+    data_package: LFDataPackage = Field(..., alias="WPT_LF_DataPackage")
+
+
+class AlternativeSECC(BaseModel):
+    """See AlternativeSECCType in V2G_CI_WPT.xsd"""
+
+    ssid: Identifier = Field(None, alias="SSID")
+    bssid: BSSID = Field(None, alias="BSSID")
+    ip_address: IPAddress = Field(None, alias="IPAddress")
+    port: int = Field(None, ge=0, le=UINT_16_MAX, alias="Port")
+
+
+class AlternativeSECCList(BaseModel):
+    """See AlternativeSECCListType in V2G_CI_WPT.xsd"""
+
+    alternative_seccs: List[AlternativeSECC] = Field(
+        ..., max_items=8, alias="AlternativeSECC"
+    )
+
+
+class WPTFinePositioningSetupReq(V2GRequest):
+    """See section 8.3.4.6.2.2 in ISO 15118-20"""
+
+    ev_processing: Processing = Field(..., alias="EVProcessing")
+    ev_fine_positioning_methods: FinePositioningMethodList = Field(
+        ..., alias="EVDeviceFinePositioningMethodList"
+    )
+    ev_pairing_methods: PairingMethodList = Field(
+        ..., alias="EVDevicePairingMethodList"
+    )
+    ev_alignment_check_methods: AlignmentCheckMethodList = Field(
+        ..., alias="EVDeviceAlignmentCheckMethodList"
+    )
+    natural_offset: int = Field(..., ge=0, le=UINT_16_MAX, alias="NaturalOffset")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+    lf_system_setup_data: LFSystemSetupData = Field(None, alias="LF_SystemSetupData")
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_FinePositioningSetupReq"
+
+
+class WPTFinePositioningSetupRes(V2GResponse):
+    """See section 8.3.4.6.2.3 in ISO 15118-20"""
+
+    primary_fine_positioning_methods: FinePositioningMethodList = Field(
+        ..., alias="PrimaryDeviceFinePositioningMethodList"
+    )
+    primary_pairing_methods: PairingMethodList = Field(
+        ..., alias="PrimaryDevicePairingMethodList"
+    )
+    primary_alignment_check_methods: AlignmentCheckMethodList = Field(
+        ..., alias="PrimaryDeviceAlignmentCheckMethodList"
+    )
+    natural_offset: int = Field(..., ge=0, le=UINT_16_MAX, alias="NaturalOffset")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+    lf_system_setup_data: LFSystemSetupData = Field(None, alias="LF_SystemSetupData")
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_FinePositioningSetupRes"
+
+
+class WPTFinePositioningReq(V2GRequest):
+    """See section 8.3.4.6.3.2 in ISO 15118-20"""
+
+    ev_processing: Processing = Field(..., alias="EVProcessing")
+    ev_result_code: EVResult = Field(..., alias="EVResultCode")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+    lf_data_package_list: LFDataPackageList = Field(
+        None, alias="WPT_LF_DataPackageList"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_FinePositioningReq"
+
+
+class WPTFinePositioningRes(V2GResponse):
+    """See section 8.3.4.6.3.3 in ISO 15118-20"""
+
+    evse_processing: Processing = Field(..., alias="EVSEProcessing")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+    lf_data_package_list: LFDataPackageList = Field(
+        None, alias="WPT_LF_DataPackageList"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_FinePositioningRes"
+
+
+class WPTPairingReq(V2GRequest):
+    """See section 8.3.4.6.4.2 in ISO 15118-20"""
+
+    ev_processing: Processing = Field(..., alias="EVProcessing")
+    observed_id_code: NumericID = Field(None, alias="ObservedIDCode")
+    ev_result_code: EVResult = Field(..., alias="EVResultCode")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_PairingReq"
+
+
+class WPTPairingRes(V2GResponse):
+    """See section 8.3.4.6.4.3 in ISO 15118-20"""
+
+    evse_processing: Processing = Field(..., alias="EVSEProcessing")
+    observed_id_code: NumericID = Field(None, alias="ObservedIDCode")
+    alternative_secc_list: AlternativeSECCList = Field(
+        None, alias="AlternativeSECCList"
+    )
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_PairingRes"
+
+
+class WPTChargeParameterDiscoveryReq(ChargeParameterDiscoveryReq):
+    """See WPT_ChargeParameterDiscoveryReqType in V2G_CI_WPT.xsd"""
+
+    ev_max_receivable_power: RationalNumber = Field(..., alias="EVPCMaxReceivablePower")
+    sd_max_ground_clearance: int = Field(
+        ..., ge=0, le=UINT_16_MAX, alias="SDMaxGroundClearence"
+    )
+    sd_min_ground_clearance: int = Field(
+        ..., ge=0, le=UINT_16_MAX, alias="SDMinGroundClearence"
+    )
+    ev_natural_frequency: RationalNumber = Field(..., alias="EVPCNaturalFrequency")
+    ev_device_local_control: bool = Field(..., alias="EVPCDeviceLocalControl")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_ChargeParameterDiscoveryReq"
+
+
+class WPTChargeParameterDiscoveryRes(ChargeParameterDiscoveryRes):
+    """See WPT_ChargeParameterDiscoveryResType in V2G_CI_WPT.xsd"""
+
+    pd_input_power_class: PowerClass = Field(..., alias="PDInputPowerClass")
+    sd_min_output_power: RationalNumber = Field(..., alias="SDMinOutputPower")
+    sd_max_output_power: RationalNumber = Field(..., alias="SDMaxOutputPower")
+    sd_max_ground_clearance_support: int = Field(
+        ..., ge=0, le=UINT_16_MAX, alias="SDMaxGroundClearanceSupport"
+    )
+    sd_min_ground_clearance_support: int = Field(
+        ..., ge=0, le=UINT_16_MAX, alias="SDMinGroundClearanceSupport"
+    )
+    pd_min_coil_current: RationalNumber = Field(..., alias="PDMinCoilCurrent")
+    pd_max_coil_current: RationalNumber = Field(..., alias="PDMaxCoilCurrent")
+    sd_manufacturer_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="SDManufacturerSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_ChargeParameterDiscoveryRes"
+
+
+class WPTAlignmentCheckReq(V2GRequest):
+    """See section 8.3.4.6.6.2 in ISO 15118-20"""
+
+    ev_processing: Processing = Field(..., alias="EVProcessing")
+    target_coil_current: RationalNumber = Field(None, alias="TargetCoilCurrent")
+    ev_result_code: EVResult = Field(..., alias="EVResultCode")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_AlignmentCheckReq"
+
+
+class WPTAlignmentCheckRes(V2GResponse):
+    """See section 8.3.4.6.6.3 in ISO 15118-20"""
+
+    evse_processing: Processing = Field(..., alias="EVSEProcessing")
+    power_transmitted: RationalNumber = Field(None, alias="PowerTransmitted")
+    supply_device_current: RationalNumber = Field(None, alias="SupplyDeviceCurrent")
+    vendor_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="VendorSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_AlignmentCheckRes"
+
+
+class WPTChargeLoopReq(ChargeLoopReq):
+    """See WPT_ChargeLoopReqType in V2G_CI_WPT.xsd"""
+
+    ev_power_request: RationalNumber = Field(..., alias="EVPCPowerRequest")
+    ev_power_output: RationalNumber = Field(..., alias="EVPCPowerOutput")
+    ev_charge_diagnostics: EVPCChargeDiagnostics = Field(
+        ..., alias="EVPCChargeDiagnostics"
+    )
+    ev_operating_frequency: RationalNumber = Field(None, alias="EVPCOperatingFrequency")
+    ev_power_control_parameter: EVPCPowerControlParameter = Field(
+        None, alias="EVPCPowerControlParameter"
+    )
+    manufacturer_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="ManufacturerSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_ChargeLoopReq"
+
+
+class WPTChargeLoopRes(ChargeLoopRes):
+    """See WPT_ChargeLoopResType in V2G_CI_WPT.xsd"""
+
+    ev_power_request: RationalNumber = Field(..., alias="EVPCPowerRequest")
+    sd_power_input: RationalNumber = Field(None, alias="SDPowerInput")
+    spc_max_output_power_limit: RationalNumber = Field(
+        ..., alias="SPCMaxOutputPowerLimit"
+    )
+    spc_min_output_power_limit: RationalNumber = Field(
+        ..., alias="SPCMinOutputPowerLimit"
+    )
+    spc_charge_diagnostics: SPCChargeDiagnostics = Field(
+        ..., alias="SPCChargeDiagnostics"
+    )
+    spc_operating_frequency: RationalNumber = Field(None, alias="SPCOperatingFrequency")
+    spc_power_control_parameter: SPCPowerControlParameter = Field(
+        None, alias="SPCPowerControlParameter"
+    )
+    manufacturer_specific_data: List[DataContainer] = Field(
+        None, max_items=16, alias="ManufacturerSpecificDataContainer"
+    )
+
+    def __str__(self):
+        # The XSD-conform name
+        return "WPT_ChargeLoopRes"
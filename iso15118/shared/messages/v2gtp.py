@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Union
+from typing import Optional, Union
 
 from iso15118.shared.exceptions import (
     InvalidPayloadTypeError,
@@ -14,6 +15,7 @@ from iso15118.shared.messages.enums import (
     Protocol,
     V2GTPVersion,
 )
+from iso15118.shared.settings import V2GTP_MAX_PAYLOAD_LENGTH
 
 logger = logging.getLogger(__name__)
 
@@ -191,24 +193,35 @@ class V2GTPMessage:
         # The smallest possible datagram is a V2GTP message with an
         # SDP request of 2 bytes
         if len(data) >= 10:
-            header = data[:8]
-
-            payload_type: Union[ISOV2PayloadTypes, ISOV20PayloadTypes]
-            if cls.is_header_valid(protocol, header):
-                if protocol.ns.startswith("urn:iso:std:iso:15118:-20"):
-                    payload_type = ISOV20PayloadTypes(cls.get_payload_type(header))
-                else:
-                    payload_type = ISOV2PayloadTypes(cls.get_payload_type(header))
-                return V2GTPMessage(protocol, payload_type, data[8:])
-            raise InvalidV2GTPMessageError(
-                "Not a valid V2GTP message " "(header check failed)"
-            )
+            return cls.from_header(protocol, data[:8], data[8:])
         raise InvalidV2GTPMessageError(
             f"Incoming data is too short to be "
             "a valid V2GTP message"
             f" (only {len(data)} bytes)"
         )
 
+    @classmethod
+    def from_header(
+        cls, protocol: Protocol, header: bytes, payload: bytes
+    ) -> "V2GTPMessage":
+        """
+        Creates a V2GTP message from its separately received header and
+        payload, see from_bytes()
+
+        Raises:
+            InvalidV2GTPMessageError
+        """
+        payload_type: Union[ISOV2PayloadTypes, ISOV20PayloadTypes]
+        if cls.is_header_valid(protocol, header):
+            if protocol.ns.startswith("urn:iso:std:iso:15118:-20"):
+                payload_type = ISOV20PayloadTypes(cls.get_payload_type(header))
+            else:
+                payload_type = ISOV2PayloadTypes(cls.get_payload_type(header))
+            return V2GTPMessage(protocol, payload_type, payload)
+        raise InvalidV2GTPMessageError(
+            "Not a valid V2GTP message " "(header check failed)"
+        )
+
     def __repr__(self):
         return (
             f"[Header = [{hex(self.protocol_version)}, "
@@ -216,3 +229,73 @@ class V2GTPMessage:
             f"{self.payload_length}], Payload = {self.payload.hex()})"
             "]"
         )
+
+
+class V2GTPStreamReader:
+    """
+    Reads one V2GTP message at a time from a TCP stream. TCP may coalesce
+    several messages into one segment or fragment a message across segments,
+    so the message boundaries are taken from the header's payload length
+    instead of from the size of a single read.
+    """
+
+    HEADER_LENGTH = 8
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        max_payload_length: int = V2GTP_MAX_PAYLOAD_LENGTH,
+    ):
+        self.reader = reader
+        self.max_payload_length = max_payload_length
+
+    async def read_message(self, protocol: Protocol) -> Optional[V2GTPMessage]:
+        """
+        Waits for the next complete V2GTP message.
+
+        Args:
+            protocol: The protocol of the communication session, which
+                      determines the valid payload types
+
+        Returns:
+            The V2GTP message, or None if the peer closed the connection
+            between two messages
+
+        Raises:
+            InvalidV2GTPMessageError, if the header is invalid, the payload
+            exceeds the maximum payload length, or the peer closed the
+            connection in the middle of a message
+        """
+        try:
+            header = await self.reader.readexactly(self.HEADER_LENGTH)
+        except asyncio.IncompleteReadError as exc:
+            if not exc.partial:
+                return None
+            raise InvalidV2GTPMessageError(
+                f"Connection closed after {len(exc.partial)} bytes of a " "V2GTP header"
+            ) from exc
+
+        if not V2GTPMessage.is_header_valid(protocol, header):
+            raise InvalidV2GTPMessageError(
+                "Not a valid V2GTP message (header check failed)"
+            )
+
+        payload_length = V2GTPMessage.get_payload_length(header)
+        if payload_length > self.max_payload_length:
+            # Rejected before reading, so that a bogus length can't make us
+            # buffer up to 4 GB
+            raise InvalidV2GTPMessageError(
+                f"Payload length of {payload_length} bytes exceeds the maximum "
+                f"of {self.max_payload_length} bytes"
+            )
+
+        try:
+            # Allocates the payload once at its exact size
+            payload = await self.reader.readexactly(payload_length)
+        except asyncio.IncompleteReadError as exc:
+            raise InvalidV2GTPMessageError(
+                f"Connection closed after {len(exc.partial)} of "
+                f"{payload_length} payload bytes"
+            ) from exc
+
+        return V2GTPMessage.from_header(protocol, header, payload)
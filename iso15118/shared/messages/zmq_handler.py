@@ -1,29 +1,77 @@
+"""
+The IPC channel to the EVSE controller (see controller/main.py).
+
+The channel is a ZMQ DEALER socket, connected to the controller's ROUTER
+socket. Each request carries a request ID, which the controller echoes in its
+reply, so that the calls of all sessions can be in flight at the same time on
+one socket. A reply is matched to its call by the request ID, whatever order
+the controller replies in.
+
+Each call has a deadline. After several calls in a row timed out, or if the
+socket failed, the socket is replaced by a new one and the calls still waiting
+for a reply fail with a ControllerConnectionError.
+
+The frames of a request and of its reply are [b"", request ID, message], the
+message being encoded in the wire format of controller_wire.py.
+"""
+import asyncio
+import itertools
 import logging
 import os
-import pickle
+import struct
+from typing import Any, Dict, List, Optional
 
+import zmq
 import zmq.asyncio
 
-logger = logging.getLogger(__name__)
+from iso15118.shared.exceptions import (
+    ControllerConnectionError,
+    ControllerTimeoutError,
+)
+from iso15118.shared.messages.controller_wire import decode_reply, encode_request
+from iso15118.shared.settings import (
+    CONTROLLER_RECONNECT_AFTER_TIMEOUTS,
+    CONTROLLER_REQUEST_TIMEOUT,
+)
 
+logger = logging.getLogger(__name__)
 
-def message_maker(command: str, payload: bytes = pickle.dumps({})) -> bytes:
-    return pickle.dumps(
-        {
-            "command": command,
-            "payload": payload
-        }
-    )
+REQUEST_ID = struct.Struct("!Q")
 
 
 class ZMQHandler:
+    """
+    Sends requests to the EVSE controller and awaits their replies.
 
-    def __init__(self) -> None:
+    Args:
+        endpoint: The controller's ZMQ endpoint, ZMQ_FOR_CP_AND_V2G if None
+        request_timeout: Default deadline (in seconds) of a request
+        reconnect_after_timeouts: Number of timed out requests in a row after
+                                  which the socket is replaced
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        request_timeout: float = CONTROLLER_REQUEST_TIMEOUT,
+        reconnect_after_timeouts: int = CONTROLLER_RECONNECT_AFTER_TIMEOUTS,
+    ) -> None:
+        # Each connector of a multi-connector SECC has its own endpoint
+        self.endpoint = endpoint or os.environ.get("ZMQ_FOR_CP_AND_V2G")
+        self.request_timeout = request_timeout
+        self.reconnect_after_timeouts = reconnect_after_timeouts
+        self.state = "initializing"
+        self.context = zmq.asyncio.Context.instance()
+        self.socket: Optional[zmq.asyncio.Socket] = None
+        self._request_ids = itertools.count(1)
+        # The calls waiting for a reply, keyed by request ID
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._rcv_task: Optional[asyncio.Task] = None
+        self._timeouts_in_row: int = 0
+        self.timeouts: int = 0
+        self.reconnects: int = 0
         try:
-            self.context = zmq.asyncio.Context()
-            self.socket = self.context.socket(zmq.REQ)
-            self.socket.connect(os.environ.get('ZMQ_FOR_CP_AND_V2G'))
-            self.state = "initializing"
+            self._connect()
         except Exception as exc:
             logger.error(f"ZMQHandler terminated: {exc}")
             raise
@@ -34,30 +82,128 @@ class ZMQHandler:
     def set_state(self, state: str):
         self.state = state
 
+    def _connect(self):
+        socket = self.context.socket(zmq.DEALER)
+        # Requests not sent yet are dropped when the socket is replaced
+        socket.setsockopt(zmq.LINGER, 0)
+        try:
+            socket.connect(self.endpoint)
+        except Exception:
+            socket.close()
+            raise
+        self.socket = socket
+
+    def _reconnect(self, reason: str):
+        logger.warning(f"Resetting connection to EVSE controller: {reason}")
+        if self._rcv_task and self._rcv_task is not asyncio.current_task():
+            self._rcv_task.cancel()
+        self._rcv_task = None
+        self.socket.close()
+        self._connect()
+        self.reconnects += 1
+        self._timeouts_in_row = 0
+        # Their replies would arrive on the old socket
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ControllerConnectionError(reason))
+
+    def _ensure_receiving(self):
+        loop = asyncio.get_running_loop()
+        if (
+            self._rcv_task is None
+            or self._rcv_task.done()
+            or self._rcv_task.get_loop() is not loop
+        ):
+            self._rcv_task = loop.create_task(self._rcv_loop(self.socket))
+
+    async def _rcv_loop(self, socket: zmq.asyncio.Socket):
+        """Resolves the pending calls with the replies received on 'socket'"""
+        while True:
+            try:
+                frames: List[bytes] = await socket.recv_multipart()
+            except zmq.ZMQError as exc:
+                if socket is self.socket:
+                    self._reconnect(f"Receiving failed: {exc}")
+                return
+
+            try:
+                _, request_id_frame, reply = frames
+                (request_id,) = REQUEST_ID.unpack(request_id_frame)
+            except (ValueError, struct.error):
+                logger.warning("Dropped malformed reply from EVSE controller")
+                continue
+
+            future = self._pending.pop(request_id, None)
+            if future is None or future.done():
+                logger.debug(f"Dropped late reply to request {request_id}")
+                continue
+            future.set_result(reply)
+
     async def start(self) -> None:
         try:
-            res = await self.send_message(state='initializing',
-                                          message=message_maker("starting"), protocol='v2g_message')
-            logger.info(f"Connected to secc {res}")
+            await self.request("starting")
+            logger.info("Connected to EVSE controller")
         except Exception as exc:
             logger.error(f"ZMQHandler terminated: {exc}")
             raise
 
-    async def send_message(self, message: bytes, state: str = "state", protocol: str = 'v2g_message') -> any:
+    async def request(
+        self,
+        operation: str,
+        params: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Requests the operation (see controller_wire.OPERATIONS) from the EVSE
+        controller and returns its result. Raises a ControllerTimeoutError if
+        there's no reply within 'timeout' seconds (request_timeout if None),
+        and a ControllerRequestError if the controller replied with an error.
+        """
+        request = encode_request(operation, params, self.get_state())
+        if timeout is None:
+            timeout = self.request_timeout
+
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
         try:
-            if isinstance(message, bytes):
-                await self.socket.send(pickle.dumps(
-                    {'state': self.get_state(), 'message': message, 'protocol': protocol})
-                )
-                resp: bytes = await self.socket.recv()
-                return pickle.loads(resp)
-            else:
-                await self.socket.send(pickle.dumps(
-                    {'state': self.get_state(), 'message': pickle.dumps({'null': message}), 'protocol': protocol}))
-                resp: bytes = await self.socket.recv()
-                return pickle.loads(resp)
-        except Exception as exc:
+            self._ensure_receiving()
+            await self.socket.send_multipart(
+                [b"", REQUEST_ID.pack(request_id), request]
+            )
+            reply: bytes = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._timeouts_in_row += 1
+            logger.error(f"EVSE controller didn't reply within {timeout}s")
+            if self._timeouts_in_row >= self.reconnect_after_timeouts:
+                self._reconnect(f"{self._timeouts_in_row} requests timed out")
+            raise ControllerTimeoutError(f"No reply to request {request_id}")
+        except zmq.ZMQError as exc:
             logger.error(f"ZMQHandler terminated: {exc}")
-            raise
+            self._reconnect(f"Sending failed: {exc}")
+            raise ControllerConnectionError(str(exc)) from exc
         finally:
-            logger.info(f"Sending message to secc on state : {state}")
+            self._pending.pop(request_id, None)
+            logger.debug(f"Requested {operation} in state {self.get_state()}")
+
+        self._timeouts_in_row = 0
+        return decode_reply(operation, reply)
+
+    def close(self):
+        """Closes the socket, the calls waiting for a reply are cancelled"""
+        if self._rcv_task:
+            self._rcv_task.cancel()
+            self._rcv_task = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self.socket.close()
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "controller_pending": len(self._pending),
+            "controller_timeouts": self.timeouts,
+            "controller_reconnects": self.reconnects,
+        }
@@ -0,0 +1,580 @@
+"""
+A pure Python, in-process EXI codec, which encodes and decodes the JSON (or
+dict) representation of the messages with the schema-informed grammars of
+exi_grammar.py. It doesn't need a JVM and avoids the py4j round
+trip of the Exificient codec for every message.
+"""
+import json
+import logging
+from base64 import b64decode, b64encode
+from collections import deque
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from iso15118.shared.exceptions import EXIDecodingError, EXIEncodingError
+from iso15118.shared.exi_grammar import (
+    AT,
+    BASE64_BINARY,
+    BOOLEAN,
+    CH,
+    EE,
+    ENUMERATION,
+    HEX_BINARY,
+    INTEGER,
+    N_BIT_INTEGER,
+    SE,
+    UNSIGNED_INTEGER,
+    Datatype,
+    ElementDecl,
+    QName,
+    SchemaGrammar,
+    State,
+    load_schema_grammar,
+)
+from iso15118.shared.iexi_codec import IStructuredEXICodec
+from iso15118.shared.messages.enums import Namespace
+
+logger = logging.getLogger(__name__)
+
+# Distinguishing bits '10', no EXI options, final version 1
+EXI_HEADER = 0x80
+
+# The root elements that are encoded as EXI documents. All other elements
+# (e.g. the signed parts of a message, whose digest is computed over their
+# EXI encoding) are encoded as EXI fragments.
+DOCUMENT_ROOTS: Dict[str, Tuple[str, ...]] = {
+    Namespace.SAP.value: ("supportedAppProtocolReq", "supportedAppProtocolRes"),
+    Namespace.DIN_MSG_DEF.value: ("V2G_Message",),
+    Namespace.ISO_V2_MSG_DEF.value: ("V2G_Message",),
+    Namespace.XML_DSIG.value: (),
+}
+
+
+class BitWriter:
+    """Writes a bit-packed EXI stream"""
+
+    __slots__ = ("_buffer", "_bits", "_length")
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._bits = 0
+        self._length = 0
+
+    def write_bits(self, value: int, width: int):
+        if width == 0:
+            return
+        self._bits = (self._bits << width) | value
+        self._length += width
+        if self._length >= 8:
+            remainder = self._length & 7
+            self._buffer += (self._bits >> remainder).to_bytes(self._length >> 3, "big")
+            self._bits &= (1 << remainder) - 1
+            self._length = remainder
+
+    def write_unsigned(self, value: int):
+        """Unsigned integer, 7 bits per octet, least significant group first"""
+        while value > 0x7F:
+            self.write_bits((value & 0x7F) | 0x80, 8)
+            value >>= 7
+        self.write_bits(value, 8)
+
+    def write_bytes(self, data: bytes):
+        self.write_unsigned(len(data))
+        if data:
+            self.write_bits(int.from_bytes(data, "big"), len(data) * 8)
+
+    @property
+    def bit_length(self) -> int:
+        return len(self._buffer) * 8 + self._length
+
+    def getvalue(self) -> bytes:
+        if self._length:
+            return bytes(self._buffer) + bytes([self._bits << (8 - self._length)])
+        return bytes(self._buffer)
+
+
+class BitReader:
+    """Reads a bit-packed EXI stream"""
+
+    __slots__ = ("_data", "_position", "_size")
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0
+        self._size = len(data) * 8
+
+    def read_bits(self, width: int) -> int:
+        if width == 0:
+            return 0
+        start = self._position
+        end = start + width
+        if end > self._size:
+            raise EXIDecodingError("Unexpected end of EXI stream")
+        first, last = start >> 3, (end + 7) >> 3
+        chunk = int.from_bytes(self._data[first:last], "big")
+        self._position = end
+        return (chunk >> ((last << 3) - end)) & ((1 << width) - 1)
+
+    def read_unsigned(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            octet = self.read_bits(8)
+            value |= (octet & 0x7F) << shift
+            if octet < 0x80:
+                return value
+            shift += 7
+
+    def read_bytes(self) -> bytes:
+        length = self.read_unsigned()
+        if not length:
+            return b""
+        return self.read_bits(length * 8).to_bytes(length, "big")
+
+
+# The datatypes whose values can be patched in an EXITemplate. Strings are
+# excluded, as they depend on (and change) the string tables.
+PATCHABLE_DATATYPES = (
+    N_BIT_INTEGER,
+    ENUMERATION,
+    BOOLEAN,
+    UNSIGNED_INTEGER,
+    INTEGER,
+    HEX_BINARY,
+    BASE64_BINARY,
+)
+
+Path = Tuple
+
+
+class _Slot:
+    """The position of a value in the EXI stream of an EXITemplate"""
+
+    __slots__ = ("offset", "width", "datatype", "qname")
+
+    def __init__(self, offset: int, width: int, datatype: Datatype, qname: QName):
+        self.offset = offset
+        self.width = width
+        self.datatype = datatype
+        self.qname = qname
+
+
+class _Encoder:
+    """Encodes a single message dict into an EXI stream"""
+
+    def __init__(self, slots: Optional[Dict[Path, _Slot]] = None):
+        self.writer = BitWriter()
+        # If given, the positions of all patchable values are recorded here,
+        # keyed by their path in the message dict (see flatten_message())
+        self.slots = slots
+        # String tables for values (EXI 1.0, section 7.3.3). The global and
+        # the local (per qualified name) value partitions map to compact IDs.
+        self.global_values: Dict[str, int] = {}
+        self.local_values: Dict[QName, Dict[str, int]] = {}
+
+    def encode_root(self, state: State, name: str, value, fragment: bool):
+        production = state.by_name.get(name)
+        if production is None or production.decl is None:
+            raise EXIEncodingError(f"Unknown or unsupported root element {name}")
+        self.writer.write_bits(EXI_HEADER, 8)
+        self.writer.write_bits(production.code, state.width)
+        self.encode_element(production.decl, value, (name,))
+        if fragment:
+            # ED of the fragment content, the document end has just one event
+            self.writer.write_bits(state.end.code, state.width)
+
+    def encode_element(self, decl: ElementDecl, value, path: Path = ()):
+        grammar = decl.grammar
+        state = grammar.start
+        is_dict = isinstance(value, dict)
+        if is_dict:
+            pending = {
+                key: deque(item) if isinstance(item, list) else deque([item])
+                for key, item in value.items()
+            }
+        else:
+            pending = {"value": deque([value])}
+
+        writer = self.writer
+        while True:
+            production = None
+            for key in pending:
+                candidate = state.by_name.get(key)
+                if candidate is not None and (
+                    production is None or candidate.code < production.code
+                ):
+                    production = candidate
+            if production is None:
+                if "value" in pending and state.characters:
+                    production = state.characters
+                elif not pending and state.end:
+                    production = state.end
+                else:
+                    raise EXIEncodingError(
+                        f"Unexpected content {list(pending)} in {decl.qname[1]}"
+                    )
+
+            writer.write_bits(production.code, state.width)
+            event = production.event
+            if event == EE:
+                return
+            if event == CH:
+                item_path = path + ("value",) if is_dict else path
+                item = self._take(pending, "value")
+                self.write_slot(item_path, production.datatype, decl.qname, item)
+            else:
+                key = production.qname[1]
+                if self.slots is None:
+                    item_path = path
+                elif isinstance(value[key], list):
+                    item_path = path + (key, len(value[key]) - len(pending[key]))
+                else:
+                    item_path = path + (key,)
+                item = self._take(pending, key)
+                if event == AT:
+                    self.write_slot(
+                        item_path, production.datatype, production.qname, item
+                    )
+                else:
+                    self.encode_element(production.decl, item, item_path)
+            state = production.next
+
+    @staticmethod
+    def _take(pending: dict, key: str):
+        items = pending[key]
+        item = items.popleft()
+        if not items:
+            del pending[key]
+        return item
+
+    def write_slot(self, path: Path, datatype: Datatype, qname: QName, value):
+        if self.slots is None or datatype.kind not in PATCHABLE_DATATYPES:
+            self.write_value(datatype, qname, value)
+            return
+        offset = self.writer.bit_length
+        self.write_value(datatype, qname, value)
+        self.slots[path] = _Slot(
+            offset, self.writer.bit_length - offset, datatype, qname
+        )
+
+    def write_value(self, datatype: Datatype, qname: QName, value):
+        writer = self.writer
+        kind = datatype.kind
+        if isinstance(value, Enum):
+            value = value.value
+        try:
+            if kind == N_BIT_INTEGER:
+                offset = int(value) - datatype.lower
+                if offset < 0 or offset.bit_length() > datatype.width:
+                    raise ValueError(f"{value} is out of range")
+                writer.write_bits(offset, datatype.width)
+            elif kind == ENUMERATION:
+                writer.write_bits(datatype.values.index(str(value)), datatype.width)
+            elif kind == BOOLEAN:
+                if isinstance(value, str):
+                    value = value in ("true", "1")
+                writer.write_bits(1 if value else 0, 1)
+            elif kind == UNSIGNED_INTEGER:
+                value = int(value)
+                if value < 0:
+                    raise ValueError(f"{value} is negative")
+                writer.write_unsigned(value)
+            elif kind == INTEGER:
+                value = int(value)
+                if value < 0:
+                    writer.write_bits(1, 1)
+                    writer.write_unsigned(-value - 1)
+                else:
+                    writer.write_bits(0, 1)
+                    writer.write_unsigned(value)
+            elif kind == HEX_BINARY:
+                if isinstance(value, str):
+                    value = bytes.fromhex(value)
+                writer.write_bytes(value)
+            elif kind == BASE64_BINARY:
+                if isinstance(value, str):
+                    value = b64decode(value)
+                writer.write_bytes(value)
+            else:
+                self.write_string(qname, str(value))
+        except (TypeError, ValueError) as exc:
+            raise EXIEncodingError(
+                f"Invalid value for {qname[1]} ({datatype.kind}): {exc}"
+            ) from exc
+
+    def write_string(self, qname: QName, value: str):
+        writer = self.writer
+        local_values = self.local_values.get(qname)
+        if local_values is not None and value in local_values:
+            writer.write_unsigned(0)
+            writer.write_bits(local_values[value], (len(local_values) - 1).bit_length())
+            return
+        if value in self.global_values:
+            writer.write_unsigned(1)
+            writer.write_bits(
+                self.global_values[value], (len(self.global_values) - 1).bit_length()
+            )
+            return
+        writer.write_unsigned(len(value) + 2)
+        for character in value:
+            writer.write_unsigned(ord(character))
+        if value:
+            if local_values is None:
+                local_values = self.local_values[qname] = {}
+            local_values[value] = len(local_values)
+            self.global_values[value] = len(self.global_values)
+
+
+def flatten_message(message_dict: dict) -> Dict[Path, object]:
+    """
+    Maps the path of each value in the message dict to the value. A path
+    consists of the element names and, for repeated elements, the index of
+    the element, e.g. ('V2G_Message', 'Body', 'CurrentDemandRes',
+    'EVSEPresentVoltage', 'Value').
+    """
+    leaves: Dict[Path, object] = {}
+
+    def walk(value, path: Path):
+        # Empty elements are leaves as well, they are part of the structure
+        if isinstance(value, dict) and value:
+            for key, item in value.items():
+                if isinstance(item, list) and item:
+                    for index, list_item in enumerate(item):
+                        walk(list_item, path + (key, index))
+                else:
+                    walk(item, path + (key,))
+        else:
+            leaves[path] = value
+
+    walk(message_dict, ())
+    return leaves
+
+
+class EXITemplate:
+    """
+    The EXI encoding of a message, together with the bit positions of its
+    patchable values. Messages of the same structure (e.g. the CurrentDemandRes
+    of a charging session) can then be created by patching the changed values
+    into the encoded stream, instead of encoding the whole message again.
+    """
+
+    __slots__ = ("exi_stream", "leaves", "slots", "_stream", "_bit_size")
+
+    def __init__(
+        self, exi_stream: bytes, leaves: Dict[Path, object], slots: Dict[Path, _Slot]
+    ):
+        self.exi_stream = exi_stream
+        self.leaves = leaves
+        self.slots = slots
+        self._stream = int.from_bytes(exi_stream, "big")
+        self._bit_size = len(exi_stream) * 8
+
+    def patch(self, message_dict: dict) -> Optional[bytes]:
+        """
+        Returns the EXI stream of the given message, which must have the same
+        structure as the template's message, or None if the message can't be
+        created by patching the template. That's the case if the structure
+        differs, a string changed, or the encoded width of a value changed
+        (e.g. an unsigned integer crossing a 7-bit boundary).
+        """
+        leaves = flatten_message(message_dict)
+        if leaves.keys() != self.leaves.keys():
+            return None
+
+        stream = self._stream
+        for path, value in leaves.items():
+            if value == self.leaves[path]:
+                continue
+            slot = self.slots.get(path)
+            if slot is None:
+                return None
+            encoder = _Encoder()
+            encoder.write_value(slot.datatype, slot.qname, value)
+            if encoder.writer.bit_length != slot.width:
+                return None
+            encoded = encoder.writer.getvalue()
+            bits = int.from_bytes(encoded, "big") >> (len(encoded) * 8 - slot.width)
+            shift = self._bit_size - slot.offset - slot.width
+            stream &= ~(((1 << slot.width) - 1) << shift)
+            stream |= bits << shift
+        return stream.to_bytes(len(self.exi_stream), "big")
+
+
+class _Decoder:
+    """Decodes an EXI stream into its dict representation"""
+
+    def __init__(self, stream: bytes, raw_bytes: bool):
+        self.reader = BitReader(stream)
+        # Whether base64Binary values are returned as bytes or Base64 strings
+        self.raw_bytes = raw_bytes
+        self.global_values: List[str] = []
+        self.local_values: Dict[QName, List[str]] = {}
+
+    def decode_root(self, state: State) -> dict:
+        header = self.reader.read_bits(8)
+        if header != EXI_HEADER:
+            raise EXIDecodingError(f"Unsupported EXI header {header:#04x}")
+        production = self._read_production(state, "document")
+        if production.event != SE or production.decl is None:
+            raise EXIDecodingError("Unsupported root element")
+        return {production.qname[1]: self.decode_element(production.decl)}
+
+    def _read_production(self, state: State, context: str):
+        code = self.reader.read_bits(state.width)
+        if code >= len(state.productions):
+            raise EXIDecodingError(
+                f"Unsupported EXI event (event code {code}) in {context}, only "
+                "events declared in the schema are supported"
+            )
+        return state.productions[code]
+
+    def decode_element(self, decl: ElementDecl):
+        grammar = decl.grammar
+        state = grammar.start
+        result: dict = {}
+        while True:
+            production = self._read_production(state, decl.qname[1])
+            event = production.event
+            if event == EE:
+                break
+            if event == SE:
+                child = self.decode_element(production.decl)
+                if production.is_list:
+                    result.setdefault(production.qname[1], []).append(child)
+                else:
+                    result[production.qname[1]] = child
+            elif event == AT:
+                result[production.qname[1]] = self.read_value(
+                    production.datatype, production.qname
+                )
+            elif event == CH:
+                result["value"] = self.read_value(production.datatype, decl.qname)
+            else:
+                raise EXIDecodingError(
+                    f"Unsupported wildcard or untyped content in {decl.qname[1]}"
+                )
+            state = production.next
+
+        if grammar.simple:
+            return result.get("value")
+        return result
+
+    def read_value(self, datatype: Datatype, qname: QName):
+        reader = self.reader
+        kind = datatype.kind
+        if kind == N_BIT_INTEGER:
+            return reader.read_bits(datatype.width) + datatype.lower
+        if kind == ENUMERATION:
+            index = reader.read_bits(datatype.width)
+            if index >= len(datatype.values):
+                raise EXIDecodingError(f"Invalid enumeration index for {qname[1]}")
+            value = datatype.values[index]
+            return int(value) if datatype.base_kind == INTEGER else value
+        if kind == BOOLEAN:
+            return reader.read_bits(1) == 1
+        if kind == UNSIGNED_INTEGER:
+            return reader.read_unsigned()
+        if kind == INTEGER:
+            negative = reader.read_bits(1)
+            magnitude = reader.read_unsigned()
+            return -magnitude - 1 if negative else magnitude
+        if kind == HEX_BINARY:
+            return reader.read_bytes().hex().upper()
+        if kind == BASE64_BINARY:
+            if self.raw_bytes:
+                return reader.read_bytes()
+            return b64encode(reader.read_bytes()).decode()
+        return self.read_string(qname)
+
+    def read_string(self, qname: QName) -> str:
+        reader = self.reader
+        length = reader.read_unsigned()
+        try:
+            if length == 0:
+                local_values = self.local_values[qname]
+                return local_values[
+                    reader.read_bits((len(local_values) - 1).bit_length())
+                ]
+            if length == 1:
+                return self.global_values[
+                    reader.read_bits((len(self.global_values) - 1).bit_length())
+                ]
+        except (KeyError, IndexError) as exc:
+            raise EXIDecodingError(f"Invalid string table hit for {qname[1]}") from exc
+
+        value = "".join(chr(reader.read_unsigned()) for _ in range(length - 2))
+        if value:
+            self.local_values.setdefault(qname, []).append(value)
+            self.global_values.append(value)
+        return value
+
+
+class NativeEXICodec(IStructuredEXICodec):
+    """
+    Schema-informed EXI codec implemented in Python. The grammars for each
+    XSD schema are built on first use and cached for the lifetime of the
+    process, so encoding and decoding run in-process without a JVM.
+
+    Messages are encoded as EXI documents if their root element is the
+    V2G_Message (DIN SPEC 70121 and ISO 15118-2), a SupportedAppProtocolReq/Res
+    or a global message element of ISO 15118-20. Any other element (e.g. the
+    signed AuthorizationReq or SignedInfo elements) is encoded as an EXI
+    fragment, as needed for computing digests and signatures.
+    """
+
+    def encode(self, message: str, namespace: str) -> bytes:
+        return self.encode_dict(json.loads(message), namespace)
+
+    def decode(self, stream: bytes, namespace: str) -> str:
+        return json.dumps(self._decode(stream, namespace, raw_bytes=False))
+
+    def encode_dict(self, message_dict: dict, namespace: str) -> bytes:
+        return self._encode(_Encoder(), message_dict, namespace)
+
+    def compile_template(self, message_dict: dict, namespace: str) -> EXITemplate:
+        """
+        Encodes the message and records the positions of its values, so that
+        messages of the same structure can be created with EXITemplate.patch()
+        """
+        slots: Dict[Path, _Slot] = {}
+        exi_stream = self._encode(_Encoder(slots), message_dict, namespace)
+        return EXITemplate(exi_stream, flatten_message(message_dict), slots)
+
+    def _encode(self, encoder: _Encoder, message_dict: dict, namespace: str) -> bytes:
+        if len(message_dict) != 1:
+            raise EXIEncodingError("Expected exactly one root element to encode")
+        ((name, value),) = message_dict.items()
+        schema = self._schema(namespace, EXIEncodingError)
+        fragment = self._is_fragment(schema, namespace, name)
+        encoder.encode_root(
+            schema.fragment if fragment else schema.document, name, value, fragment
+        )
+        return encoder.writer.getvalue()
+
+    def decode_dict(self, stream: bytes, namespace: str) -> dict:
+        return self._decode(stream, namespace, raw_bytes=True)
+
+    def _decode(self, stream: bytes, namespace: str, raw_bytes: bool) -> dict:
+        schema = self._schema(namespace, EXIDecodingError)
+        # Only XML signature elements are expected to arrive as fragments
+        fragment = namespace == Namespace.XML_DSIG
+        return _Decoder(stream, raw_bytes).decode_root(
+            schema.fragment if fragment else schema.document
+        )
+
+    def get_version(self) -> str:
+        return "NativeEXICodec 1.0 (EXI 1.0, schema-informed, bit-packed)"
+
+    @staticmethod
+    def _schema(namespace: str, error) -> SchemaGrammar:
+        try:
+            return load_schema_grammar(namespace)
+        except Exception as exc:
+            raise error(f"Unable to load EXI grammar for {namespace}: {exc}") from exc
+
+    @staticmethod
+    def _is_fragment(schema: SchemaGrammar, namespace: str, root: str) -> bool:
+        document_roots = DOCUMENT_ROOTS.get(namespace)
+        if document_roots is not None:
+            return root not in document_roots
+        return (schema.namespace, root) not in schema.elements
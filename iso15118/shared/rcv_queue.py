@@ -0,0 +1,132 @@
+"""
+The bounded receiving queue of a communication session handler.
+
+UDP datagrams (i.e. SDP requests) and control notifications (e.g. a new TCP
+client or a session's StopNotification) go into separate lanes. Only the
+datagram lane is bounded, with a drop policy, as a dropped control notification
+would leave an accepted TCP connection without a session or a stopped session
+in the handler's sessions. Control notifications are always taken first, so
+that an SDP flood can neither grow the memory without limit nor delay the TCP
+connects and stop notifications queued behind it.
+"""
+import asyncio
+import logging
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict
+
+from iso15118.shared.notifications import UDPPacketNotification
+from iso15118.shared.settings import (
+    RCV_QUEUE_DATAGRAM_DROP_POLICY,
+    RCV_QUEUE_DATAGRAM_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DropPolicy(str, Enum):
+    """What to do with a datagram that's put into the full datagram lane"""
+
+    # The new item is dropped
+    DROP_NEWEST = "drop_newest"
+    # The oldest queued item is dropped to make room for the new item
+    DROP_OLDEST = "drop_oldest"
+
+
+class _Lane:
+    def __init__(self, name: str, maxsize: int, drop_policy: DropPolicy):
+        self.name = name
+        self.maxsize = maxsize
+        self.drop_policy = DropPolicy(drop_policy)
+        self.items: Deque[Any] = deque()
+        self.queued: int = 0
+        self.dropped: int = 0
+        self.overloaded: bool = False
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self.items)
+
+
+class ReceiveQueue(asyncio.Queue):
+    """
+    An asyncio.Queue with an unbounded control lane and a bounded datagram
+    lane (for UDPPacketNotifications). put_nowait() never raises
+    asyncio.QueueFull: control notifications are always queued, datagrams are
+    subject to the drop policy once their lane is full.
+
+    Args:
+        datagram_maxsize: Maximum number of queued UDP datagrams, 0 for no limit
+        datagram_drop_policy: Drop policy of the datagram lane
+    """
+
+    def __init__(
+        self,
+        datagram_maxsize: int = 0,
+        datagram_drop_policy: DropPolicy = DropPolicy.DROP_OLDEST,
+    ):
+        # Control notifications are never dropped
+        self._control = _Lane("control", 0, DropPolicy.DROP_NEWEST)
+        self._datagrams = _Lane("datagram", datagram_maxsize, datagram_drop_policy)
+        super().__init__()
+
+    def _init(self, maxsize):
+        # The items are kept in the lanes
+        pass
+
+    def qsize(self) -> int:
+        return len(self._control.items) + len(self._datagrams.items)
+
+    def empty(self) -> bool:
+        return not self._control.items and not self._datagrams.items
+
+    def _lane(self, item) -> _Lane:
+        if isinstance(item, UDPPacketNotification):
+            return self._datagrams
+        return self._control
+
+    def _put(self, item):
+        lane = self._lane(item)
+        lane.items.append(item)
+        lane.queued += 1
+
+    def _get(self):
+        if self._control.items:
+            return self._control.items.popleft()
+        return self._datagrams.items.popleft()
+
+    def put_nowait(self, item):
+        lane = self._lane(item)
+        if lane is self._control or not lane.full():
+            lane.overloaded = False
+        else:
+            lane.dropped += 1
+            if not lane.overloaded:
+                lane.overloaded = True
+                logger.warning(
+                    f"Receiving queue's {lane.name} lane is full "
+                    f"({lane.maxsize} items), applying {lane.drop_policy.value}"
+                )
+            if lane.drop_policy == DropPolicy.DROP_NEWEST:
+                logger.debug(f"Dropped {item}")
+                return
+            logger.debug(f"Dropped {lane.items.popleft()}")
+            # The dropped item won't be taken from the queue
+            self.task_done()
+        super().put_nowait(item)
+
+    def metrics(self) -> Dict[str, int]:
+        """The number of queued control notifications and queued and dropped
+        datagrams"""
+        return {
+            "control_queued": self._control.queued,
+            "datagram_queued": self._datagrams.queued,
+            "datagram_dropped": self._datagrams.dropped,
+        }
+
+
+def create_rcv_queue() -> ReceiveQueue:
+    """Returns a ReceiveQueue with the datagram bound and drop policy of the
+    settings"""
+    return ReceiveQueue(
+        RCV_QUEUE_DATAGRAM_SIZE, DropPolicy(RCV_QUEUE_DATAGRAM_DROP_POLICY)
+    )
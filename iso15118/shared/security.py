@@ -1,9 +1,21 @@
 import logging
+import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum, auto
-from ssl import PROTOCOL_TLSv1_2, SSLContext, SSLError, VerifyMode
-from typing import List, Optional, Tuple, Union
+from ssl import (
+    OP_NO_TICKET,
+    PROTOCOL_TLSv1_2,
+    SSLContext,
+    SSLError,
+    SSLObject,
+    SSLSession,
+    VerifyMode,
+)
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
 from cryptography.hazmat.backends.openssl.backend import Backend
@@ -41,6 +53,7 @@ from iso15118.shared.exceptions import (
     PrivateKeyReadError,
 )
 from iso15118.shared.exi_codec import EXI
+from iso15118.shared.messages import BaseModel
 from iso15118.shared.messages.enums import Namespace, Protocol
 from iso15118.shared.messages.iso15118_2.datatypes import (
     CertificateChain as CertificateChainV2,
@@ -66,7 +79,13 @@ from iso15118.shared.messages.xmldsig import (
     Transform,
     Transforms,
 )
-from iso15118.shared.settings import CERTS_GENERAL_PRIVATE_KEY_PASS_PATH, PKI_PATH
+from iso15118.shared.settings import (
+    CERTS_GENERAL_PRIVATE_KEY_PASS_PATH,
+    PKI_PATH,
+    TLS_SESSION_CACHE_SIZE,
+    TLS_SESSION_LIFETIME,
+    TLS_SESSION_TICKETS,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +103,142 @@ def get_random_bytes(nbytes: int) -> bytes:
     return secrets.token_bytes(nbytes)
 
 
+class TLSSessionCache:
+    """
+    The TLS sessions the EVCC established with the last SECCs, keyed by the
+    SECC's address, so that a reconnect (e.g. after a pause or an SDP retry)
+    can resume the session instead of running a full handshake.
+
+    Args:
+        max_size: Maximum number of cached sessions
+        lifetime: Time (in seconds) after which a session isn't offered
+                  anymore, unless the server announced a shorter one
+    """
+
+    def __init__(self, max_size: int, lifetime: float):
+        self.max_size = max_size
+        self.lifetime = lifetime
+        self._sessions: "OrderedDict[str, SSLSession]" = OrderedDict()
+
+    def get(self, server: str) -> Optional[SSLSession]:
+        session = self._sessions.get(server)
+        if session and time.time() - session.time >= min(
+            self.lifetime, session.timeout
+        ):
+            del self._sessions[server]
+            return None
+        return session
+
+    def put(self, server: str, session: Optional[SSLSession]):
+        if session is None or self.max_size <= 0:
+            return
+        self._sessions[server] = session
+        self._sessions.move_to_end(server)
+        while len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+
+
+class ResumingSSLContext(SSLContext):
+    """
+    The EVCC's SSLContext, which offers the cached TLS session of the server
+    it connects to. asyncio doesn't pass a session when it wraps a
+    connection, so the session is looked up by the server hostname here.
+    """
+
+    session_cache: Optional[TLSSessionCache] = None
+
+    def wrap_bio(
+        self,
+        incoming,
+        outgoing,
+        server_side=False,
+        server_hostname=None,
+        session=None,
+    ) -> SSLObject:
+        if session is None and self.session_cache and not server_side:
+            session = self.session_cache.get(server_hostname)
+        return super().wrap_bio(
+            incoming, outgoing, server_side, server_hostname, session
+        )
+
+
+# Number of full and resumed TLS handshakes of the EVCC's connections
+_client_handshakes: Dict[str, int] = {"full": 0, "resumed": 0}
+# The SSL contexts shared by all TLS servers (or clients) of this process, so
+# that a TLS session established over one connection can be resumed with
+# another one, e.g. at another connector. Maps server_side to the modification
+# times of the certificate and key files the SSLContext was created from, and
+# the SSLContext, so that it's created anew once a file is replaced on disk.
+_shared_ssl_contexts: Dict[bool, Tuple[Tuple[Optional[int], ...], SSLContext]] = {}
+
+
+def _ssl_context_mtimes(server_side: bool) -> Tuple[Optional[int], ...]:
+    """The modification times of the files get_ssl_context() loads"""
+    if server_side:
+        paths = (CertPath.CPO_CERT_CHAIN_PEM, KeyPath.SECC_LEAF_PEM)
+    else:
+        paths = (CertPath.V2G_ROOT_PEM,)
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def get_shared_ssl_context(server_side: bool) -> Optional[SSLContext]:
+    """
+    Returns the SSLContext created with get_ssl_context() on first use, which
+    caches the TLS sessions of this process. It's created anew if one of its
+    certificate or key files changed since.
+    """
+    mtimes = _ssl_context_mtimes(server_side)
+    cached = _shared_ssl_contexts.get(server_side)
+    if cached and cached[0] == mtimes:
+        return cached[1]
+
+    ssl_context = get_ssl_context(server_side)
+    if ssl_context is None:
+        return None
+    if cached:
+        logger.info("Certificates changed, created a new SSL context")
+    _shared_ssl_contexts[server_side] = (mtimes, ssl_context)
+    return ssl_context
+
+
+def record_client_handshake(ssl_object: Optional[SSLObject], server: str):
+    """
+    Caches the TLS session of the EVCC's new connection to the given server
+    and counts whether its handshake resumed a cached session.
+    """
+    if ssl_object is None:
+        return
+    if ssl_object.session_reused:
+        _client_handshakes["resumed"] += 1
+        logger.debug(f"Resumed TLS session with {server}")
+    else:
+        _client_handshakes["full"] += 1
+    ssl_context = ssl_object.context
+    if isinstance(ssl_context, ResumingSSLContext) and ssl_context.session_cache:
+        ssl_context.session_cache.put(server, ssl_object.session)
+
+
+def tls_handshake_metrics(server_side: bool) -> Dict[str, int]:
+    """
+    The number of full and resumed TLS handshakes of the shared SSLContext
+    of the TLS servers (server_side=True) or clients of this process.
+    """
+    if not server_side:
+        full, resumed = _client_handshakes["full"], _client_handshakes["resumed"]
+    elif server_side in _shared_ssl_contexts:
+        stats = _shared_ssl_contexts[server_side][1].session_stats()
+        full, resumed = stats["accept_good"] - stats["hits"], stats["hits"]
+    else:
+        full = resumed = 0
+    return {"tls_handshakes_full": full, "tls_handshakes_resumed": resumed}
+
+
 def get_ssl_context(server_side: bool) -> Optional[SSLContext]:
     """
     Creates an SSLContext object for the TCP client or TCP server.
@@ -114,7 +269,10 @@ def get_ssl_context(server_side: bool) -> Optional[SSLContext]:
          as well as read the password.
     """
     # TODO In ISO 15118-20, we use TLS 1.3. Need to adapt that later
-    ssl_context = SSLContext(protocol=PROTOCOL_TLSv1_2)
+    if server_side:
+        ssl_context = SSLContext(protocol=PROTOCOL_TLSv1_2)
+    else:
+        ssl_context = ResumingSSLContext(protocol=PROTOCOL_TLSv1_2)
 
     if server_side:
         try:
@@ -147,6 +305,10 @@ def get_ssl_context(server_side: bool) -> Optional[SSLContext]:
         # The SECC must support both ciphers defined in ISO 15118-2
         # TODO Support ciphers for ISO 15118-20 as well
         ssl_context.set_ciphers("ECDH-ECDSA-AES128-SHA256:" "ECDHE-ECDSA-AES128-SHA256")
+        # Resumed sessions are found in OpenSSL's server-side session cache
+        # by their session ID or, with session tickets, in the ticket itself
+        if not TLS_SESSION_TICKETS:
+            ssl_context.options |= OP_NO_TICKET
     else:
         # Load the V2G Root CA certificate(s) to validate the SECC's leaf and
         # Sub-CA CPO certificates. The cafile string is the path to a file of
@@ -156,6 +318,9 @@ def get_ssl_context(server_side: bool) -> Optional[SSLContext]:
         # The EVCC must support only one cipher suite, so let's choose the
         # more secure one (ECDHE enables perfect forward secrecy)
         ssl_context.set_ciphers("ECDHE-ECDSA-AES128-SHA256")
+        ssl_context.session_cache = TLSSessionCache(
+            TLS_SESSION_CACHE_SIZE, TLS_SESSION_LIFETIME
+        )
 
     # The OpenSSL name for ECDH curve secp256r1 is prime256v1
     ssl_context.set_ecdh_curve("prime256v1")
@@ -195,12 +360,42 @@ def load_priv_key_pass(
         return "12345".encode(encoding="utf-8")
 
 
+T = TypeVar("T")
+
+# The certificates and private keys read from the PKI, shared by all
+# communication sessions (and connectors) of the process. Maps the file path
+# (and key encoding) to the file's modification time and the loaded item, so
+# that a file that is replaced on disk is loaded anew.
+_pki_cache: Dict[Tuple[str, ...], Tuple[int, object]] = {}
+_pki_cache_lock = threading.Lock()
+
+
+def _load_cached(path: str, cache_key: Tuple[str, ...], load: Callable[[], T]) -> T:
+    mtime = os.stat(path).st_mtime_ns
+    with _pki_cache_lock:
+        cached = _pki_cache.get(cache_key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    item = load()
+    with _pki_cache_lock:
+        _pki_cache[cache_key] = (mtime, item)
+    return item
+
+
+def clear_pki_cache():
+    """Drops all cached certificates and private keys"""
+    with _pki_cache_lock:
+        _pki_cache.clear()
+
+
 def load_priv_key(
     key_path: str, key_encoding: KeyEncoding = KeyEncoding.PEM
 ) -> EllipticCurvePrivateKey:
     """
     Loads a PEM or DER encoded private key given the provided key_path and
-    returns the key as an EllipticCurvePrivateKey object.
+    returns the key as an EllipticCurvePrivateKey object. The key is cached
+    until the file changes.
 
     Args:
         key_path: The file path to the DER encoded private key
@@ -213,6 +408,14 @@ def load_priv_key(
     Raises:
         FileNotFoundError, IOError
     """
+    return _load_cached(
+        key_path,
+        (key_path, key_encoding.name),
+        lambda: _read_priv_key(key_path, key_encoding),
+    )
+
+
+def _read_priv_key(key_path: str, key_encoding: KeyEncoding) -> EllipticCurvePrivateKey:
     try:
         with open(key_path, "rb") as key_file:
             try:
@@ -297,6 +500,8 @@ def load_cert(cert_path: str) -> bytes:
     See https://docs.python.org/3/library/ssl.html#ssl-certificates for more
     information on how certificates work.
 
+    The certificate is cached until the file changes.
+
     Args:
         cert_path: The file path to the DER encoded certificate
 
@@ -306,6 +511,10 @@ def load_cert(cert_path: str) -> bytes:
     Raises:
         FileNotFoundError, IOError
     """
+    return _load_cached(cert_path, (cert_path,), lambda: _read_cert(cert_path))
+
+
+def _read_cert(cert_path: str) -> bytes:
     try:
         with open(cert_path, "rb") as cert_file:
             return cert_file.read()
@@ -859,6 +1068,27 @@ def verify_signature(
     return True
 
 
+def encode_elements_to_sign(
+    elements: List[BaseModel], namespace: str
+) -> List[Tuple[str, bytes]]:
+    """
+    EXI encodes the elements to be signed (or whose signature is to be
+    verified) with a single call of the EXI codec and pairs them with their Id
+    field, as expected by create_signature() and verify_signature().
+
+    Args:
+        elements: The message elements, each with an 'id' field
+        namespace: The protocol namespace the elements are encoded with
+
+    Raises:
+        EXIEncodingError
+    """
+    exi_streams = EXI().to_exi_many(elements, namespace)
+    return [
+        (element.id, exi_stream) for element, exi_stream in zip(elements, exi_streams)
+    ]
+
+
 def create_digest(exi_encoded_element) -> bytes:
     digest = Hash(SHA256())
     digest.update(exi_encoded_element)
@@ -1,9 +1,11 @@
 import os
 
 import environs
+from marshmallow.validate import OneOf
 
 SHARED_CWD = os.path.dirname(os.path.abspath(__file__))
 JAR_FILE_PATH = SHARED_CWD + "/EXICodec.jar"
+SCHEMAS_PATH = SHARED_CWD + "/schemas"
 
 WORK_DIR = os.getcwd()
 
@@ -18,6 +20,62 @@ CERTS_GENERAL_PRIVATE_KEY_PASS_PATH = env.str(
 )
 MESSAGE_LOG_JSON = env.bool("MESSAGE_LOG_JSON", default=True)
 MESSAGE_LOG_EXI = env.bool("MESSAGE_LOG_EXI", default=False)
+# Number of worker threads the EXI codec runs on when called via
+# EXI().to_exi_async() and EXI().from_exi_async(), raised to the size of an
+# EXICodecPool. Each worker of a pool owns a codec (e.g. a JVM in case of the
+# ExificientEXICodec), so the pool is kept small by default.
+EXI_CODEC_THREADS = env.int("EXI_CODEC_THREADS", default=2)
+EXI_CODEC_POOL_SIZE = env.int("EXI_CODEC_POOL_SIZE", default=2)
+EXI_CODEC_HEALTH_CHECK_INTERVAL = env.float(
+    "EXI_CODEC_HEALTH_CHECK_INTERVAL", default=30.0
+)
+EXI_CODEC_WORKER_TIMEOUT = env.float("EXI_CODEC_WORKER_TIMEOUT", default=5.0)
+EXI_CACHE_SIZE = env.int("EXI_CACHE_SIZE", default=256)
+EXI_WARM_UP = env.bool("EXI_WARM_UP", default=True)
+EXI_WARM_UP_ROUNDS = env.int("EXI_WARM_UP_ROUNDS", default=3)
+# Maximum payload length of a received V2GTP message. The largest messages are
+# the certificate installation responses, which may carry -20 cross certificates
+V2GTP_MAX_PAYLOAD_LENGTH = env.int("V2GTP_MAX_PAYLOAD_LENGTH", default=65536)
+# Grace periods (in seconds) after a communication session stopped: the data
+# link is paused or terminated after the first one, the TCP connection is
+# closed after both. SESSION_GRACE_PERIODS overrides them per protocol, given
+# as 'PROTOCOL=data_link:tcp' entries (e.g. 'ISO_15118_20_DC=1:1')
+SESSION_DATA_LINK_GRACE_PERIOD = env.float(
+    "SESSION_DATA_LINK_GRACE_PERIOD", default=2.0
+)
+SESSION_TCP_GRACE_PERIOD = env.float("SESSION_TCP_GRACE_PERIOD", default=3.0)
+SESSION_GRACE_PERIODS = env.dict("SESSION_GRACE_PERIODS", default={})
+
+# Bound of the datagram lane of the SECC's receiving queues (0 for no limit)
+# and what to drop when it's full, either 'drop_newest' or 'drop_oldest' (see
+# rcv_queue.py). Control notifications are never dropped.
+RCV_QUEUE_DATAGRAM_SIZE = env.int("RCV_QUEUE_DATAGRAM_SIZE", default=64)
+RCV_QUEUE_DATAGRAM_DROP_POLICY = env.str(
+    "RCV_QUEUE_DATAGRAM_DROP_POLICY",
+    default="drop_oldest",
+    validate=OneOf(["drop_newest", "drop_oldest"]),
+)
+
+# Minimum time (in seconds) between two answered SDP requests of the same peer
+SDP_MIN_REQUEST_INTERVAL = env.float("SDP_MIN_REQUEST_INTERVAL", default=0.1)
+
+# TLS session resumption: whether the TLS server issues session tickets
+# (otherwise sessions are resumed by session ID), and the number and lifetime
+# (in seconds) of the sessions the TLS client caches to resume them
+TLS_SESSION_TICKETS = env.bool("TLS_SESSION_TICKETS", default=True)
+TLS_SESSION_CACHE_SIZE = env.int("TLS_SESSION_CACHE_SIZE", default=16)
+TLS_SESSION_LIFETIME = env.float("TLS_SESSION_LIFETIME", default=300.0)
+
+# Deadline (in seconds) of a request to the EVSE controller, and the number of
+# timed out requests in a row after which the connection is reset
+CONTROLLER_REQUEST_TIMEOUT = env.float("CONTROLLER_REQUEST_TIMEOUT", default=5.0)
+CONTROLLER_RECONNECT_AFTER_TIMEOUTS = env.int(
+    "CONTROLLER_RECONNECT_AFTER_TIMEOUTS", default=3
+)
+
+# Maximum age (in seconds) of a cached result of the EVSE controller, which
+# publishes the results of cacheable operations (0 disables the cache)
+CONTROLLER_STATE_MAX_AGE = env.float("CONTROLLER_STATE_MAX_AGE", default=10.0)
 
 V20_EVSE_SERVICES_CONFIG = env.str(
     "V20_SERVICE_CONFIG",
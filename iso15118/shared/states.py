@@ -9,7 +9,7 @@ from iso15118.shared.exceptions import (
     InvalidPayloadTypeError,
     InvalidProtocolError,
 )
-from iso15118.shared.exi_codec import EXI
+from iso15118.shared.exi_codec import EXI, TEMPLATE_MESSAGES
 from iso15118.shared.messages.app_protocol import (
     SupportedAppProtocolReq,
     SupportedAppProtocolRes,
@@ -116,6 +116,12 @@ class State(ABC):
         # The timeout corresponding to waiting for the subsequent message as a
         # result of sending this next message
         self.next_msg_timeout: Union[float, int] = 0
+        # The XSD namespace and V2GTP payload type of the next message, needed
+        # for the EXI encoding in encode_next_message()
+        self.next_msg_namespace: Optional[Namespace] = None
+        self.next_msg_payload_type: Union[
+            DINPayloadTypes, ISOV2PayloadTypes, ISOV20PayloadTypes, None
+        ] = None
 
         logger.info(f"Entered state {str(self)}")
 
@@ -184,9 +190,10 @@ class State(ABC):
         2. Create the V2GMessage from the provided 'next_msg' parameter in case
            it is an ISO 15118-2 V2GMessage (where the next_msg is actually the
            body element of the V2GMessage).
-        3. EXI-encode the new message
-        4. Create the next V2GTP message given the EXI-encoded message and the
-           payload type.
+
+        The EXI encoding and the creation of the V2GTP message are done in
+        encode_next_message(), which the state machine awaits once the state
+        has processed the incoming message.
 
         Args:
             next_state: The next state to transition to, or None, if we want to
@@ -219,9 +226,6 @@ class State(ABC):
                        CertificateInstallationRes).
                        In ISO 15118-20, the optional signature is already part
                        of the next_msg object.
-
-        Raises:
-            EXIEncodingError
         """
         # Step 1
         self.next_state = next_state
@@ -294,34 +298,50 @@ class State(ABC):
             to_be_exi_encoded = next_msg
 
         self.next_msg = to_be_exi_encoded
+        self.next_msg_namespace = namespace
+        self.next_msg_payload_type = next_msg_payload_type
 
+    async def encode_next_message(self):
+        """
+        EXI-encodes the next message set by create_next_message() without
+        blocking the event loop and creates the next V2GTP message given the
+        EXI-encoded message and the payload type.
+
+        Raises:
+            EXIEncodingError
+        """
         # If either next_msg or next_msg_payload_type are None, the state's
         # attribute next_v2gtp_msg will not be set. This causes the state
         # machine to raise a FaultyStateImplementationError if next state is
         # not set to Terminate, so no need to raise anything here.
-        if next_msg and next_msg_payload_type:
-            # Step 3
-            exi_payload: bytes = bytes(0)
-            try:
-                exi_payload = EXI().to_exi(to_be_exi_encoded, namespace)
-            except EXIEncodingError as exc:
-                logger.error(f"{exc}")
-                self.next_state = Terminate
-                raise
+        if not self.next_msg or not self.next_msg_payload_type:
+            return
 
-            # Step 4
-            try:
-                # Each V2GMessage (and SupportedAppProtocolReq and -Res)
-                # is first EXI encoded and then placed as a payload in a
-                # V2GTPMessage (V2G Transfer Protocol message)
-                self.next_v2gtp_msg = V2GTPMessage(
-                    self.comm_session.protocol, next_msg_payload_type, exi_payload
-                )
-            except (InvalidProtocolError, InvalidPayloadTypeError) as exc:
-                logger.exception(
-                    f"{exc.__class__.__name__} occurred while "
-                    f"creating a V2GTPMessage. {exc}"
-                )
+        templates = None
+        if str(self.next_msg) in TEMPLATE_MESSAGES:
+            templates = self.comm_session.exi_templates
+
+        try:
+            exi_payload = await EXI().to_exi_async(
+                self.next_msg, self.next_msg_namespace, templates
+            )
+        except EXIEncodingError as exc:
+            logger.error(f"{exc}")
+            self.next_state = Terminate
+            raise
+
+        try:
+            # Each V2GMessage (and SupportedAppProtocolReq and -Res)
+            # is first EXI encoded and then placed as a payload in a
+            # V2GTPMessage (V2G Transfer Protocol message)
+            self.next_v2gtp_msg = V2GTPMessage(
+                self.comm_session.protocol, self.next_msg_payload_type, exi_payload
+            )
+        except (InvalidProtocolError, InvalidPayloadTypeError) as exc:
+            logger.exception(
+                f"{exc.__class__.__name__} occurred while "
+                f"creating a V2GTPMessage. {exc}"
+            )
 
     def __repr__(self):
         """
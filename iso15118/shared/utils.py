@@ -49,3 +49,36 @@ async def wait_for_tasks(
             task.result()
         except Exception as e:
             logger.exception(e)
+
+
+# The event loop implementations that can be selected with the EVENT_LOOP setting
+EVENT_LOOPS = ("asyncio", "uvloop")
+
+
+def install_event_loop_policy(event_loop: str) -> str:
+    """
+    Installs the event loop policy of the given event loop implementation,
+    which is used by the following asyncio.run(). If uvloop is selected but
+    not installed, asyncio's default event loop is used instead.
+
+    Returns the name of the event loop implementation that is used.
+    """
+    if event_loop not in EVENT_LOOPS:
+        raise ValueError(
+            f"Unknown event loop '{event_loop}'. Allowed: {', '.join(EVENT_LOOPS)}"
+        )
+
+    if event_loop == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            logger.warning(
+                "uvloop is not installed (pip install uvloop), falling back "
+                "to the asyncio event loop"
+            )
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return "uvloop"
+
+    asyncio.set_event_loop_policy(None)
+    return "asyncio"
@@ -6,12 +6,31 @@ from iso15118.evcc.comm_session_handler import EVCCCommunicationSession
 from iso15118.evcc.controller.simulator import SimEVController
 from iso15118.secc.comm_session_handler import SECCCommunicationSession
 from iso15118.secc.controller.simulator import SimEVSEController
+from iso15118.shared.exi_codec import EXI, MESSAGE_REGISTRY, EXIResultCache
 from iso15118.shared.messages.enums import Protocol
 from iso15118.shared.messages.iso15118_2.datatypes import EnergyTransferModeEnum
 from iso15118.shared.notifications import StopNotification
 from tests.secc.states.test_messages import get_sa_schedule_list
 
 
+@pytest.fixture(autouse=True)
+def exi():
+    """
+    The EXI singleton with an empty cache. Its codec, executor, cache and the
+    message registry are restored after the test, which may change them.
+    """
+    exi = EXI()
+    saved = (exi.exi_codec, exi.executor, exi.executor_size, exi.cache)
+    registry = dict(MESSAGE_REGISTRY)
+    exi.cache = EXIResultCache(exi.cache.max_size)
+    yield exi
+    if exi.executor is not None and exi.executor is not saved[1]:
+        exi.executor.shutdown(wait=False)
+    exi.exi_codec, exi.executor, exi.executor_size, exi.cache = saved
+    MESSAGE_REGISTRY.clear()
+    MESSAGE_REGISTRY.update(registry)
+
+
 @pytest.fixture
 def comm_evcc_session_mock():
     comm_session_mock = Mock(spec=EVCCCommunicationSession)
@@ -0,0 +1,95 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from iso15118.secc.comm_session_handler import SECCCommunicationSession
+from iso15118.secc.controller.evse_state_cache import EVSEStateCache
+from iso15118.secc.controller.simulator import SimEVSEController
+from iso15118.secc.states.iso15118_2_states import CableCheck, PreCharge
+from iso15118.shared.messages.datatypes import (
+    DCEVSEStatus,
+    DCEVSEStatusCode,
+    EVSENotification,
+)
+from iso15118.shared.messages.enums import (
+    Contactor,
+    EVSEProcessing,
+    IsolationLevel,
+    Protocol,
+)
+from iso15118.shared.notifications import StopNotification
+from tests.secc.states.test_messages import get_v2g_message_cable_check_req
+
+
+def dc_evse_status(isolation_status: IsolationLevel) -> DCEVSEStatus:
+    return DCEVSEStatus(
+        evse_notification=EVSENotification.NONE,
+        notification_max_delay=0,
+        evse_isolation_status=isolation_status,
+        evse_status_code=DCEVSEStatusCode.EVSE_READY,
+    )
+
+
+@pytest.fixture
+def evse_controller():
+    controller = SimEVSEController("tcp://127.0.0.1:5599")
+    # A cache as warm as it gets, shared by all sessions of the controller
+    controller.state_cache = EVSEStateCache(max_age=3600)
+    controller.isolation_statuses = []
+
+    async def request(operation: str, params: dict = None):
+        if operation == "close_contactor":
+            return Contactor.CLOSED
+        if operation == "get_dc_evse_status":
+            return dc_evse_status(controller.isolation_statuses.pop(0))
+        return None
+
+    controller.zmq.request = AsyncMock(side_effect=request)
+    yield controller
+    controller.zmq.close()
+
+
+def new_comm_session(evse_controller) -> SECCCommunicationSession:
+    comm_session = Mock(spec=SECCCommunicationSession)
+    comm_session.session_id = "F9F9EE8505F55838"
+    comm_session.stop_reason = StopNotification(False, "pytest")
+    comm_session.protocol = Protocol.ISO_15118_2
+    comm_session.evse_controller = evse_controller
+    return comm_session
+
+
+def dc_evse_status_requests(evse_controller) -> int:
+    return sum(
+        call.args[0] == "get_dc_evse_status"
+        for call in evse_controller.zmq.request.await_args_list
+    )
+
+
+@patch("iso15118.shared.states.EXI.to_exi", new=Mock(return_value=b"\x01"))
+@pytest.mark.asyncio
+async def test_cable_check_always_requests_the_isolation_status(evse_controller):
+    evse_controller.isolation_statuses = [
+        IsolationLevel.INVALID,
+        IsolationLevel.VALID,
+        # The isolation status of the next session's cable check
+        IsolationLevel.INVALID,
+    ]
+
+    cable_check = CableCheck(new_comm_session(evse_controller))
+    await cable_check.process_message(message=get_v2g_message_cable_check_req())
+    assert cable_check.next_msg.body.cable_check_res.evse_processing == (
+        EVSEProcessing.ONGOING
+    )
+    await cable_check.process_message(message=get_v2g_message_cable_check_req())
+    assert cable_check.next_msg.body.cable_check_res.evse_processing == (
+        EVSEProcessing.FINISHED
+    )
+    assert cable_check.next_state is PreCharge
+
+    # The VALID status of the previous session isn't reused
+    cable_check = CableCheck(new_comm_session(evse_controller))
+    await cable_check.process_message(message=get_v2g_message_cable_check_req())
+    assert cable_check.next_msg.body.cable_check_res.evse_processing == (
+        EVSEProcessing.ONGOING
+    )
+    assert dc_evse_status_requests(evse_controller) == 3
@@ -3,6 +3,7 @@ from typing import List
 from iso15118.shared.messages.enums import UnitSymbol
 from iso15118.shared.messages.iso15118_2.body import (
     Body,
+    CableCheckReq,
     PowerDeliveryReq,
     SessionStopReq,
     WeldingDetectionReq,
@@ -102,3 +103,12 @@ def get_dummy_v2g_message_session_stop_req():
         header=MessageHeader(session_id="F9F9EE8505F55838"),
         body=Body(session_stop_req=session_stop_req),
     )
+
+
+def get_v2g_message_cable_check_req():
+    cable_check_req = CableCheckReq(dc_ev_status=get_dummy_dc_ev_status())
+
+    return V2GMessage(
+        header=MessageHeader(session_id="F9F9EE8505F55838"),
+        body=Body(cable_check_req=cable_check_req),
+    )
@@ -0,0 +1,106 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from iso15118.secc.controller.interface import (
+    DCChargeLoopSnapshot,
+    EVSEControllerInterface,
+)
+from iso15118.secc.controller.simulator import SimEVSEController
+from iso15118.shared.messages.datatypes import (
+    DCEVSEStatus,
+    DCEVSEStatusCode,
+    EVSENotification,
+    PVEVSEMaxCurrentLimit,
+    PVEVSEMaxPowerLimit,
+    PVEVSEMaxVoltageLimit,
+    PVEVSEPresentCurrent,
+    PVEVSEPresentVoltage,
+    PVEVTargetCurrent,
+    PVEVTargetVoltage,
+)
+from iso15118.shared.messages.enums import IsolationLevel, Protocol
+
+TARGET_VOLTAGE = PVEVTargetVoltage(multiplier=0, value=400, unit="V")
+TARGET_CURRENT = PVEVTargetCurrent(multiplier=0, value=100, unit="A")
+
+SNAPSHOT_VALUES = {
+    "dc_evse_status": DCEVSEStatus(
+        evse_notification=EVSENotification.NONE,
+        notification_max_delay=0,
+        evse_isolation_status=IsolationLevel.VALID,
+        evse_status_code=DCEVSEStatusCode.EVSE_READY,
+    ),
+    "evse_present_voltage": PVEVSEPresentVoltage(multiplier=0, value=400, unit="V"),
+    "evse_present_current": PVEVSEPresentCurrent(multiplier=0, value=100, unit="A"),
+    "evse_current_limit_achieved": False,
+    "evse_voltage_limit_achieved": True,
+    "evse_power_limit_achieved": False,
+    "evse_max_voltage_limit": PVEVSEMaxVoltageLimit(multiplier=0, value=600, unit="V"),
+    "evse_max_current_limit": PVEVSEMaxCurrentLimit(multiplier=0, value=300, unit="A"),
+    "evse_max_power_limit": PVEVSEMaxPowerLimit(multiplier=1, value=1000, unit="W"),
+    "evse_id": "UK123E1234",
+}
+
+
+@pytest.fixture
+def sim_evse_controller():
+    controller = SimEVSEController("tcp://127.0.0.1:5599")
+    controller.zmq.request = AsyncMock(return_value=dict(SNAPSHOT_VALUES))
+    yield controller
+    controller.zmq.close()
+
+
+@pytest.mark.asyncio
+async def test_sim_controller_gets_snapshot_with_one_request(sim_evse_controller):
+    sim_evse_controller.ev_data_context.soc = 35
+
+    snapshot = await sim_evse_controller.get_dc_charge_loop_snapshot(
+        Protocol.ISO_15118_2, TARGET_VOLTAGE, TARGET_CURRENT
+    )
+
+    assert snapshot == DCChargeLoopSnapshot(**SNAPSHOT_VALUES)
+    sim_evse_controller.zmq.request.assert_awaited_once_with(
+        "get_dc_charge_loop_snapshot",
+        {
+            "protocol": "ISO",
+            "voltage": TARGET_VOLTAGE,
+            "current": TARGET_CURRENT,
+            "soc": 35,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_default_snapshot_calls_single_getters(sim_evse_controller):
+    # The interface's default implementation, as used by controllers that
+    # don't override get_dc_charge_loop_snapshot()
+    getters = {
+        "get_dc_evse_status": "dc_evse_status",
+        "get_evse_present_voltage": "evse_present_voltage",
+        "get_evse_present_current": "evse_present_current",
+        "is_evse_current_limit_achieved": "evse_current_limit_achieved",
+        "is_evse_voltage_limit_achieved": "evse_voltage_limit_achieved",
+        "is_evse_power_limit_achieved": "evse_power_limit_achieved",
+        "get_evse_max_voltage_limit": "evse_max_voltage_limit",
+        "get_evse_max_current_limit": "evse_max_current_limit",
+        "get_evse_max_power_limit": "evse_max_power_limit",
+        "get_evse_id": "evse_id",
+    }
+    for getter, field_name in getters.items():
+        setattr(
+            sim_evse_controller,
+            getter,
+            AsyncMock(return_value=SNAPSHOT_VALUES[field_name]),
+        )
+    sim_evse_controller.send_charging_command = AsyncMock()
+
+    snapshot = await EVSEControllerInterface.get_dc_charge_loop_snapshot(
+        sim_evse_controller, Protocol.DIN_SPEC_70121, TARGET_VOLTAGE, TARGET_CURRENT
+    )
+
+    assert snapshot == DCChargeLoopSnapshot(**SNAPSHOT_VALUES)
+    sim_evse_controller.send_charging_command.assert_awaited_once_with(
+        TARGET_VOLTAGE, TARGET_CURRENT
+    )
+    sim_evse_controller.get_evse_id.assert_awaited_once_with(Protocol.DIN_SPEC_70121)
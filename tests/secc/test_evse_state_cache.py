@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+import zmq
+import zmq.asyncio
+
+from iso15118.secc.controller.evse_state_cache import EVSEStateCache
+from iso15118.secc.controller.simulator import SimEVSEController
+from iso15118.shared.messages.controller_wire import encode_update
+from iso15118.shared.messages.datatypes import (
+    PVEVSEMaxVoltageLimit,
+    PVEVSEPresentVoltage,
+)
+
+MAX_VOLTAGE = PVEVSEMaxVoltageLimit(multiplier=0, value=600, unit="V")
+
+
+@pytest.fixture
+def publisher():
+    socket = zmq.asyncio.Context.instance().socket(zmq.PUB)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.bind("tcp://127.0.0.1:*")
+    yield socket
+    socket.close()
+
+
+@pytest.mark.asyncio
+async def test_published_results_are_served_from_the_cache(publisher):
+    cache = EVSEStateCache(publisher.getsockopt_string(zmq.LAST_ENDPOINT))
+    await cache.start()
+
+    # A subscriber receives what's published once it's connected
+    update = encode_update("get_evse_id", {"protocol": "ISO"}, "UK123E1234")
+    while cache.get("get_evse_id", {"protocol": "ISO"}) is None:
+        await publisher.send(update)
+        await asyncio.sleep(0.01)
+
+    assert cache.get("get_evse_id", {"protocol": "ISO"}) == "UK123E1234"
+    assert cache.get("get_evse_id", {"protocol": "DIN"}) is None
+    assert cache.metrics()["controller_cache_updates"] >= 1
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_results_older_than_max_age_are_not_served():
+    cache = EVSEStateCache(max_age=0.05)
+    cache.put("get_evse_max_voltage_limit", None, MAX_VOLTAGE)
+    assert cache.get("get_evse_max_voltage_limit") == MAX_VOLTAGE
+
+    await asyncio.sleep(0.1)
+
+    assert cache.get("get_evse_max_voltage_limit") is None
+    assert cache.metrics() == {
+        "controller_cache_hits": 1,
+        "controller_cache_misses": 1,
+        "controller_cache_updates": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_sim_controller_requests_only_fresh_values():
+    controller = SimEVSEController("tcp://127.0.0.1:5599")
+    controller.state_cache = EVSEStateCache(max_age=10)
+    controller.zmq.request = AsyncMock(return_value=MAX_VOLTAGE)
+
+    for _ in range(3):
+        assert await controller.get_evse_max_voltage_limit() == MAX_VOLTAGE
+    controller.zmq.request.assert_awaited_once_with("get_evse_max_voltage_limit", None)
+
+    present_voltage = PVEVSEPresentVoltage(multiplier=0, value=400, unit="V")
+    controller.zmq.request = AsyncMock(return_value=present_voltage)
+    for _ in range(3):
+        assert await controller.get_evse_present_voltage() == present_voltage
+    assert controller.zmq.request.await_count == 3
+    controller.zmq.close()
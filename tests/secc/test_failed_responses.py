@@ -0,0 +1,37 @@
+from iso15118.secc.failed_responses import (
+    copy_failed_response,
+    failed_responses_iso_v2,
+    failed_responses_iso_v20,
+)
+from iso15118.shared.messages.iso15118_2.body import SessionSetupReq
+from iso15118.shared.messages.iso15118_2.datatypes import ResponseCode
+from iso15118.shared.messages.iso15118_20.common_messages import (
+    SessionSetupReq as SessionSetupReqV20,
+)
+from iso15118.shared.messages.iso15118_20.common_types import (
+    ResponseCode as ResponseCodeV20,
+)
+
+
+def test_failed_responses_are_shared():
+    assert failed_responses_iso_v2() is failed_responses_iso_v2()
+
+
+def test_copy_leaves_shared_failed_response_unchanged():
+    shared = failed_responses_iso_v2()[SessionSetupReq]
+
+    error_res = copy_failed_response(shared, ResponseCode.FAILED_SEQUENCE_ERROR)
+
+    assert error_res.response_code == ResponseCode.FAILED_SEQUENCE_ERROR
+    assert shared.response_code == ResponseCode.FAILED
+
+
+def test_copy_sets_session_id_of_v20_header():
+    shared, _, _ = failed_responses_iso_v20()[SessionSetupReqV20]
+
+    error_res = copy_failed_response(
+        shared, ResponseCodeV20.FAILED_UNKNOWN_SESSION, "ABCDEF0102030405"
+    )
+
+    assert error_res.header.session_id == "ABCDEF0102030405"
+    assert shared.header.session_id == "00"
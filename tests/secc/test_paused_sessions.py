@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+import os
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from iso15118.secc.comm_session_handler import (
+    CommunicationSessionHandler,
+    SECCCommunicationSession,
+)
+from iso15118.secc.paused_sessions import PausedSession, PausedSessionStore
+from iso15118.secc.secc_settings import Config
+from iso15118.secc.states.iso15118_2_states import PaymentDetails
+from iso15118.shared.messages.enums import AuthEnum, Protocol
+from iso15118.shared.messages.iso15118_2.body import PaymentDetailsReq, ResponseCode
+from iso15118.shared.messages.iso15118_2.datatypes import (
+    CertificateChain,
+    SubCertificates,
+)
+from iso15118.shared.native_exi_codec import NativeEXICodec
+
+
+def paused_session(session_id: str, paused_at: float = None) -> PausedSession:
+    return PausedSession(
+        session_id=session_id,
+        protocol=Protocol.ISO_15118_2,
+        evcc_id="0A0B0C0D0E0F",
+        selected_auth_option=AuthEnum.EIM_V2,
+        selected_services=[],
+        selected_energy_mode=None,
+        selected_charging_type_is_ac=True,
+        selected_schedule=1,
+        offered_schedules=[],
+        contract_cert_chain=None,
+        authorized=True,
+        paused_at=paused_at or time.time(),
+    )
+
+
+def test_drops_expired_and_oldest_sessions():
+    store = PausedSessionStore(ttl=60, max_size=2)
+    store.put(paused_session("01", paused_at=time.time() - 61))
+    store.put(paused_session("02"))
+    store.put(paused_session("03"))
+    store.put(paused_session("04"))
+
+    assert store.pop("01") is None
+    assert store.pop("02") is None
+    assert store.pop("03").session_id == "03"
+    assert len(store) == 1
+
+
+def test_persists_paused_sessions(tmp_path):
+    path = str(tmp_path / "paused_sessions")
+    PausedSessionStore(ttl=60, max_size=2, path=path).put(paused_session("01"))
+
+    restarted_store = PausedSessionStore(ttl=60, max_size=2, path=path)
+
+    assert restarted_store.pop("01").authorized
+    assert len(PausedSessionStore(ttl=60, max_size=2, path=path)) == 0
+
+
+@pytest.mark.parametrize(
+    "evcc_id, resumed", [("0A0B0C0D0E0F", True), ("FFFFFFFFFFFF", False)]
+)
+def test_resume_paused_session(evcc_id, resumed):
+    store = PausedSessionStore(ttl=60, max_size=2)
+    store.put(paused_session("01"))
+    comm_session = Mock(paused_sessions=store, protocol=Protocol.ISO_15118_2)
+
+    assert (
+        SECCCommunicationSession.resume_paused_session(comm_session, "01", evcc_id)
+        is resumed
+    )
+    if resumed:
+        assert comm_session.selected_schedule == 1
+        assert comm_session.resumed_session.authorized
+
+
+def test_session_handler_uses_given_store():
+    store = PausedSessionStore(ttl=60, max_size=2)
+    config = Config(paused_sessions_path="/nonexistent/paused_sessions")
+
+    handler = CommunicationSessionHandler(config, NativeEXICodec(), Mock(), store)
+
+    assert handler.paused_sessions is store
+
+
+@pytest.mark.asyncio
+async def test_saves_paused_sessions_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "paused_sessions")
+    store = PausedSessionStore(ttl=60, max_size=2, path=path, save_delay=0.01)
+    store.put(paused_session("01"))
+    store.put(paused_session("02"))
+
+    # The changes are written at once, after the save delay
+    assert not os.path.exists(path)
+    await asyncio.sleep(0.05)
+    await store._write_future
+
+    restarted_store = PausedSessionStore(ttl=60, max_size=2, path=path)
+    assert len(restarted_store) == 2
+
+
+def get_der_cert(not_valid_after: datetime.datetime) -> bytes:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "DE1ABCD2EF357A")])
+    return (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(not_valid_after - datetime.timedelta(days=2))
+        .not_valid_after(not_valid_after)
+        .sign(key, hashes.SHA256())
+        .public_bytes(serialization.Encoding.DER)
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "valid_for, response_code",
+    [(1, None), (-1, ResponseCode.FAILED_CERTIFICATE_EXPIRED)],
+)
+async def test_resumed_session_checks_validity_of_unchanged_contract_cert(
+    valid_for, response_code
+):
+    cert_chain = CertificateChain(
+        certificate=get_der_cert(
+            datetime.datetime.now() + datetime.timedelta(days=valid_for)
+        ),
+        sub_certificates=SubCertificates(certificates=[]),
+    )
+    comm_session = Mock(
+        resumed_session=Mock(contract_cert_chain=cert_chain.copy(deep=True))
+    )
+    message = Mock(
+        body=Mock(
+            payment_details_req=PaymentDetailsReq(
+                emaid="DE1ABCD2EF357A", cert_chain=cert_chain
+            )
+        )
+    )
+    payment_details = PaymentDetails(comm_session)
+
+    with patch.object(
+        payment_details, "check_msg_v2", return_value=message
+    ), patch.object(payment_details, "stop_state_machine") as stop, patch.object(
+        payment_details, "create_next_message"
+    ) as create_next_message, patch(
+        "iso15118.secc.states.iso15118_2_states.verify_certs"
+    ) as verify_certs:
+        await payment_details.process_message(message)
+
+    verify_certs.assert_not_called()
+    if response_code:
+        assert stop.call_args.args[2] == response_code
+    else:
+        stop.assert_not_called()
+        create_next_message.assert_called_once()
@@ -0,0 +1,71 @@
+from unittest.mock import Mock
+
+import pytest
+
+from iso15118.secc.transport.sdp_responder import SDPResponder
+from iso15118.shared.messages.enums import ISOV2PayloadTypes, Protocol
+from iso15118.shared.messages.sdp import SDPRequest, SDPResponse, Security, Transport
+from iso15118.shared.messages.v2gtp import V2GTPMessage
+
+PEER = ("fe80::2", 50000)
+
+
+def sdp_request(security: Security) -> bytes:
+    return V2GTPMessage(
+        Protocol.ISO_15118_2,
+        ISOV2PayloadTypes.SDP_REQUEST,
+        SDPRequest(security, Transport.TCP).to_payload(),
+    ).to_bytes()
+
+
+@pytest.fixture
+def tcp_server():
+    return Mock(ipv6_address_host="fe80::1", port_tls=50001, port_no_tls=50002)
+
+
+@pytest.mark.parametrize(
+    "enforce_tls, security, port",
+    [
+        (False, Security.NO_TLS, 50002),
+        (False, Security.TLS, 50001),
+        (True, Security.NO_TLS, 50001),
+    ],
+)
+def test_answers_sdp_request(tcp_server, enforce_tls, security, port):
+    sendto = Mock()
+
+    assert SDPResponder(tcp_server, enforce_tls).handle(
+        sdp_request(security), PEER, sendto
+    )
+
+    response, addr = sendto.call_args[0]
+    sdp_response = SDPResponse.from_payload(
+        V2GTPMessage.from_bytes(Protocol.ISO_15118_2, response).payload
+    )
+    assert (addr, sdp_response.port) == (PEER, port)
+
+
+def test_rebuilds_responses_when_port_changes(tcp_server):
+    sendto = Mock()
+    responder = SDPResponder(tcp_server, False, min_request_interval=0)
+    responder.handle(sdp_request(Security.NO_TLS), PEER, sendto)
+    tcp_server.port_no_tls = 50003
+    responder.handle(sdp_request(Security.NO_TLS), PEER, sendto)
+
+    first, second = (call[0][0] for call in sendto.call_args_list)
+    assert first != second
+
+
+def test_rate_limits_per_peer(tcp_server):
+    sendto = Mock()
+    responder = SDPResponder(tcp_server, False, min_request_interval=10)
+
+    for _ in range(3):
+        responder.handle(sdp_request(Security.NO_TLS), PEER, sendto)
+    responder.handle(sdp_request(Security.NO_TLS), ("fe80::3", 50000), sendto)
+
+    assert responder.metrics() == {"sdp_answered": 2, "sdp_rate_limited": 2}
+
+
+def test_leaves_other_datagrams_to_session_handler(tcp_server):
+    assert not SDPResponder(tcp_server, False).handle(b"\x01\xfe", PEER, Mock())
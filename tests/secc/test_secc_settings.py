@@ -0,0 +1,22 @@
+import pytest
+
+from iso15118.secc.secc_settings import Config
+
+
+def test_connector_configs():
+    config = Config(iface="eth0", zmq_endpoint="ipc:///tmp/evse_{connector_id}")
+    config.load_connectors(["eth1=1", " eth2 = 2 ", ""])
+
+    connector_configs = config.connector_configs()
+
+    assert [
+        (connector.iface, connector.connector_id, connector.zmq_endpoint)
+        for connector in connector_configs
+    ] == [("eth1", "1", "ipc:///tmp/evse_1"), ("eth2", "2", "ipc:///tmp/evse_2")]
+    assert all(not connector.connectors for connector in connector_configs)
+
+
+@pytest.mark.parametrize("connectors", [["eth1"], ["eth1=1", "eth2=1"]])
+def test_invalid_connectors(connectors):
+    with pytest.raises(ValueError):
+        Config().load_connectors(connectors)
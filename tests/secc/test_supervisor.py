@@ -0,0 +1,62 @@
+from iso15118.secc import MultiConnectorSECCHandler
+from iso15118.secc import supervisor as supervisor_module
+from iso15118.secc.secc_settings import Config
+from iso15118.secc.supervisor import SECCSupervisor, shard_connectors
+
+CONNECTORS = [("eth1", "1"), ("eth2", "2"), ("eth3", "3")]
+
+
+def exit_immediately(index, cpu, connectors, metrics_queue, metrics_interval):
+    metrics_queue.put((index, {"connectors": len(connectors), "sessions": 1}))
+
+
+def test_shard_connectors():
+    assert shard_connectors(CONNECTORS, 2) == [
+        [("eth1", "1"), ("eth3", "3")],
+        [("eth2", "2")],
+    ]
+    # No worker without a connector
+    assert len(shard_connectors(CONNECTORS, 8)) == 3
+
+
+def test_supervisor_restarts_exited_workers_and_aggregates_metrics(monkeypatch):
+    # Exits aren't treated as crashes on start, which would delay the restart
+    monkeypatch.setattr(supervisor_module, "MIN_WORKER_UPTIME", 0)
+    supervisor = SECCSupervisor(
+        Config(connectors=CONNECTORS, workers=2), worker_target=exit_immediately
+    )
+    try:
+        for worker in supervisor.workers:
+            supervisor.start_worker(worker)
+        for worker in supervisor.workers:
+            worker.process.join(30)
+        assert supervisor.check_workers() == 2
+
+        for worker in supervisor.workers:
+            worker.process.join(30)
+        supervisor.collect_metrics()
+        metrics = supervisor.aggregate_metrics()
+    finally:
+        supervisor.stop()
+
+    assert metrics["worker_restarts"] == 2
+    assert (metrics["connectors"], metrics["sessions"]) == (3, 2)
+
+
+def test_workers_persist_paused_sessions_to_own_files(monkeypatch, tmp_path):
+    path = str(tmp_path / "paused_sessions")
+    monkeypatch.setenv("PAUSED_SESSIONS_PATH", path)
+    handlers = [
+        MultiConnectorSECCHandler(
+            exi_codec=None,
+            evse_controller_factory=None,
+            connectors=[connector],
+            worker_index=index,
+        )
+        for index, connector in enumerate(CONNECTORS[:2])
+    ]
+
+    assert [handler.paused_sessions.path for handler in handlers] == [
+        path + ".0",
+        path + ".1",
+    ]
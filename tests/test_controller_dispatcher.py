@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import pytest
+
+from controller.dispatcher import Dispatcher
+from iso15118.shared.exceptions import ControllerRequestError
+from iso15118.shared.messages.controller_wire import decode_reply, encode_request
+from iso15118.shared.messages.enums import Contactor
+
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = Dispatcher()
+
+    @dispatcher.handler("get_evse_id")
+    def get_evse_id(param: dict) -> str:
+        return f"{param['protocol']}-{threading.current_thread().name}"
+
+    @dispatcher.handler("close_contactor", "open_contactor")
+    async def switch_contactor(param: dict) -> Contactor:
+        await asyncio.sleep(0)
+        return Contactor.CLOSED
+
+    @dispatcher.handler("stop_charger")
+    def stop_charger(param: dict) -> Contactor:
+        raise RuntimeError("CAN bus down")
+
+    return dispatcher
+
+
+async def dispatch(dispatcher, operation, params=None):
+    reply = await dispatcher.dispatch(encode_request(operation, params, "Test"))
+    return decode_reply(operation, reply)
+
+
+@pytest.mark.asyncio
+async def test_handlers_are_dispatched_by_operation(dispatcher):
+    evse_id = await dispatch(dispatcher, "get_evse_id", {"protocol": "ISO"})
+    assert evse_id.startswith("ISO-")
+    # Blocking handlers run in a worker thread, coroutines on the event loop
+    assert evse_id != f"ISO-{threading.current_thread().name}"
+    assert await dispatch(dispatcher, "open_contactor") == Contactor.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_failed_and_unknown_operations_reply_with_errors(dispatcher):
+    with pytest.raises(ControllerRequestError, match="CAN bus down"):
+        await dispatch(dispatcher, "stop_charger")
+    with pytest.raises(ControllerRequestError, match="NOT IMPLEMENTED"):
+        await dispatch(dispatcher, "get_dc_evse_status")
+
+
+@pytest.mark.asyncio
+async def test_metrics_per_operation(dispatcher):
+    for _ in range(2):
+        await dispatch(dispatcher, "close_contactor")
+    with pytest.raises(ControllerRequestError):
+        await dispatch(dispatcher, "stop_charger")
+
+    metrics = dispatcher.metrics()
+    assert list(metrics) == ["close_contactor", "stop_charger"]
+    assert metrics["close_contactor"]["requests"] == 2
+    assert metrics["close_contactor"]["errors"] == 0
+    assert metrics["stop_charger"]["errors"] == 1
+    assert metrics["stop_charger"]["max_latency_ms"] >= 0
+
+
+def test_handlers_of_unknown_or_registered_operations_are_rejected(dispatcher):
+    with pytest.raises(ValueError):
+        dispatcher.handler("get_evse_id")(lambda param: "")
+    with pytest.raises(ValueError):
+        dispatcher.handler("no_such_operation")(lambda param: "")
+
+
+@pytest.mark.asyncio
+async def test_call_runs_blocking_getters_off_the_event_loop(dispatcher):
+    thread = await dispatcher.call(lambda param: threading.current_thread(), {})
+
+    assert thread is not threading.current_thread()
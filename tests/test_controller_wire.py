@@ -0,0 +1,209 @@
+import pytest
+
+from iso15118.shared.exceptions import (
+    ControllerRequestError,
+    InvalidControllerMessageError,
+)
+from iso15118.shared.messages.controller_wire import (
+    HEADER,
+    OPERATIONS,
+    WIRE_VERSION,
+    MessageKind,
+    decode_reply,
+    decode_request,
+    decode_update,
+    encode_error,
+    encode_reply,
+    encode_request,
+    encode_update,
+)
+from iso15118.shared.messages.datatypes import (
+    DCEVSEChargeParameter,
+    DCEVSEStatus,
+    DCEVSEStatusCode,
+    EVSENotification,
+    PVEVSEMaxCurrentLimit,
+    PVEVSEMaxPowerLimit,
+    PVEVSEMaxVoltageLimit,
+    PVEVSEMinCurrentLimit,
+    PVEVSEMinVoltageLimit,
+    PVEVSEPeakCurrentRipple,
+    PVEVSEPresentCurrent,
+    PVEVSEPresentVoltage,
+    PVEVTargetCurrent,
+    PVEVTargetVoltage,
+)
+from iso15118.shared.messages.enums import (
+    AuthorizationStatus,
+    Contactor,
+    EnergyTransferModeEnum,
+    IsolationLevel,
+)
+
+DC_EVSE_STATUS = DCEVSEStatus(
+    evse_notification=EVSENotification.STOP_CHARGING,
+    notification_max_delay=10,
+    evse_isolation_status=IsolationLevel.VALID,
+    evse_status_code=DCEVSEStatusCode.EVSE_READY,
+)
+EV_TARGETS = {
+    "voltage": PVEVTargetVoltage(multiplier=-1, value=4005, unit="V"),
+    "current": PVEVTargetCurrent(multiplier=0, value=125, unit="A"),
+}
+
+
+@pytest.mark.parametrize(
+    "operation, params",
+    [
+        ("get_dc_evse_status", {}),
+        ("get_evse_id", {"protocol": "DIN"}),
+        ("set_precharge", EV_TARGETS),
+        ("send_charging_command", {**EV_TARGETS, "soc": 35}),
+        ("send_charging_command", {**EV_TARGETS, "soc": None}),
+        ("get_dc_charge_loop_snapshot", {"protocol": "ISO", **EV_TARGETS, "soc": 80}),
+    ],
+)
+def test_request_round_trip(operation, params):
+    request = encode_request(operation, params, "CurrentDemand")
+
+    assert decode_request(request) == (operation, "CurrentDemand", params)
+
+
+@pytest.mark.parametrize(
+    "operation, result",
+    [
+        ("starting", None),
+        ("get_evse_id", "UK123E1234"),
+        (
+            "get_supported_energy_transfer_modes",
+            [EnergyTransferModeEnum.DC_CORE, EnergyTransferModeEnum.DC_EXTENDED],
+        ),
+        ("is_authorized", AuthorizationStatus.ONGOING),
+        ("close_contactor", Contactor.CLOSED),
+        ("is_evse_power_limit_achieved", True),
+        ("get_dc_evse_status", DC_EVSE_STATUS),
+        (
+            "get_dc_evse_status",
+            DC_EVSE_STATUS.copy(update={"evse_isolation_status": None}),
+        ),
+        (
+            "get_evse_present_voltage",
+            PVEVSEPresentVoltage(multiplier=-2, value=32767, unit="V"),
+        ),
+        (
+            "get_dc_evse_charge_parameter",
+            DCEVSEChargeParameter(
+                dc_evse_status=DC_EVSE_STATUS,
+                evse_maximum_power_limit=PVEVSEMaxPowerLimit(
+                    multiplier=1, value=230, unit="W"
+                ),
+                evse_maximum_current_limit=PVEVSEMaxCurrentLimit(
+                    multiplier=1, value=4, unit="A"
+                ),
+                evse_maximum_voltage_limit=PVEVSEMaxVoltageLimit(
+                    multiplier=1, value=4, unit="V"
+                ),
+                evse_minimum_current_limit=PVEVSEMinCurrentLimit(
+                    multiplier=1, value=2, unit="A"
+                ),
+                evse_minimum_voltage_limit=PVEVSEMinVoltageLimit(
+                    multiplier=1, value=4, unit="V"
+                ),
+                evse_peak_current_ripple=PVEVSEPeakCurrentRipple(
+                    multiplier=1, value=4, unit="A"
+                ),
+            ),
+        ),
+        (
+            "get_dc_charge_loop_snapshot",
+            {
+                "dc_evse_status": DC_EVSE_STATUS,
+                "evse_present_voltage": PVEVSEPresentVoltage(
+                    multiplier=0, value=400, unit="V"
+                ),
+                "evse_present_current": PVEVSEPresentCurrent(
+                    multiplier=0, value=100, unit="A"
+                ),
+                "evse_current_limit_achieved": False,
+                "evse_voltage_limit_achieved": True,
+                "evse_power_limit_achieved": False,
+                "evse_max_voltage_limit": PVEVSEMaxVoltageLimit(
+                    multiplier=0, value=600, unit="V"
+                ),
+                "evse_max_current_limit": PVEVSEMaxCurrentLimit(
+                    multiplier=0, value=300, unit="A"
+                ),
+                "evse_max_power_limit": PVEVSEMaxPowerLimit(
+                    multiplier=1, value=1000, unit="W"
+                ),
+                "evse_id": "UK123E1234",
+            },
+        ),
+    ],
+)
+def test_reply_round_trip(operation, result):
+    assert decode_reply(operation, encode_reply(operation, result)) == result
+
+
+def test_fixed_layout_of_physical_values():
+    # Header, then multiplier (int8), value (int16) and unit (enum index)
+    reply = encode_reply(
+        "get_evse_max_current_limit",
+        PVEVSEMaxCurrentLimit(multiplier=0, value=300, unit="A"),
+    )
+
+    assert len(reply) == HEADER.size + 4
+
+
+def test_operation_codes_are_unique():
+    codes = [operation.code for operation in OPERATIONS.values()]
+
+    assert len(codes) == len(set(codes))
+
+
+def test_error_reply_raises():
+    reply = encode_error("stop_charger", "NOT IMPLEMENTED")
+
+    with pytest.raises(ControllerRequestError, match="NOT IMPLEMENTED"):
+        decode_reply("stop_charger", reply)
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        # Another wire format version
+        HEADER.pack(WIRE_VERSION + 1, MessageKind.REPLY, 10) + b"\x00\x00",
+        # An unknown message kind
+        HEADER.pack(WIRE_VERSION, 7, 10),
+        # The reply to another operation
+        encode_reply("get_dc_evse_status", DC_EVSE_STATUS),
+        # A truncated reply
+        encode_reply("get_evse_id", "UK123E1234")[:-1],
+        b"",
+    ],
+)
+def test_invalid_reply_raises(reply):
+    with pytest.raises(InvalidControllerMessageError):
+        decode_reply("get_evse_id", reply)
+
+
+def test_request_of_unknown_operation_raises():
+    with pytest.raises(InvalidControllerMessageError):
+        decode_request(HEADER.pack(WIRE_VERSION, MessageKind.REQUEST, 9999))
+
+
+def test_update_round_trip():
+    update = encode_update("get_evse_id", {"protocol": "ISO"}, "UK123E1234")
+
+    assert decode_update(update) == ("get_evse_id", {"protocol": "ISO"}, "UK123E1234")
+
+
+def test_results_that_must_be_fresh_are_not_published():
+    with pytest.raises(ValueError):
+        encode_update(
+            "get_evse_present_voltage",
+            {},
+            PVEVSEPresentVoltage(multiplier=0, value=400, unit="V"),
+        )
+    with pytest.raises(InvalidControllerMessageError):
+        decode_update(encode_reply("get_evse_id", "UK123E1234"))
@@ -0,0 +1,24 @@
+import asyncio
+import sys
+
+import pytest
+
+from iso15118.shared.utils import install_event_loop_policy
+
+
+@pytest.fixture(autouse=True)
+def reset_event_loop_policy():
+    yield
+    asyncio.set_event_loop_policy(None)
+
+
+def test_uvloop_falls_back_to_asyncio_if_not_installed(monkeypatch):
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+
+    assert install_event_loop_policy("uvloop") == "asyncio"
+    assert type(asyncio.get_event_loop_policy()) is asyncio.DefaultEventLoopPolicy
+
+
+def test_unknown_event_loop():
+    with pytest.raises(ValueError):
+        install_event_loop_policy("trio")
@@ -0,0 +1,17 @@
+import pytest
+
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from tests.secc.states.test_messages import get_dummy_v2g_message_session_stop_req
+
+
+@pytest.mark.asyncio
+async def test_to_exi_async_runs_off_loop():
+    EXI().set_exi_codec(NativeEXICodec())
+    message = get_dummy_v2g_message_session_stop_req()
+
+    exi_stream = await EXI().to_exi_async(message, Namespace.ISO_V2_MSG_DEF)
+
+    assert exi_stream == EXI().to_exi(message, Namespace.ISO_V2_MSG_DEF)
+    assert await EXI().from_exi_async(exi_stream, Namespace.ISO_V2_MSG_DEF) == message
@@ -0,0 +1,86 @@
+import json
+
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.exi_warm_up import WARM_UP_CORPUS
+from iso15118.shared.exificient_exi_codec import (
+    ExificientEXICodec,
+    pack_streams,
+    unpack_streams,
+)
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.messages.iso15118_2.datatypes import (
+    CertificateChain,
+    DHPublicKey,
+    EncryptedPrivateKey,
+)
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from tests.test_exi_bytes_fields import JSONOnlyCodec
+from tests.test_native_exi_codec import SAP_REQ
+
+
+class CountingCodec(JSONOnlyCodec):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def encode_many(self, messages):
+        self.batches.append(len(messages))
+        return super().encode_many(messages)
+
+
+def test_to_exi_many_encodes_uncached_elements_in_one_batch():
+    codec = CountingCodec()
+    EXI().set_exi_codec(codec)
+    elements = [
+        CertificateChain(id="id1", certificate=bytes(range(32))),
+        EncryptedPrivateKey(id="id2", value=bytes(48)),
+        DHPublicKey(id="id3", value=bytes(65)),
+    ]
+    cached = EXI().to_exi(elements[0], Namespace.ISO_V2_MSG_DEF)
+
+    exi_streams = EXI().to_exi_many(elements, Namespace.ISO_V2_MSG_DEF)
+
+    assert codec.batches == [2]
+    assert exi_streams[0] == cached
+    # Only the certificate chain is cached, the session's keys are not
+    assert len(EXI().cache) == 1
+    EXI().set_exi_codec(NativeEXICodec())
+    assert exi_streams == [
+        EXI().to_exi(element, Namespace.ISO_V2_MSG_DEF) for element in elements
+    ]
+
+
+class FakeJavaEXICodec:
+    """Stands in for an EXICodec.jar that provides the batch calls"""
+
+    def __init__(self):
+        self.codec = NativeEXICodec()
+
+    def encode_many(self, messages: str) -> bytes:
+        return pack_streams(
+            [self.codec.encode(message, ns) for message, ns in json.loads(messages)]
+        )
+
+    def decode_many(self, packed: bytes, namespaces: str) -> str:
+        streams = zip(unpack_streams(packed), json.loads(namespaces))
+        return json.dumps([self.codec.decode(stream, ns) for stream, ns in streams])
+
+
+def test_exificient_batch_calls_cross_the_gateway_once():
+    codec = ExificientEXICodec.__new__(ExificientEXICodec)
+    codec.exi_codec = FakeJavaEXICodec()
+    codec.batch_supported = True
+    messages = [(json.dumps(SAP_REQ), Namespace.SAP)] * 2 + [
+        (
+            json.dumps(WARM_UP_CORPUS[Namespace.ISO_V2_MSG_DEF][0]),
+            Namespace.ISO_V2_MSG_DEF,
+        )
+    ]
+
+    exi_streams = codec.encode_many(messages)
+
+    assert exi_streams == [NativeEXICodec().encode(*message) for message in messages]
+    decoded = codec.decode_many(list(zip(exi_streams, [ns for _, ns in messages])))
+    assert [json.loads(message) for message in decoded] == [
+        json.loads(message) for message, _ in messages
+    ]
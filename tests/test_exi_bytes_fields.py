@@ -0,0 +1,42 @@
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.iexi_codec import IEXICodec
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.messages.iso15118_2.msgdef import V2GMessage as V2GMessageV2
+from iso15118.shared.native_exi_codec import NativeEXICodec
+
+
+class JSONOnlyCodec(IEXICodec):
+    """Exchanges JSON with the EXI object, like the ExificientEXICodec"""
+
+    def __init__(self):
+        self.codec = NativeEXICodec()
+
+    def encode(self, message: str, namespace: str) -> bytes:
+        return self.codec.encode(message, namespace)
+
+    def decode(self, stream: bytes, namespace: str) -> str:
+        return self.codec.decode(stream, namespace)
+
+    def get_version(self) -> str:
+        return "JSONOnlyCodec"
+
+
+def test_from_exi_decodes_bytes_fields_of_json_codec():
+    EXI().set_exi_codec(JSONOnlyCodec())
+    message = V2GMessageV2.parse_obj(
+        {
+            "Header": {"SessionID": "ABCDEF0102030405"},
+            "Body": {
+                "PaymentDetailsReq": {
+                    "eMAID": "DE1ABCD2EF357A",
+                    "ContractSignatureCertChain": {
+                        "Certificate": bytes(range(32)),
+                        "SubCertificates": {"Certificate": [b"\x01" * 20, b"\x02"]},
+                    },
+                }
+            },
+        }
+    )
+    exi_stream = EXI().to_exi(message, Namespace.ISO_V2_MSG_DEF)
+
+    assert EXI().from_exi(exi_stream, Namespace.ISO_V2_MSG_DEF) == message
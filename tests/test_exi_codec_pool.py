@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from iso15118.shared.exceptions import EXIEncodingError
+from iso15118.shared.exi_codec_pool import EXICodecPool
+from iso15118.shared.iexi_codec import IEXICodec, IStructuredEXICodec
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from iso15118.shared.settings import EXI_CODEC_THREADS
+from tests.test_native_exi_codec import SAP_REQ
+
+
+class CrashingCodec(IEXICodec):
+    """Behaves like a codec whose gateway died after the first instance"""
+
+    instances = 0
+
+    def __init__(self):
+        CrashingCodec.instances += 1
+        self.crashed = CrashingCodec.instances == 1
+
+    def encode(self, message: str, namespace: str) -> bytes:
+        if self.crashed:
+            raise ConnectionError("Gateway is gone")
+        return message.encode()
+
+    def decode(self, stream: bytes, namespace: str) -> str:
+        return stream.decode()
+
+    def get_version(self) -> str:
+        if self.crashed:
+            raise ConnectionError("Gateway is gone")
+        return "1.0"
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_pool_round_trip(use_processes):
+    pool = EXICodecPool(
+        NativeEXICodec, size=2, use_processes=use_processes, health_check_interval=0
+    )
+    try:
+        exi_stream = pool.encode(json.dumps(SAP_REQ), Namespace.SAP)
+        assert json.loads(pool.decode(exi_stream, Namespace.SAP)) == SAP_REQ
+    finally:
+        pool.close()
+
+
+def test_pool_keeps_healthy_worker_on_encoding_error():
+    pool = EXICodecPool(NativeEXICodec, size=1, health_check_interval=0)
+    with pytest.raises(EXIEncodingError):
+        pool.encode(json.dumps({"UnknownReq": {}}), Namespace.ISO_V2_MSG_DEF)
+    assert pool.workers[0].restarts == 0
+
+
+def test_pool_restarts_crashed_worker():
+    CrashingCodec.instances = 0
+    pool = EXICodecPool(CrashingCodec, size=1, health_check_interval=0)
+
+    assert pool.encode("message", Namespace.SAP) == b"message"
+    assert pool.workers[0].restarts == 1
+    assert pool.check_health() == 0
+
+
+def test_executor_feeds_all_pool_workers(exi):
+    exi.executor = None
+    pool = EXICodecPool(NativeEXICodec, size=EXI_CODEC_THREADS + 2)
+    try:
+        exi.set_exi_codec(pool)
+        assert exi.get_executor()._max_workers == EXI_CODEC_THREADS + 2
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_pool_of_structured_codecs_is_structured(use_processes):
+    pool = EXICodecPool(
+        NativeEXICodec, size=1, use_processes=use_processes, health_check_interval=0
+    )
+    try:
+        assert isinstance(pool, IStructuredEXICodec)
+        exi_stream = pool.encode_dict(SAP_REQ, Namespace.SAP)
+        assert pool.decode_dict(exi_stream, Namespace.SAP) == SAP_REQ
+        template = pool.compile_template(SAP_REQ, Namespace.SAP)
+        assert template.patch(SAP_REQ) == exi_stream
+    finally:
+        pool.close()
+
+
+def test_pool_of_json_codecs_is_not_structured():
+    pool = EXICodecPool(CrashingCodec, size=1, health_check_interval=0)
+
+    assert not isinstance(pool, IStructuredEXICodec)
+
+
+def test_pool_waits_for_an_idle_worker_until_timeout():
+    pool = EXICodecPool(NativeEXICodec, size=1, health_check_interval=0, timeout=0.05)
+    # The only worker is busy
+    pool._idle_workers.get()
+
+    with pytest.raises(TimeoutError):
+        pool.encode(json.dumps(SAP_REQ), Namespace.SAP)
@@ -0,0 +1,39 @@
+import pytest
+
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.messages.iso15118_20.acd_p import ACDPVehiclePositioningReq
+from iso15118.shared.messages.iso15118_20.common_types import (
+    MessageHeader as MessageHeaderV20,
+)
+from iso15118.shared.messages.iso15118_20.common_types import Processing
+from iso15118.shared.messages.iso15118_20.wpt import EVResult, WPTPairingReq
+from iso15118.shared.native_exi_codec import NativeEXICodec
+
+
+@pytest.mark.parametrize(
+    "message, namespace",
+    [
+        (
+            ACDPVehiclePositioningReq(
+                header=MessageHeaderV20(session_id="ABCDEF0102030405", timestamp=1),
+                ev_mobility_status=True,
+                ev_positioning_support=False,
+            ),
+            Namespace.ISO_V20_ACDP,
+        ),
+        (
+            WPTPairingReq(
+                header=MessageHeaderV20(session_id="ABCDEF0102030405", timestamp=1),
+                ev_processing=Processing.ONGOING,
+                ev_result_code=EVResult.SUCCESS,
+            ),
+            Namespace.ISO_V20_WPT,
+        ),
+    ],
+)
+def test_from_exi_decodes_all_v20_message_families(message, namespace):
+    EXI().set_exi_codec(NativeEXICodec())
+    exi_stream = EXI().to_exi(message, namespace)
+
+    assert EXI().from_exi(exi_stream, namespace) == message
@@ -0,0 +1,53 @@
+from iso15118.shared.exi_codec import EXI, EXIResultCache
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.messages.iso15118_2.body import Body as BodyV2
+from iso15118.shared.messages.iso15118_2.body import ResponseCode, SessionStopRes
+from iso15118.shared.messages.iso15118_2.header import MessageHeader as MessageHeaderV2
+from iso15118.shared.messages.iso15118_2.msgdef import V2GMessage as V2GMessageV2
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from tests.secc.states.test_messages import get_dummy_v2g_message_session_stop_req
+
+
+def get_failed_session_stop_res() -> V2GMessageV2:
+    return V2GMessageV2(
+        header=MessageHeaderV2(session_id="F9F9EE8505F55838"),
+        body=BodyV2(session_stop_res=SessionStopRes(response_code=ResponseCode.FAILED)),
+    )
+
+
+def test_to_exi_caches_failed_responses():
+    EXI().set_exi_codec(NativeEXICodec())
+    message = get_failed_session_stop_res()
+
+    exi_stream = EXI().to_exi(message, Namespace.ISO_V2_MSG_DEF)
+    assert (EXI().cache.hits, EXI().cache.misses) == (0, 1)
+
+    assert EXI().to_exi(message.copy(deep=True), Namespace.ISO_V2_MSG_DEF) == (
+        exi_stream
+    )
+    assert (EXI().cache.hits, EXI().cache.misses) == (1, 1)
+
+
+def test_to_exi_skips_cache_for_session_messages():
+    EXI().set_exi_codec(NativeEXICodec())
+    message = get_dummy_v2g_message_session_stop_req()
+    response = get_failed_session_stop_res()
+    response.body.session_stop_res.response_code = ResponseCode.OK
+
+    for _ in range(2):
+        EXI().to_exi(message, Namespace.ISO_V2_MSG_DEF)
+        EXI().to_exi(response, Namespace.ISO_V2_MSG_DEF)
+
+    assert (EXI().cache.hits, EXI().cache.misses) == (0, 0)
+
+
+def test_exi_result_cache_evicts_least_recently_used():
+    cache = EXIResultCache(max_size=2)
+    cache.put(b"a", b"\x01")
+    cache.put(b"b", b"\x02")
+    cache.get(b"a")
+    cache.put(b"c", b"\x03")
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == b"\x01"
+    assert len(cache) == 2
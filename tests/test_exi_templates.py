@@ -0,0 +1,76 @@
+import pytest
+
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.messages.iso15118_2.msgdef import V2GMessage as V2GMessageV2
+from iso15118.shared.native_exi_codec import NativeEXICodec
+
+
+def get_current_demand_res(voltage: int, evse_id: str = "DE*SWT*E123456789") -> dict:
+    return {
+        "V2G_Message": {
+            "Header": {"SessionID": "ABCDEF0102030405"},
+            "Body": {
+                "CurrentDemandRes": {
+                    "ResponseCode": "OK",
+                    "DC_EVSEStatus": {
+                        "NotificationMaxDelay": 0,
+                        "EVSENotification": "None",
+                        "EVSEStatusCode": "EVSE_Ready",
+                    },
+                    "EVSEPresentVoltage": {
+                        "Multiplier": 0,
+                        "Unit": "V",
+                        "Value": voltage,
+                    },
+                    "EVSEPresentCurrent": {"Multiplier": 0, "Unit": "A", "Value": 100},
+                    "EVSECurrentLimitAchieved": False,
+                    "EVSEVoltageLimitAchieved": False,
+                    "EVSEPowerLimitAchieved": False,
+                    "EVSEID": evse_id,
+                    "SAScheduleTupleID": 1,
+                }
+            },
+        }
+    }
+
+
+def test_template_patches_changed_values():
+    codec = NativeEXICodec()
+    template = codec.compile_template(
+        get_current_demand_res(400), Namespace.ISO_V2_MSG_DEF
+    )
+
+    message = get_current_demand_res(401)
+    assert template.patch(message) == codec.encode_dict(
+        message, Namespace.ISO_V2_MSG_DEF
+    )
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        # The encoded integer needs another octet
+        get_current_demand_res(20000),
+        # Strings change the string tables
+        get_current_demand_res(400, evse_id="DE*SWT*E987654321"),
+    ],
+)
+def test_template_falls_back_to_full_encoding(message):
+    codec = NativeEXICodec()
+    template = codec.compile_template(
+        get_current_demand_res(400), Namespace.ISO_V2_MSG_DEF
+    )
+
+    assert template.patch(message) is None
+
+
+def test_to_exi_from_template():
+    EXI().set_exi_codec(NativeEXICodec())
+    templates = {}
+    for voltage in (400, 401, 10):
+        message = V2GMessageV2.parse_obj(get_current_demand_res(voltage)["V2G_Message"])
+        assert EXI().to_exi_from_template(
+            message, Namespace.ISO_V2_MSG_DEF, templates
+        ) == EXI().to_exi(message, Namespace.ISO_V2_MSG_DEF)
+    assert list(templates) == [(Namespace.ISO_V2_MSG_DEF, "CurrentDemandRes")]
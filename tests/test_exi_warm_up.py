@@ -0,0 +1,37 @@
+import pytest
+
+from iso15118.shared.exceptions import EXIEncodingError
+from iso15118.shared.exi_codec import EXI
+from iso15118.shared.exi_warm_up import WARM_UP_CORPUS, warm_up_exi_codec
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from tests.test_exi_bytes_fields import JSONOnlyCodec
+
+
+def test_warm_up_round_trips_all_namespaces():
+    assert warm_up_exi_codec(NativeEXICodec(), rounds=1)
+    assert set(WARM_UP_CORPUS) >= {
+        Namespace.SAP,
+        Namespace.DIN_MSG_DEF,
+        Namespace.ISO_V2_MSG_DEF,
+        Namespace.ISO_V20_COMMON_MSG,
+        Namespace.ISO_V20_AC,
+        Namespace.ISO_V20_DC,
+        Namespace.ISO_V20_WPT,
+        Namespace.ISO_V20_ACDP,
+        Namespace.XML_DSIG,
+    }
+
+
+class DINOnlyCodec(JSONOnlyCodec):
+    def encode(self, message: str, namespace: str) -> bytes:
+        if namespace != Namespace.DIN_MSG_DEF:
+            raise EXIEncodingError(f"Unsupported namespace {namespace}")
+        return super().encode(message, namespace)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_reports_failing_namespaces():
+    EXI().set_exi_codec(DINOnlyCodec())
+
+    assert not await EXI().warm_up()
@@ -0,0 +1,105 @@
+import json
+from base64 import b64encode
+
+import pytest
+
+from iso15118.shared.exceptions import EXIEncodingError
+from iso15118.shared.messages.enums import Namespace
+from iso15118.shared.native_exi_codec import NativeEXICodec
+from tests.secc.states.test_messages import (
+    get_dummy_v2g_message_session_stop_req,
+    get_dummy_v2g_message_welding_detection_req,
+    get_v2g_message_power_delivery_req,
+)
+
+SAP_REQ = {
+    "supportedAppProtocolReq": {
+        "AppProtocol": [
+            {
+                "ProtocolNamespace": "urn:din:70121:2012:MsgDef",
+                "VersionNumberMajor": 2,
+                "VersionNumberMinor": 0,
+                "SchemaID": 1,
+                "Priority": 1,
+            },
+            {
+                "ProtocolNamespace": "urn:iso:15118:2:2013:MsgDef",
+                "VersionNumberMajor": 2,
+                "VersionNumberMinor": 0,
+                "SchemaID": 2,
+                "Priority": 2,
+            },
+        ]
+    }
+}
+
+
+def test_encode_supported_app_protocol_req():
+    codec = NativeEXICodec()
+    exi_stream = codec.encode(json.dumps(SAP_REQ), Namespace.SAP)
+
+    # EXI header, SE(supportedAppProtocolReq), SE(AppProtocol),
+    # SE(ProtocolNamespace), CH and the string length of the namespace
+    assert exi_stream.startswith(bytes.fromhex("8000dbab"))
+    assert json.loads(codec.decode(exi_stream, Namespace.SAP)) == SAP_REQ
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        get_v2g_message_power_delivery_req(),
+        get_dummy_v2g_message_welding_detection_req(),
+        get_dummy_v2g_message_session_stop_req(),
+    ],
+)
+def test_iso15118_2_round_trip(message):
+    codec = NativeEXICodec()
+    message_json = json.dumps(
+        {"V2G_Message": message.dict(by_alias=True, exclude_none=True)}
+    )
+    exi_stream = codec.encode(message_json, Namespace.ISO_V2_MSG_DEF)
+
+    assert exi_stream.startswith(bytes.fromhex("809802"))
+    assert json.loads(codec.decode(exi_stream, Namespace.ISO_V2_MSG_DEF)) == (
+        json.loads(message_json)
+    )
+
+
+def test_encode_unknown_element():
+    codec = NativeEXICodec()
+    with pytest.raises(EXIEncodingError):
+        codec.encode(json.dumps({"UnknownReq": {}}), Namespace.ISO_V2_MSG_DEF)
+
+
+def test_encode_dict_matches_json_encoding():
+    codec = NativeEXICodec()
+    gen_challenge = bytes(range(16))
+    exi_stream = codec.encode_dict(
+        {"AuthorizationReq": {"Id": "ID1", "GenChallenge": gen_challenge}},
+        Namespace.ISO_V2_MSG_DEF,
+    )
+
+    # The JSON representation carries the bytes fields Base64 encoded
+    message_json = json.dumps(
+        {
+            "AuthorizationReq": {
+                "Id": "ID1",
+                "GenChallenge": b64encode(gen_challenge).decode(),
+            }
+        }
+    )
+    assert exi_stream == codec.encode(message_json, Namespace.ISO_V2_MSG_DEF)
+
+
+def test_decode_dict_returns_raw_bytes():
+    codec = NativeEXICodec()
+    gen_challenge = bytes(range(16))
+    message = {
+        "V2G_Message": {
+            "Header": {"SessionID": "ABCDEF0102030405"},
+            "Body": {"AuthorizationReq": {"Id": "ID1", "GenChallenge": gen_challenge}},
+        }
+    }
+    exi_stream = codec.encode_dict(message, Namespace.ISO_V2_MSG_DEF)
+
+    assert codec.decode_dict(exi_stream, Namespace.ISO_V2_MSG_DEF) == message
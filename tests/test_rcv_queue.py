@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from iso15118.shared.notifications import StopNotification, UDPPacketNotification
+from iso15118.shared.rcv_queue import DropPolicy, ReceiveQueue
+
+
+def datagram(index: int) -> UDPPacketNotification:
+    return UDPPacketNotification(bytearray([index]), ("fe80::1", 15118))
+
+
+@pytest.mark.asyncio
+async def test_control_notifications_overtake_datagrams():
+    queue = ReceiveQueue()
+    queue.put_nowait(datagram(1))
+    stop = StopNotification(False, "Test", ("fe80::1", 50000))
+    queue.put_nowait(stop)
+
+    assert await queue.get() is stop
+    assert (await queue.get()).data == bytearray([1])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "drop_policy, remaining",
+    [(DropPolicy.DROP_NEWEST, [1, 2]), (DropPolicy.DROP_OLDEST, [2, 3])],
+)
+async def test_full_datagram_lane_applies_drop_policy(drop_policy, remaining):
+    queue = ReceiveQueue(datagram_maxsize=2, datagram_drop_policy=drop_policy)
+    for index in (1, 2, 3):
+        queue.put_nowait(datagram(index))
+
+    received = []
+    while not queue.empty():
+        received.append((await queue.get()).data[0])
+        queue.task_done()
+
+    assert received == remaining
+    assert queue.metrics() == {
+        "control_queued": 0,
+        "datagram_queued": 2 if drop_policy == DropPolicy.DROP_NEWEST else 3,
+        "datagram_dropped": 1,
+    }
+    await asyncio.wait_for(queue.join(), 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("drop_policy", list(DropPolicy))
+async def test_control_notifications_are_never_dropped(drop_policy):
+    queue = ReceiveQueue(datagram_maxsize=1, datagram_drop_policy=drop_policy)
+    stops = [StopNotification(False, "Test", ("fe80::1", port)) for port in range(100)]
+    for index, stop in enumerate(stops):
+        # The datagram lane is full after the first datagram
+        queue.put_nowait(datagram(index))
+        queue.put_nowait(stop)
+
+    received = []
+    while not queue.empty():
+        received.append(await queue.get())
+        queue.task_done()
+
+    assert received[:-1] == stops
+    assert isinstance(received[-1], UDPPacketNotification)
+    assert queue.metrics()["control_queued"] == 100
+    assert queue.metrics()["datagram_dropped"] == 99
@@ -0,0 +1,39 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from iso15118.shared import comm_session
+from iso15118.shared.comm_session import V2GCommunicationSession, parse_grace_periods
+from iso15118.shared.messages.enums import Protocol
+from iso15118.shared.states import Terminate
+
+
+def test_parse_grace_periods():
+    assert parse_grace_periods({"iso_15118_20_dc": "0.5:1"}) == {
+        Protocol.ISO_15118_20_DC: (0.5, 1.0)
+    }
+
+
+@pytest.mark.parametrize("entries", [{"ISO_15118_2": "2"}, {"ISO_15118_3": "1:1"}])
+def test_invalid_grace_periods(entries):
+    with pytest.raises(ValueError):
+        parse_grace_periods(entries)
+
+
+@pytest.mark.asyncio
+async def test_stop_returns_before_tcp_connection_closes(monkeypatch):
+    monkeypatch.setattr(
+        comm_session, "_grace_periods", {Protocol.ISO_15118_2: (0.01, 0.02)}
+    )
+    session = Mock(protocol=Protocol.ISO_15118_2)
+    session.current_state.next_state = Terminate
+    session._close_tcp_connection = lambda: (
+        V2GCommunicationSession._close_tcp_connection(session)
+    )
+
+    await V2GCommunicationSession.stop(session, "Test")
+    session.writer.close.assert_not_called()
+
+    await asyncio.sleep(0.05)
+    session.writer.close.assert_called_once()
@@ -0,0 +1,106 @@
+import asyncio
+import datetime
+import ssl
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from iso15118.shared import security
+from iso15118.shared.security import (
+    ResumingSSLContext,
+    TLSSessionCache,
+    get_shared_ssl_context,
+    record_client_handshake,
+    tls_handshake_metrics,
+)
+
+
+@pytest.fixture
+def server_ssl_context(tmp_path) -> ssl.SSLContext:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "SECC")])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = tmp_path / "cert.pem", tmp_path / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
+    ssl_context.load_cert_chain(cert_path, key_path)
+    ssl_context.set_ciphers("ECDHE-ECDSA-AES128-SHA256")
+    return ssl_context
+
+
+@pytest.mark.asyncio
+async def test_client_resumes_cached_tls_session(server_ssl_context, monkeypatch):
+    monkeypatch.setattr(security, "_client_handshakes", {"full": 0, "resumed": 0})
+    client_ssl_context = ResumingSSLContext(ssl.PROTOCOL_TLSv1_2)
+    client_ssl_context.verify_mode = ssl.CERT_NONE
+    client_ssl_context.session_cache = TLSSessionCache(max_size=4, lifetime=60)
+
+    async def echo(reader, writer):
+        writer.write(await reader.read(1))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(echo, "127.0.0.1", 0, ssl=server_ssl_context)
+    port = server.sockets[0].getsockname()[1]
+    for _ in range(2):
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", port, ssl=client_ssl_context
+        )
+        # TLS 1.2 sessions can be resumed once the handshake is done
+        writer.write(b"\x01")
+        await reader.read(1)
+        record_client_handshake(writer.get_extra_info("ssl_object"), "127.0.0.1")
+        writer.close()
+    server.close()
+    await server.wait_closed()
+
+    assert tls_handshake_metrics(server_side=False) == {
+        "tls_handshakes_full": 1,
+        "tls_handshakes_resumed": 1,
+    }
+    assert server_ssl_context.session_stats()["hits"] == 1
+
+
+def test_session_cache_drops_expired_sessions():
+    session = type("Session", (), {"time": 0, "timeout": 300})()
+    cache = TLSSessionCache(max_size=1, lifetime=60)
+    cache.put("fe80::1%eth0", session)
+
+    assert cache.get("fe80::1%eth0") is None
+
+
+def test_shared_ssl_context_is_created_anew_on_changed_certificates(monkeypatch):
+    mtimes = {True: (1, 1)}
+    monkeypatch.setattr(security, "_shared_ssl_contexts", {})
+    monkeypatch.setattr(security, "_ssl_context_mtimes", mtimes.get)
+    monkeypatch.setattr(
+        security,
+        "get_ssl_context",
+        lambda server_side: ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER),
+    )
+
+    ssl_context = get_shared_ssl_context(True)
+    assert get_shared_ssl_context(True) is ssl_context
+
+    mtimes[True] = (1, 2)
+    assert get_shared_ssl_context(True) is not ssl_context
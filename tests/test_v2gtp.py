@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from iso15118.shared.exceptions import InvalidV2GTPMessageError
+from iso15118.shared.messages.enums import ISOV2PayloadTypes, Protocol
+from iso15118.shared.messages.v2gtp import V2GTPMessage, V2GTPStreamReader
+
+
+def v2gtp_bytes(payload: bytes) -> bytes:
+    return V2GTPMessage(
+        Protocol.ISO_15118_2, ISOV2PayloadTypes.EXI_ENCODED, payload
+    ).to_bytes()
+
+
+@pytest.mark.asyncio
+async def test_reads_coalesced_messages_one_at_a_time():
+    reader = asyncio.StreamReader()
+    reader.feed_data(v2gtp_bytes(b"\x80\x01") + v2gtp_bytes(b"\x80\x02\x03"))
+    reader.feed_eof()
+    v2gtp_reader = V2GTPStreamReader(reader)
+
+    first = await v2gtp_reader.read_message(Protocol.ISO_15118_2)
+    second = await v2gtp_reader.read_message(Protocol.ISO_15118_2)
+
+    assert (first.payload, second.payload) == (b"\x80\x01", b"\x80\x02\x03")
+    assert await v2gtp_reader.read_message(Protocol.ISO_15118_2) is None
+
+
+@pytest.mark.asyncio
+async def test_reads_fragmented_message_larger_than_7000_bytes():
+    reader = asyncio.StreamReader()
+    payload = bytes(range(256)) * 40
+    data = v2gtp_bytes(payload)
+    v2gtp_reader = V2GTPStreamReader(reader)
+
+    read = asyncio.ensure_future(v2gtp_reader.read_message(Protocol.ISO_15118_2))
+    for offset in range(0, len(data), 1460):
+        reader.feed_data(data[offset : offset + 1460])
+        await asyncio.sleep(0)
+
+    assert (await read).payload == payload
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data",
+    [
+        # Payload length exceeds the maximum
+        v2gtp_bytes(bytes(101)),
+        # Wrong protocol version
+        b"\x02\xfd" + v2gtp_bytes(b"\x80\x01")[2:],
+        # Connection closed in the middle of the payload
+        v2gtp_bytes(b"\x80\x01\x02")[:-1],
+    ],
+)
+async def test_rejects_invalid_messages(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+
+    with pytest.raises(InvalidV2GTPMessageError):
+        await V2GTPStreamReader(reader, max_payload_length=100).read_message(
+            Protocol.ISO_15118_2
+        )
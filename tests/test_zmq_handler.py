@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+import zmq
+import zmq.asyncio
+
+from iso15118.shared.exceptions import (
+    ControllerConnectionError,
+    ControllerRequestError,
+    ControllerTimeoutError,
+)
+from iso15118.shared.messages.controller_wire import (
+    decode_request,
+    encode_error,
+    encode_reply,
+)
+from iso15118.shared.messages.zmq_handler import ZMQHandler
+
+
+@pytest.fixture
+def router():
+    socket = zmq.asyncio.Context.instance().socket(zmq.ROUTER)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.bind("tcp://127.0.0.1:*")
+    yield socket
+    socket.close()
+
+
+async def reply(router, frames, evse_id: str):
+    await router.send_multipart(frames[:-1] + [encode_reply("get_evse_id", evse_id)])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_matched_by_request_id(router):
+    handler = ZMQHandler(router.getsockopt_string(zmq.LAST_ENDPOINT))
+
+    async def serve_in_reverse_order():
+        requests = [await router.recv_multipart() for _ in range(3)]
+        for frames in reversed(requests):
+            _, _, params = decode_request(frames[-1])
+            await reply(router, frames, params["protocol"])
+
+    server = asyncio.create_task(serve_in_reverse_order())
+    replies = await asyncio.gather(
+        *(handler.request("get_evse_id", {"protocol": f"EVSE{i}"}) for i in range(3))
+    )
+    await server
+
+    assert replies == ["EVSE0", "EVSE1", "EVSE2"]
+    assert handler.metrics()["controller_pending"] == 0
+    handler.close()
+
+
+@pytest.mark.asyncio
+async def test_timeouts_reset_the_connection(router):
+    handler = ZMQHandler(
+        router.getsockopt_string(zmq.LAST_ENDPOINT),
+        request_timeout=0.05,
+        reconnect_after_timeouts=2,
+    )
+    old_socket = handler.socket
+
+    with pytest.raises(ControllerTimeoutError):
+        await handler.request("get_evse_id", {"protocol": "ISO"})
+    assert handler.socket is old_socket
+
+    # A late reply is dropped
+    await reply(router, await router.recv_multipart(), "late")
+    with pytest.raises(ControllerTimeoutError):
+        await handler.request("get_evse_id", {"protocol": "ISO"})
+
+    await router.recv_multipart()
+    assert handler.socket is not old_socket
+    assert handler.metrics() == {
+        "controller_pending": 0,
+        "controller_timeouts": 2,
+        "controller_reconnects": 1,
+    }
+
+    # The new socket is served as well
+    async def serve_one():
+        frames = await router.recv_multipart()
+        await reply(router, frames, "UK123E1234")
+
+    server = asyncio.create_task(serve_one())
+    evse_id = await handler.request("get_evse_id", {"protocol": "ISO"}, timeout=5)
+    assert evse_id == "UK123E1234"
+    await server
+    handler.close()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_fails_pending_requests(router):
+    handler = ZMQHandler(router.getsockopt_string(zmq.LAST_ENDPOINT))
+
+    request = asyncio.create_task(handler.request("get_dc_evse_status"))
+    await router.recv_multipart()
+    handler._reconnect("test")
+
+    with pytest.raises(ControllerConnectionError):
+        await request
+    handler.close()
+
+
+@pytest.mark.asyncio
+async def test_error_reply_raises(router):
+    handler = ZMQHandler(router.getsockopt_string(zmq.LAST_ENDPOINT))
+
+    async def serve_error():
+        frames = await router.recv_multipart()
+        error = encode_error("stop_charger", "NOT IMPLEMENTED")
+        await router.send_multipart(frames[:-1] + [error])
+
+    server = asyncio.create_task(serve_error())
+    with pytest.raises(ControllerRequestError, match="NOT IMPLEMENTED"):
+        await handler.request("stop_charger")
+    await server
+    handler.close()